@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from blobs.models import Blob
+from blobs.storage import BlobStorage, name_digest, referenced_names
+
+
+class Command(BaseCommand):
+    help = "Delete stored files that no record refers to any more, and evict them from this node's blob cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=float,
+            default=1.0,
+            help="Only delete files stored at least this many hours ago, so files being saved are kept. Default 1.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted.")
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, BlobStorage):
+            raise CommandError("The default file storage is not the blob store.")
+
+        referenced = {name_digest(name) for name in referenced_names(default_storage)}
+        unreferenced = Blob.objects.exclude(digest__in=referenced).filter(
+            created__lt=timezone.now() - timedelta(hours=options["min_age"])
+        )
+        digests = list(unreferenced.values_list("digest", flat=True))
+        size = sum(unreferenced.values_list("size", flat=True))
+
+        if not options["dry_run"]:
+            unreferenced.delete()
+            cached = {name_digest(name): name for name in default_storage.listdir("")[1] if name_digest(name)}
+            for digest in digests:
+                if digest in cached:
+                    default_storage.delete(cached[digest])
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(digests)} unreferenced stored files ({size} bytes)"))
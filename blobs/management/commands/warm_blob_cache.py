@@ -0,0 +1,29 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from blobs.storage import BlobStorage, referenced_names
+
+
+class Command(BaseCommand):
+    help = "Fetch every stored file that a record refers to into this node's blob cache, for example on a new node."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Also check the content of files already cached and fetch them again if it does not match.",
+        )
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, BlobStorage):
+            raise CommandError("The default file storage is not the blob store.")
+
+        try:
+            names = referenced_names(default_storage)
+            fetched = default_storage.fill(sorted(names), verify=options["verify"])
+        except OSError as exc:
+            raise CommandError(f"Could not fill the blob cache: {exc}") from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(names)} stored files cached in {default_storage.location} ({fetched} fetched)")
+        )
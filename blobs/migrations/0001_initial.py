@@ -0,0 +1,23 @@
+# Generated by Django 4.1.6 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('digest', models.CharField(help_text='SHA-256 of the content, in hex', max_length=64, primary_key=True, serialize=False)),
+                ('content', models.BinaryField()),
+                ('size', models.PositiveBigIntegerField(help_text='Size of the content in bytes')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
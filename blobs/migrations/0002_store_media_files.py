@@ -0,0 +1,82 @@
+# Generated by Django 4.1.6 on 2026-10-18 18:19
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.db import migrations
+
+logger = logging.getLogger(__name__)
+
+# Frozen copies of the naming rules in blobs.storage, so later changes there do not change what this migration does.
+_NAME = re.compile(r"^[0-9a-f]{64}(\.[A-Za-z0-9]+)?$")
+
+
+def blob_name(digest, name=""):
+    return digest + Path(name).suffix.lower()
+
+
+def is_blob_name(name):
+    return bool(_NAME.match(os.path.basename(name or "")))
+
+
+def profile_document(data):
+    """Return a baseline profile file's parsed content, or None when the file is not a profile."""
+    try:
+        document = json.loads(data)
+    except ValueError:
+        return None
+    return document if isinstance(document, dict) and "profile" in document else None
+
+
+def store_media_files(apps, schema_editor):
+    """Move catalog and component files from MEDIA_ROOT into the Blob table and rename them by content."""
+    Blob = apps.get_model("blobs", "Blob")
+
+    def store(data, name):
+        digest = hashlib.sha256(data).hexdigest()
+        Blob.objects.get_or_create(digest=digest, defaults={"content": data, "size": len(data)})
+        return blob_name(digest, name)
+
+    def read(path):
+        with open(path, "rb") as file:
+            return file.read()
+
+    for model, field in (("catalogs.Catalog", "file_name"), ("components.Component", "component_file")):
+        Model = apps.get_model(model)
+        for pk, name in Model.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True}).values_list(
+            "pk", field
+        ):
+            if is_blob_name(name):
+                continue
+
+            path = os.path.join(settings.MEDIA_ROOT, name)
+            try:
+                data = read(path)
+                if document := profile_document(data):
+                    # Point the profile at the stored copy of the catalog it imports.
+                    catalog_path = Path(path).parent / document["profile"]["imports"][0]["href"]
+                    document["profile"]["imports"][0]["href"] = store(read(catalog_path), catalog_path.name)
+                    data = json.dumps(document, indent=2).encode("utf-8")
+            except OSError as exc:
+                logger.warning("Could not store %s %s file %s: %s", model, pk, name, exc)
+                continue
+
+            Model.objects.filter(pk=pk).update(**{field: store(data, name)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blobs', '0001_initial'),
+        ('catalogs', '0008_control_crosswalk'),
+        ('components', '0002_component_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(store_media_files, migrations.RunPython.noop),
+    ]
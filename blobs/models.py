@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class Blob(models.Model):
+    """File content stored once per distinct content, keyed by its SHA-256."""
+
+    digest = models.CharField(max_length=64, primary_key=True, help_text="SHA-256 of the content, in hex")
+    content = models.BinaryField()
+    size = models.PositiveBigIntegerField(help_text="Size of the content in bytes")
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.digest
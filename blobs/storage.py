@@ -0,0 +1,179 @@
+"""Content-addressed file storage in the database, read through a cache on each node's disk.
+
+A saved file is named by the SHA-256 of its content plus the extension it was saved with, for example
+``3f5a...9c.json``. Identical files are stored once, and a name always means the same content, so a node's cached copy
+never goes stale. Each node serves files from ``BLOB_CACHE_DIR`` and fetches a file from the Blob table the first time
+it is used there. A cached file is written to a temporary file and renamed into place, so readers never see a partial
+file. Nodes therefore need no shared filesystem.
+
+Apps that store files which need other stored files, or which derive local files from them, connect to
+``blob_references`` and ``blob_fetched``. Both are sent with the stored name and the local path of a file.
+``blob_references`` receivers return the names of the stored files it needs, which are fetched with it. ``blob_fetched``
+receivers run after it is fetched into this node's cache.
+"""
+import errno
+import glob
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional, Set
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.dispatch import Signal
+from django.utils._os import safe_join
+
+from blobs.models import Blob
+
+logger = logging.getLogger(__name__)
+
+blob_references = Signal()
+blob_fetched = Signal()
+
+_NAME = re.compile(r"^(?P<digest>[0-9a-f]{64})(?P<suffix>\.[A-Za-z0-9]+)?$")
+
+
+def blob_name(digest: str, name: str = "") -> str:
+    return digest + Path(name).suffix.lower()
+
+
+def name_digest(name: str) -> Optional[str]:
+    """Return the SHA-256 a stored file name was derived from, or None for names that are not content addressed."""
+    match = _NAME.match(os.path.basename(name or ""))
+    return match.group("digest") if match else None
+
+
+class BlobStorage(FileSystemStorage):
+    """Default file storage: saves to the Blob table and serves files from this node's cache directory."""
+
+    def __init__(self, location=None, base_url=None, **kwargs):
+        super().__init__(location=location or settings.BLOB_CACHE_DIR, base_url=base_url, **kwargs)
+
+    def get_available_name(self, name, max_length=None):
+        # Names come from the content, and saving identical content again is not a conflict.
+        return name
+
+    def _save(self, name, content):
+        content.seek(0)
+        data = content.read()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        digest = hashlib.sha256(data).hexdigest()
+        Blob.objects.bulk_create([Blob(digest=digest, content=data, size=len(data))], ignore_conflicts=True)
+        name = blob_name(digest, name)
+        self._write_cache(name, data)
+        return name
+
+    def path(self, name):
+        """Return the local path of a stored file, fetching it into this node's cache first if needed.
+
+        Files saved before the blob store, which are not named by content, are still read from MEDIA_ROOT.
+        """
+        if not name_digest(name):
+            return safe_join(settings.MEDIA_ROOT, name)
+
+        path = super().path(name)
+        if not os.path.exists(path):
+            self._fill(name)
+        return path
+
+    def exists(self, name):
+        if digest := name_digest(name):
+            return Blob.objects.filter(digest=digest).exists()
+        return os.path.lexists(self.path(name))
+
+    def delete(self, name):
+        """Evict a file, and files derived from it such as ``<name>.snapshot``, from this node's cache.
+
+        The stored content stays, since other records may have the same content; ``prune_blobs`` removes content that
+        nothing refers to any more.
+        """
+        if not name:
+            raise ValueError("The name must be given to delete().")
+        path = Path(super().path(name))
+        for cached in (path, *path.parent.glob(glob.escape(path.name) + ".*")):
+            try:
+                os.remove(cached)
+            except FileNotFoundError:
+                pass
+
+    def references(self, name: str) -> Set[str]:
+        """Return the stored files a stored file needs, such as the catalog a baseline profile imports."""
+        responses = blob_references.send(sender=self.__class__, name=name, path=self.path(name))
+        return {reference for _, references in responses for reference in references or ()}
+
+    def fill(self, names: Iterable[str], verify: bool = False) -> int:
+        """Fetch stored files into this node's cache. With verify, also re-fetch cached files whose content is wrong.
+
+        Returns the number of files fetched.
+        """
+        fetched = 0
+        for name in names:
+            path = super().path(name)
+            if os.path.exists(path) and not (verify and _file_digest(path) != name_digest(name)):
+                continue
+            self._fill(name)
+            fetched += 1
+        return fetched
+
+    def _fill(self, name: str):
+        digest = name_digest(name)
+        try:
+            data = bytes(Blob.objects.values_list("content", flat=True).get(digest=digest))
+        except Blob.DoesNotExist as exc:
+            raise FileNotFoundError(errno.ENOENT, "No stored file", name) from exc
+
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise OSError(errno.EIO, "Stored content does not match its digest", name)
+
+        self._write_cache(name, data)
+        logger.debug("Fetched %s into the blob cache", name)
+        blob_fetched.send(sender=self.__class__, name=name, path=super().path(name))
+
+        # A file is useless without the files it needs, such as the catalog a baseline profile imports.
+        for reference in self.references(name):
+            self.path(reference)
+
+    def _write_cache(self, name: str, data: bytes):
+        target = Path(super().path(name))
+        target.parent.mkdir(parents=True, exist_ok=True)
+        handle, temp_name = tempfile.mkstemp(dir=target.parent, prefix=target.name, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(data)
+            os.chmod(temp_name, 0o644)
+            os.replace(temp_name, target)
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def referenced_names(storage: BlobStorage) -> Set[str]:
+    """Return the names of every stored file a model field refers to, and of the files those need in turn."""
+    names = set()
+    for model in apps.get_models():
+        for field in model._meta.get_fields():  # pylint: disable=protected-access
+            if isinstance(field, models.FileField) and isinstance(field.storage, BlobStorage):
+                names.update(name for name in model.objects.values_list(field.attname, flat=True) if name_digest(name))
+
+    pending = list(names)
+    while pending:
+        for reference in storage.references(pending.pop()) - names:
+            names.add(reference)
+            pending.append(reference)
+    return names
@@ -0,0 +1,142 @@
+import hashlib
+import importlib
+import os
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from blobs.models import Blob
+from blobs.storage import BlobStorage, referenced_names
+from catalogs.baselines import read_profile, store_profile
+from catalogs.models import Catalog
+from catalogs.snapshot import snapshot_path
+
+store_media_files = importlib.import_module("blobs.migrations.0002_store_media_files").store_media_files
+
+PROFILE = "catalogs/data/NIST_SP80053/r5/NIST_SP-800-53_rev5_LOW-baseline_profile.json"
+
+
+class BlobStorageTestCase(TestCase):
+    def setUp(self):
+        self.node = self._node_storage()
+
+    def _node_storage(self) -> BlobStorage:
+        """A storage with its own empty cache directory, like a node that has not used any file yet."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return BlobStorage(location=directory.name)
+
+    def test_files_are_named_and_stored_by_content(self):
+        first = self.node.save("catalogs/a.json", ContentFile(b'{"a": 1}'))
+        second = self.node.save("elsewhere/b.JSON", ContentFile(b'{"a": 1}'))
+
+        self.assertEqual(first, hashlib.sha256(b'{"a": 1}').hexdigest() + ".json")
+        self.assertEqual(second, first)
+        self.assertEqual(Blob.objects.count(), 1)
+        self.assertTrue(self.node.exists(first))
+
+    def test_other_node_fetches_file_from_database(self):
+        name = self.node.save("a.json", ContentFile(b'{"a": 1}'))
+        other = self._node_storage()
+
+        self.assertFalse(os.path.exists(os.path.join(other.location, name)))
+        with other.open(name) as file:
+            self.assertEqual(file.read(), b'{"a": 1}')
+        self.assertTrue(os.path.exists(os.path.join(other.location, name)))
+
+    def test_delete_evicts_cached_file_and_derived_files_only(self):
+        name = self.node.save("a.json", ContentFile(b'{"a": 1}'))
+        Path(self.node.path(name) + ".snapshot").write_bytes(b"snapshot")
+
+        self.node.delete(name)
+
+        self.assertEqual(os.listdir(self.node.location), [])
+        self.assertTrue(self.node.exists(name))
+
+    def test_fill_verify_replaces_corrupt_cached_file(self):
+        name = self.node.save("a.json", ContentFile(b'{"a": 1}'))
+        Path(self.node.path(name)).write_bytes(b"corrupt")
+
+        self.assertEqual(self.node.fill([name]), 0)
+        self.assertEqual(self.node.fill([name], verify=True), 1)
+        self.assertEqual(Path(self.node.path(name)).read_bytes(), b'{"a": 1}')
+
+    def test_missing_file_raises_file_not_found(self):
+        with self.assertRaises(FileNotFoundError):
+            self.node.path(f"{'0' * 64}.json")
+
+    def test_profile_is_fetched_with_the_catalog_it_imports(self):
+        name = self.node.save("baseline.json", store_profile(PROFILE, "baseline.json", storage=self.node))
+        other = self._node_storage()
+
+        profile = read_profile(other.path(name))
+
+        self.assertTrue(profile.catalog_path.is_file())
+        self.assertTrue(snapshot_path(profile.catalog_path).is_file())
+        self.assertFalse(snapshot_path(other.path(name)).exists())
+        self.assertEqual(other.references(name), {profile.catalog_path.name})
+
+
+class BlobCommandsTestCase(TestCase):
+    def setUp(self):
+        self.catalog = Catalog.objects.create(
+            name="NIST Test Baseline", file_name=store_profile(PROFILE, os.path.basename(PROFILE))
+        )
+        self.unreferenced = default_storage.save("unused.json", ContentFile(b"{}"))
+        Blob.objects.update(created="2000-01-01T00:00:00Z")
+
+    def test_referenced_names_include_imported_catalogs(self):
+        names = referenced_names(default_storage)
+
+        self.assertIn(self.catalog.file_name.name, names)
+        self.assertIn(read_profile(self.catalog.file_name.path).catalog_path.name, names)
+        self.assertNotIn(self.unreferenced, names)
+
+    def test_warm_blob_cache_fetches_referenced_files(self):
+        for name in referenced_names(default_storage):
+            default_storage.delete(name)
+        output = StringIO()
+
+        call_command("warm_blob_cache", stdout=output)
+
+        self.assertIn("2 stored files cached", output.getvalue())
+        self.assertTrue(os.path.exists(os.path.join(default_storage.location, self.catalog.file_name.name)))
+        self.assertTrue(snapshot_path(read_profile(self.catalog.file_name.path).catalog_path).is_file())
+
+    def test_prune_blobs_deletes_unreferenced_files(self):
+        output = StringIO()
+        call_command("prune_blobs", dry_run=True, stdout=output)
+        self.assertIn("Would delete 1 unreferenced", output.getvalue())
+        self.assertTrue(default_storage.exists(self.unreferenced))
+
+        call_command("prune_blobs", stdout=StringIO())
+
+        self.assertFalse(default_storage.exists(self.unreferenced))
+        self.assertEqual(Blob.objects.count(), 2)
+
+
+class StoreMediaFilesMigrationTestCase(TestCase):
+    def test_media_files_move_to_blobs(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        shutil.copytree(os.path.dirname(PROFILE), os.path.join(media_root, "catalogs"))
+        legacy_name = os.path.join("catalogs", os.path.basename(PROFILE))
+        # Rows saved before the blob store, without the signals that parse a new file.
+        Catalog.objects.bulk_create([Catalog(name="Legacy Baseline", file_name=legacy_name)])
+
+        with override_settings(MEDIA_ROOT=media_root):
+            self.assertTrue(default_storage.exists(legacy_name))
+            store_media_files(apps, None)
+
+        catalog = Catalog.objects.get(name="Legacy Baseline")
+        profile = read_profile(catalog.file_name.path)
+        self.assertNotEqual(catalog.file_name.name, legacy_name)
+        self.assertEqual(profile.control_ids, read_profile(PROFILE).control_ids)
+        self.assertEqual(Path(profile.catalog_path).read_bytes(), Path(read_profile(PROFILE).catalog_path).read_bytes())
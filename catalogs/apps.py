@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.conf import settings
 from django.db.models.signals import post_save, post_delete, pre_save
 
 
@@ -7,7 +8,14 @@ class CatalogConfig(AppConfig):
     name = "catalogs"
 
     def ready(self):
-        from catalogs.signals import add_controls, auto_delete_file_on_delete, auto_delete_file_on_change
+        from blobs.storage import BlobStorage, blob_fetched, blob_references
+        from catalogs.signals import (
+            add_controls,
+            auto_delete_file_on_change,
+            auto_delete_file_on_delete,
+            imported_catalog,
+            snapshot_fetched_catalog,
+        )
 
         signal_config = [
             (post_save, add_controls, "ingest_catalog_controls"),
@@ -17,3 +25,12 @@ class CatalogConfig(AppConfig):
 
         for signal, receiver, uid in signal_config:
             signal.connect(receiver, sender="catalogs.Catalog", dispatch_uid=uid)
+
+        blob_references.connect(imported_catalog, sender=BlobStorage, dispatch_uid="catalog_imported_by_profile")
+        blob_fetched.connect(snapshot_fetched_catalog, sender=BlobStorage, dispatch_uid="snapshot_fetched_catalog")
+
+        if settings.OSCAL_SCHEMA_PRECOMPILE:
+            from ratoapi.oscal.schemas import get_validator
+
+            get_validator("catalog")
+            get_validator("profile")
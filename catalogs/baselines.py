@@ -0,0 +1,233 @@
+"""Baselines stored as selections from one catalog per revision.
+
+That catalog is the union of the revision's baselines, not the full NIST catalog; this module calls it the full catalog
+because every baseline of the revision is a subset of it.
+
+A baseline profile is a small OSCAL profile. It imports a catalog file (``imports[0].href``, relative to the profile),
+selects controls with ``include-controls``/``with-ids``, may override parameters with ``modify.set-parameters``, and
+carries the uuid, metadata and back-matter resource uuids of the resolved baseline. Resolving a profile gives the same
+catalog as the resolved-profile catalog it was split from. The controls it returns are the full catalog's own objects;
+only controls whose enhancements or parameters differ from the full catalog are shallow copies.
+"""
+import hashlib
+import json
+import posixpath
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import Storage, default_storage
+
+from catalogs.snapshot import source_digest
+from ratoapi.oscal.oscal import control_sort_key
+
+# Profiles are told apart from catalogs by their top-level key, without parsing the whole file.
+_PROFILE_START = re.compile(rb'^\s*{\s*"profile"\s*:')
+_CATALOG_START = re.compile(rb'^\s*{\s*"catalog"\s*:')
+_PEEK_BYTES = 64
+
+
+class BaselineProfile(NamedTuple):
+    path: Path
+    catalog_path: Path
+    uuid: str
+    metadata: dict
+    control_ids: Tuple[str, ...]
+    set_parameters: Dict[str, dict]
+    resource_uuids: Tuple[str, ...]
+    # The profile without its import location, so a stored copy whose import was moved has the same digest.
+    content: dict
+
+
+def is_profile(path: Union[str, Path]) -> bool:
+    return _starts_with(path, _PROFILE_START)
+
+
+def is_catalog(path: Union[str, Path]) -> bool:
+    return _starts_with(path, _CATALOG_START)
+
+
+def _starts_with(path: Union[str, Path], pattern: re.Pattern) -> bool:
+    try:
+        with open(path, "rb") as file:
+            return bool(pattern.match(file.read(_PEEK_BYTES)))
+    except OSError:
+        return False
+
+
+def read_profile(path: Union[str, Path]) -> Optional[BaselineProfile]:
+    """Return the baseline profile in a file, or None when the file is not a profile."""
+    if not is_profile(path):
+        return None
+
+    path = Path(path)
+    with open(path, "r") as file:
+        profile = json.load(file)["profile"]
+
+    imports = profile.get("imports", [])
+    if len(imports) != 1:
+        raise ValueError(f"Baseline profile {path} must import exactly one catalog")
+
+    control_ids = [
+        control_id
+        for include in imports[0].get("include-controls", [])
+        for control_id in include.get("with-ids", [])
+    ]
+    content = {**profile, "imports": [{key: value for key, value in imports[0].items() if key != "href"}]}
+    return BaselineProfile(
+        path=path,
+        catalog_path=path.parent / imports[0]["href"],
+        uuid=profile["uuid"],
+        metadata=profile["metadata"],
+        control_ids=tuple(control_ids),
+        set_parameters={
+            item["param-id"]: {key: value for key, value in item.items() if key != "param-id"}
+            for item in profile.get("modify", {}).get("set-parameters", [])
+        },
+        resource_uuids=tuple(
+            resource["uuid"] for resource in profile.get("back-matter", {}).get("resources", [])
+        ),
+        content=content,
+    )
+
+
+def baseline_digest(profile: BaselineProfile, catalog_digest: Optional[bytes] = None) -> bytes:
+    """Return the SHA-256 of a baseline: its profile, without the import location, and the imported catalog file."""
+    digest = hashlib.sha256(json.dumps(profile.content, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    digest.update(catalog_digest or source_digest(profile.catalog_path))
+    return digest.digest()
+
+
+def catalog_digest(path: Union[str, Path]) -> bytes:
+    """Return the SHA-256 recorded for a catalog file, or for a baseline profile and the catalog it imports."""
+    if profile := read_profile(path):
+        return baseline_digest(profile)
+    return source_digest(path)
+
+
+def _replace(item: dict, key: str, value) -> dict:
+    """Copy a dict with one key's value replaced in place, or removed when the value is None."""
+    if key not in item:
+        return item if value is None else {**item, key: value}
+    return {name: value if name == key else other for name, other in item.items() if name != key or value is not None}
+
+
+def _resolve_params(params: List[dict], set_parameters: Dict[str, dict]) -> List[dict]:
+    return [{**param, **set_parameters[param["id"]]} if param["id"] in set_parameters else param for param in params]
+
+
+def _resolve_control(control: dict, selected: frozenset, set_parameters: Dict[str, dict]) -> dict:
+    resolved = control
+    if children := control.get("controls"):
+        kept = [_resolve_control(child, selected, set_parameters) for child in children if child["id"] in selected]
+        if len(kept) != len(children) or any(a is not b for a, b in zip(kept, children)):
+            resolved = _replace(resolved, "controls", kept or None)
+
+    params = control.get("params", [])
+    if any(param["id"] in set_parameters for param in params):
+        resolved = _replace(resolved, "params", _resolve_params(params, set_parameters))
+    return resolved
+
+
+def resolve_baseline(profile: BaselineProfile, catalog: dict) -> dict:
+    """Return the catalog of a baseline, sharing every unchanged group and control dict with the full catalog."""
+    selected = frozenset(profile.control_ids)
+    groups = []
+    for group in catalog.get("groups", []):
+        if "controls" in group:
+            controls = [
+                _resolve_control(control, selected, profile.set_parameters)
+                for control in group["controls"]
+                if control["id"] in selected
+            ]
+            group = _replace(group, "controls", controls or None)
+        groups.append(group)
+
+    resolved = {"uuid": profile.uuid, "metadata": profile.metadata, "groups": groups}
+    if profile.resource_uuids:
+        resources = {resource["uuid"]: resource for resource in catalog.get("back-matter", {}).get("resources", [])}
+        resolved["back-matter"] = {
+            "resources": [resources[uuid] for uuid in profile.resource_uuids if uuid in resources]
+        }
+    return resolved
+
+
+def split_baselines(
+    baselines: Dict[str, dict], catalog_href: str, uuid: str, metadata: dict
+) -> Tuple[dict, Dict[str, dict]]:
+    """Split resolved baseline catalogs of one revision into a full catalog and one profile per baseline.
+
+    ``baselines`` maps profile names to resolved catalogs. The full catalog has every control selected by any of them,
+    in catalog order, with the given metadata.
+    """
+    groups: Dict[str, dict] = {}
+    controls: Dict[str, Dict[str, dict]] = {}
+    children: Dict[str, Dict[str, dict]] = {}
+    resources: Dict[str, dict] = {}
+
+    for catalog in baselines.values():
+        for group in catalog.get("groups", []):
+            groups.setdefault(group["id"], group)
+            group_controls = controls.setdefault(group["id"], {})
+            for control in group.get("controls", []):
+                group_controls.setdefault(control["id"], control)
+                for child in control.get("controls", []):
+                    children.setdefault(control["id"], {}).setdefault(child["id"], child)
+        for resource in catalog.get("back-matter", {}).get("resources", []):
+            resources.setdefault(resource["uuid"], resource)
+
+    def _ordered(items: Iterable[dict]) -> List[dict]:
+        # Controls keep the order they were first seen in, apart from numbered ids, which go in natural order.
+        return sorted(items, key=lambda item: [part or 0 for part in control_sort_key(item["id"])[1:]])
+
+    full_groups = []
+    for group_id, group in groups.items():
+        group_controls = [
+            _replace(control, "controls", _ordered(children.get(control["id"], {}).values()) or None)
+            for control in _ordered(controls[group_id].values())
+        ]
+        full_groups.append(_replace(group, "controls", group_controls or None))
+
+    full = {"uuid": uuid, "metadata": metadata, "groups": full_groups}
+    if resources:
+        full["back-matter"] = {"resources": list(resources.values())}
+
+    profiles = {}
+    for name, catalog in baselines.items():
+        control_ids = [
+            item["id"]
+            for group in catalog.get("groups", [])
+            for control in group.get("controls", [])
+            for item in (control, *control.get("controls", []))
+        ]
+        profile = {
+            "uuid": catalog["uuid"],
+            "metadata": catalog["metadata"],
+            "imports": [{"href": catalog_href, "include-controls": [{"with-ids": control_ids}]}],
+        }
+        if catalog_resources := catalog.get("back-matter", {}).get("resources"):
+            profile["back-matter"] = {"resources": [{"uuid": resource["uuid"]} for resource in catalog_resources]}
+        profiles[name] = {"profile": profile}
+
+    return {"catalog": full}, profiles
+
+
+def store_profile(path: Union[str, Path], name: str, storage: Storage = default_storage) -> File:
+    """Store the catalog a profile imports next to ``name`` and return the profile file to save under ``name``.
+
+    A stored catalog with the same contents is reused, so the baselines of a revision share one stored catalog. The
+    returned profile imports the stored catalog, whatever name the storage gave it.
+    """
+    profile = read_profile(path)
+    catalog_name = posixpath.join(posixpath.dirname(name), profile.catalog_path.name)
+    if not storage.exists(catalog_name) or source_digest(storage.path(catalog_name)) != source_digest(
+        profile.catalog_path
+    ):
+        with open(profile.catalog_path, "rb") as file:
+            catalog_name = storage.save(catalog_name, File(file))
+
+    with open(path, "r") as file:
+        data = json.load(file)
+    data["profile"]["imports"][0]["href"] = posixpath.basename(catalog_name)
+    return ContentFile(json.dumps(data, indent=2).encode("utf-8"), name=name)
@@ -1,6 +1,15 @@
+import functools
 import json
 import logging
-from typing import Any, List, Optional, Tuple
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from django.conf import settings
+
+from catalogs.baselines import read_profile, resolve_baseline
+from catalogs.compact import CompactCatalog
+from catalogs.snapshot import CatalogSnapshot
+from ratoapi.cache import load_catalog_file
 
 logger = logging.getLogger("catalogs.catalogio")
 
@@ -8,18 +17,176 @@ logger = logging.getLogger("catalogs.catalogio")
 class CatalogTools:
     """Represent a catalog"""
 
+    # Fields available from get_control_fields.
+    CONTROL_FIELDS = ("title", "label", "sort_id", "family", "description", "implementation", "guidance", "next_id")
+
     def __init__(self, source, text=False):
         try:
-            self.oscal = self._load_catalog_json(source, text)
+            oscal = self._load_catalog_json(source, text)
         except (IOError, FileNotFoundError, json.decoder.JSONDecodeError) as exc:
             logger.error("Unable to load catalog %s: %s", source, exc)
             raise CatalogLoadError(f"Could not load catalog {source}") from exc
+        self._index_catalog(oscal)
+
+    @classmethod
+    def from_catalog(cls, oscal: dict) -> "CatalogTools":
+        """Build a CatalogTools over an already parsed catalog, keeping its control dicts rather than copying them."""
+        tools = cls.__new__(cls)
+        tools._index_catalog(oscal)
+        return tools
+
+    def _index_catalog(self, oscal: dict):
+        self.oscal = oscal
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._compact: Optional[CompactCatalog] = None
+        self._meta: dict = self.oscal
+        self._set_status()
+        controls_by_id: Dict[str, dict] = {}
+        outline = self._outline(self.oscal, controls_by_id)
+        self._build_indexes(outline, controls_by_id)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], catalog_pk: Optional[int] = None) -> "CatalogTools":
+        """Return a shared CatalogTools for a catalog file, parsing it only when it is not already cached."""
+        try:
+            return load_catalog_file(
+                path, functools.partial(cls._load, catalog_pk=catalog_pk), kind="catalog-tools", catalog_pk=catalog_pk
+            )
+        except OSError as exc:
+            logger.error("Unable to load catalog %s: %s", path, exc)
+            raise CatalogLoadError(f"Could not load catalog {path}") from exc
+
+    @classmethod
+    def _load(cls, path: Path, catalog_pk: Optional[int] = None) -> "CatalogTools":
+        if settings.CATALOG_COMPACT:
+            return cls.from_compact(CompactCatalog.from_file(path, catalog_pk=catalog_pk))
+        if profile := read_profile(path):
+            # Baselines of a revision share the cached full catalog and its control dicts.
+            return cls.from_catalog(resolve_baseline(profile, cls.from_file(profile.catalog_path).oscal))
+        if snapshot := CatalogSnapshot.open_fresh(path):
+            return cls.from_snapshot(snapshot)
+        return cls(path)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: CatalogSnapshot) -> "CatalogTools":
+        """Build a CatalogTools over a compiled snapshot; controls are only decoded when they are looked up."""
+        tools = cls.__new__(cls)
+        tools._oscal = None
+        tools._snapshot = snapshot
+        tools._compact = None
+        tools._meta = snapshot.meta
+        tools._set_status()
+        tools._build_indexes(snapshot.outline, _SnapshotControls(snapshot))
+        return tools
+
+    @classmethod
+    def from_compact(cls, compact: CompactCatalog) -> "CatalogTools":
+        """Build a CatalogTools over a compact catalog; control dicts are rebuilt on each lookup rather than kept.
+
+        Only ``oscal``, which few callers need, assembles the whole catalog; it is kept once built.
+        """
+        tools = cls.__new__(cls)
+        tools._oscal = None
+        tools._snapshot = None
+        tools._compact = compact
+        tools._meta = compact.meta
+        tools._set_status()
+        outline = [
+            (compact.groups[position], [(control_id, compact.controls[control_id].children) for control_id in ids])
+            for position, ids in compact.outline
+        ]
+        tools._build_indexes(outline, _CompactControls(compact))
+        return tools
+
+    @property
+    def oscal(self) -> dict:
+        if self._oscal is None and self._compact is not None:
+            self._oscal = self._compact.to_catalog()
+        elif self._oscal is None and self._snapshot is not None:
+            self._oscal = self._materialize()
+        return self._oscal
+
+    @oscal.setter
+    def oscal(self, value: dict):
+        self._oscal = value
+
+    @property
+    def info(self) -> dict:
+        return {"groups": self.get_groups()}
 
-        json.dumps(self.oscal)
+    def _set_status(self):
         self.status = "ok"
         self.status_message = "Success loading catalog"
-        self.catalog_id = self.oscal.get("id")
-        self.info = {"groups": self.get_groups()}
+        self.catalog_id = self._meta.get("id")
+
+    def _materialize(self) -> dict:
+        """Assemble the full catalog from a snapshot, reusing any controls that were already decoded."""
+        catalog = dict(self._meta)
+        catalog["groups"] = []
+        for group, controls in self._snapshot.outline:
+            group = dict(group)
+            if controls:
+                group["controls"] = [self._controls_by_id[control_id] for control_id, _ in controls]
+            catalog["groups"].append(group)
+        return catalog
+
+    @staticmethod
+    def _outline(oscal: dict, controls_by_id: Dict[str, dict]) -> list:
+        """Return the group -> control -> enhancement id outline of a catalog, filling controls_by_id on the way."""
+        outline = []
+        for group in (oscal or {}).get("groups", []):
+            controls = []
+            for control in group.get("controls", []):
+                children = control.get("controls", [])
+                controls.append((control.get("id"), [child.get("id") for child in children]))
+                for item in (control, *children):
+                    controls_by_id.setdefault(item.get("id"), item)
+            outline.append((group, controls))
+        return outline
+
+    def _build_indexes(self, outline: list, controls_by_id: Mapping[str, dict]):
+        """Index groups, controls, control ordering and back-matter resources for constant time lookups."""
+        self._controls_by_id = controls_by_id
+        self._groups_by_id: Dict[str, dict] = {}
+        self._group_ids: List[str] = []
+        self._group_ids_by_prefix: Dict[str, str] = {}
+        self._group_ids_by_control_id: Dict[str, str] = {}
+        self._control_ids_all: List[str] = []
+        top_level_ids: List[str] = []
+
+        for group, controls in outline:
+            group_id = group.get("id")
+            self._group_ids.append(group_id)
+            self._groups_by_id.setdefault(group_id, group)
+            if group_id:
+                self._group_ids_by_prefix[group_id.lower()] = group_id
+
+            for control_id, child_ids in controls:
+                top_level_ids.append(control_id)
+                for item_id in (control_id, *child_ids):
+                    self._control_ids_all.append(item_id)
+                    self._group_ids_by_control_id.setdefault(item_id, group_id)
+
+        self._top_level_ids = top_level_ids
+        self._control_order: List[str] = self._sort_control_ids(top_level_ids)
+        self._control_positions: Dict[str, int] = {cid: idx for idx, cid in enumerate(self._control_order)}
+        self._next_ids: Dict[str, str] = dict(zip(self._control_order, self._control_order[1:]))
+        self._previous_ids: Dict[str, str] = dict(zip(self._control_order[1:], self._control_order))
+
+        self._resources_by_uuid: Dict[str, dict] = {}
+        for resource in self._meta.get("back-matter", {}).get("resources", []):
+            self._resources_by_uuid.setdefault(resource.get("uuid"), resource)
+
+    @staticmethod
+    def _sort_control_ids(control_ids: Iterable[str]) -> List[str]:
+        def _sort(control_id_: str) -> Tuple[str, float]:
+            parts = control_id_.split("-")
+            sub = float(parts.pop(-1))
+            id_ = "-".join(parts)
+
+            return id_, sub
+
+        return sorted(control_ids, key=_sort)
 
     @staticmethod
     def _load_catalog_json(source, text):
@@ -27,6 +194,8 @@ class CatalogTools:
         oscal: dict = {}
         if text:
             oscal = json.loads(source)
+        elif profile := read_profile(source):
+            return resolve_baseline(profile, CatalogTools._load_catalog_json(profile.catalog_path, False))
         else:
             with open(source, "r") as file:
                 oscal = json.load(file)
@@ -60,87 +229,53 @@ class CatalogTools:
         return groups
 
     def get_group_ids(self):
-        groups = self.get_groups()
-        ids = [item.get("id") for item in groups]
-        return ids
+        return list(self._group_ids)
 
     def get_group_title_by_id(self, group_id):
-        group = self.find_dict_by_value(self.get_groups(), "id", group_id)
+        group = self._groups_by_id.get(group_id)
         if group is None:
             return None
         return group.get("title")
 
     def get_group_id_by_control_id(self, control_id) -> str:
         """Return group id given id of a control"""
-        group_ids = self.get_group_ids()
-        gid: str = ""
-        if group_ids:
-            for group in group_ids:
-                if group.lower() == control_id[:2].lower():
-                    gid = group
-        return gid
+        if gid := self._group_ids_by_control_id.get(control_id):
+            return gid
+        return self._group_ids_by_prefix.get(control_id[:2].lower(), "")
 
     # Controls
     def get_controls(self) -> List:
-        controls: List[dict] = []
-        for group in self.get_groups():
-            controls += group.get("controls")
-        return controls
+        return [self._controls_by_id[control_id] for control_id in self._top_level_ids]
 
     def get_control_ids(self) -> List:
-        def _sort(control_id_: str) -> Tuple[str, float]:
-            parts = control_id_.split("-")
-            sub = float(parts.pop(-1))
-            id_ = "-".join(parts)
-
-            return id_, sub
-
-        search_collection = self.get_controls()
-        return sorted((item.get("id") for item in search_collection), key=_sort)
+        return list(self._control_order)
 
     def get_controls_all(self) -> List:
-        controls: List[dict] = []
-        for group in self.get_groups():
-            for control in group.get("controls"):
-                controls.append(control)
-                if "controls" in control:
-                    controls += control.get("controls")
-        return controls
+        return [self._controls_by_id[control_id] for control_id in self._control_ids_all]
 
     def get_controls_all_ids(self) -> List:
-        search_collection = self.get_controls_all()
-        return [item["id"] for item in search_collection]
+        return list(self._control_ids_all)
 
     def get_control_by_id(self, control_id: str) -> dict:
         """
         Return the dictionary in an array of dictionaries with a key matching a value
         """
-        search_array = self.get_controls_all()
-        search_key = "id"
-        search_value = control_id
-        result_dict: dict = next(
-            (
-                s
-                for s in search_array
-                if search_key in s and s[search_key] == search_value
-            ),
-            {},
-        )
-        return result_dict
+        return self._controls_by_id.get(control_id, {})
 
     def get_next_control_by_id(self, control_id: str):
-        search_collection = self.get_control_ids()
-        try:
-            next_idx = search_collection.index(control_id) + 1
-            return search_collection[next_idx]
-        except ValueError:
+        if next_id := self._next_ids.get(control_id):
+            return next_id
+
+        if control_id in self._control_positions:  # control_id was at the end of the list
+            logger.info("No new controls.")
+        else:
             logger.warning(
                 "Cannot determine next control. Provided control does not exist in catalog(s): %s", control_id
             )
-            return ""
-        except IndexError:  # control_id was at the end of the list
-            logger.info("No new controls.")
-            return ""
+        return ""
+
+    def get_previous_control_by_id(self, control_id: str) -> str:
+        return self._previous_ids.get(control_id, "")
 
     def get_control_statement(self, control: dict) -> List:
         statement = self.get_control_part_by_name(control, "statement")
@@ -204,11 +339,7 @@ class CatalogTools:
         return part
 
     def get_resource_by_uuid(self, uuid: str) -> dict:
-        resource: dict = {}
-        if "back-matter" in self.oscal and "resources" in self.oscal.get("back-matter"):
-            resources = self.oscal.get("back-matter").get("resources")
-            resource = self.find_dict_by_value(resources, "uuid", uuid)
-        return resource
+        return self._resources_by_uuid.get(uuid, {})
 
     @staticmethod
     def __get_control_parameter_values(control) -> dict:
@@ -231,7 +362,6 @@ class CatalogTools:
     def get_control_data_simplified(self, control_id) -> dict:
         control = self.get_control_by_id(control_id)
         family_id = self.get_group_id_by_control_id(control_id)
-        desc = self.get_control_statement(control)
         implementation = self.get_control_part_by_name(control, "implementation")
         guidance = self.get_control_part_by_name(control, "guidance")
         control_data = {
@@ -239,7 +369,7 @@ class CatalogTools:
             "sort_id": self.get_control_property_by_name(control, "sort-id"),
             "title": control.get("title"),
             "family": self.get_group_title_by_id(family_id),
-            "description": self.__get_simplified_prose(desc),
+            "description": self.__get_simplified_prose(control),
             "implementation": implementation.get("prose") if implementation else "",
             "guidance": guidance.get("prose") if guidance else "",
             "next_id": self.get_next_control_by_id(control_id),
@@ -247,20 +377,84 @@ class CatalogTools:
 
         return control_data
 
-    @staticmethod
-    def __get_simplified_prose(prose: list):
-        """"""
-        if prose:
-            text = prose[0]
-            key = list(text.get("prose").keys())[0]
-            return text.get("prose").get(key)
+    def get_control_fields(self, control_id: str, fields: Iterable[str]) -> dict:
+        """Return the requested CONTROL_FIELDS of a control.
+
+        "description" is the statement as returned by get_control_statement; the other fields match
+        get_control_data_simplified.
+        """
+        control = self.get_control_by_id(control_id)
+        getters = {
+            "title": lambda: control.get("title"),
+            "label": lambda: self.get_control_property_by_name(control, "label"),
+            "sort_id": lambda: self.get_control_property_by_name(control, "sort-id"),
+            "family": lambda: self.get_group_title_by_id(self.get_group_id_by_control_id(control_id)),
+            "description": lambda: self.get_control_statement(control),
+            "implementation": lambda: (self.get_control_part_by_name(control, "implementation") or {}).get("prose", ""),
+            "guidance": lambda: (self.get_control_part_by_name(control, "guidance") or {}).get("prose", ""),
+            "next_id": lambda: self.get_next_control_by_id(control_id),
+        }
+        return {field: getters[field]() for field in fields}
+
+    def __get_simplified_prose(self, control: dict) -> Optional[str]:
+        """Return the prose of the first part of a control statement."""
+        statement = self.get_control_part_by_name(control, "statement")
+        if statement and (parts := statement.get("parts")):
+            return parts[0].get("prose")
+        return None
 
     @property
     def catalog_title(self) -> str:
-        metadata = self.oscal.get("metadata", {})
+        metadata = self._meta.get("metadata", {})
         return metadata.get("title", "")
 
 
+class _SnapshotControls(Mapping):
+    """Control lookup backed by a snapshot, decoding and memoizing each control the first time it is read."""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self._snapshot = snapshot
+        self._children = {
+            control_id: child_ids for _, controls in snapshot.outline for control_id, child_ids in controls
+        }
+        self._decoded: Dict[str, dict] = {}
+
+    def __getitem__(self, control_id: str) -> dict:
+        if (control := self._decoded.get(control_id)) is not None:
+            return control
+        if control_id not in self._snapshot:
+            raise KeyError(control_id)
+
+        control = self._snapshot.control(control_id)
+        if child_ids := self._children.get(control_id):
+            control["controls"] = [self[child_id] for child_id in child_ids]
+        return self._decoded.setdefault(control_id, control)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._snapshot)
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+
+class _CompactControls(Mapping):
+    """Control lookup backed by a compact catalog, rebuilding the control dict each time it is read."""
+
+    def __init__(self, compact: CompactCatalog):
+        self._compact = compact
+
+    def __getitem__(self, control_id: str) -> dict:
+        if control_id not in self._compact:
+            raise KeyError(control_id)
+        return self._compact.control_dict(control_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._compact.control_ids)
+
+    def __len__(self) -> int:
+        return len(self._compact)
+
+
 class CatalogLoadError(ValueError):
     pass
 
@@ -0,0 +1,373 @@
+"""Compact, read-only in-memory form of a catalog.
+
+Parsed catalogs stay in every worker's catalog cache. Held as nested dicts, each of the tens of thousands of parts and
+props in a baseline carries its own hash table and its own references to keys such as "name" and "prose". Here
+controls, parameters and parts are ``__slots__`` records, identical props are shared tuples, and every string is
+interned, so a label, class or statement that appears in several catalogs is stored once per process.
+
+Records are only read. ``control_dict`` and ``to_catalog`` rebuild the original OSCAL structures on demand for the
+callers that need dicts.
+"""
+import copy
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from catalogs.baselines import BaselineProfile, read_profile
+from catalogs.snapshot import CatalogSnapshot
+from ratoapi.cache import load_catalog_file
+from ratoapi.oscal.catalog import ProseTemplate
+
+# Shared key tuples, so records with the same keys in the same order reference a single tuple.
+_KEY_ORDERS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _keys(item: dict) -> Tuple[str, ...]:
+    keys = tuple(sys.intern(key) for key in item)
+    return _KEY_ORDERS.setdefault(keys, keys)
+
+
+def _freeze(value):
+    """Intern the strings of a JSON value, keeping its structure."""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {sys.intern(key): _freeze(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_freeze(item) for item in value]
+    return value
+
+
+def _thaw(value):
+    """Return a copy of a frozen JSON value that the caller may modify."""
+    if isinstance(value, dict):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _extra(item: dict, modelled: Tuple[str, ...]) -> Optional[dict]:
+    extra = {key: value for key, value in item.items() if key not in modelled}
+    return _freeze(extra) if extra else None
+
+
+class Prop(NamedTuple):
+    """A property, shared by every part and control that has an identical one."""
+
+    keys: Tuple[str, ...]
+    values: tuple
+
+    def get(self, key: str, default=None):
+        try:
+            return self.values[self.keys.index(key)]
+        except ValueError:
+            return default
+
+    def to_dict(self) -> dict:
+        return {key: _thaw(value) for key, value in zip(self.keys, self.values)}
+
+
+class Part:
+    __slots__ = ("keys", "id", "name", "prose", "props", "parts", "extra")
+
+    _MODELLED = ("id", "name", "prose", "props", "parts")
+
+    def __init__(self, item: dict, catalog: "CompactCatalog"):
+        self.keys = _keys(item)
+        self.id = catalog.intern(item.get("id"))
+        self.name = catalog.intern(item.get("name"))
+        self.prose = catalog.intern(item.get("prose"))
+        self.props = catalog.props(item.get("props"))
+        self.parts = tuple(Part(part, catalog) for part in item.get("parts") or ())
+        self.extra = _extra(item, self._MODELLED)
+
+    @property
+    def label(self) -> str:
+        """The label prop, or the part id, as CatalogModel parts report it."""
+        return _prop_value(self.props, "label", self.id)
+
+    def to_dict(self) -> dict:
+        return _to_dict(
+            self,
+            props=lambda: [prop.to_dict() for prop in self.props],
+            parts=lambda: [part.to_dict() for part in self.parts],
+        )
+
+
+class Param:
+    __slots__ = ("keys", "id", "label", "extra")
+
+    _MODELLED = ("id", "label")
+
+    def __init__(self, item: dict, catalog: "CompactCatalog"):
+        self.keys = _keys(item)
+        self.id = catalog.intern(item.get("id"))
+        self.label = catalog.intern(item.get("label"))
+        self.extra = _extra(item, self._MODELLED)
+
+    @property
+    def text(self) -> Optional[str]:
+        """The catalog value of the parameter, as ``Parameter.get_odp_text`` renders it."""
+        extra = self.extra or {}
+        if guidelines := extra.get("guidelines"):
+            return " ".join(guideline.get("prose") for guideline in guidelines)
+        if (select := extra.get("select")) is not None:
+            text = ""
+            if how_many := select.get("how-many"):
+                text += f"Selection ({how_many.replace('-', ' ')}): "
+            if choice := select.get("choice"):
+                text += ", ".join(choice)
+            return text
+        if values := extra.get("values"):
+            return " ".join(values)
+        return self.label
+
+    def to_dict(self) -> dict:
+        return _to_dict(self)
+
+
+class ControlRecord:
+    __slots__ = ("keys", "id", "title", "group", "props", "params", "parts", "children", "extra")
+
+    _MODELLED = ("id", "title", "props", "params", "parts", "controls")
+
+    def __init__(self, item: dict, group: int, catalog: "CompactCatalog"):
+        self.keys = _keys(item)
+        self.id = catalog.intern(item.get("id"))
+        self.title = catalog.intern(item.get("title"))
+        self.group = group
+        self.props = catalog.props(item.get("props"))
+        self.params = tuple(Param(param, catalog) for param in item.get("params") or ())
+        self.parts = tuple(Part(part, catalog) for part in item.get("parts") or ())
+        self.children = tuple(catalog.intern(child.get("id")) for child in item.get("controls") or ())
+        self.extra = _extra(item, self._MODELLED)
+
+    def part(self, name: str) -> Optional[Part]:
+        return next((part for part in self.parts if part.name == name), None)
+
+    def prop(self, name: str, default=None):
+        return _prop_value(self.props, name, default)
+
+
+def _prop_value(props: Tuple[Prop, ...], name: str, default=None):
+    prop = next((prop for prop in props if prop.get("name") == name), None)
+    return default if prop is None else prop.get("value")
+
+
+def _to_dict(record, **nested) -> dict:
+    data = {}
+    for key in record.keys:
+        if key in nested:
+            data[key] = nested[key]()
+        elif key in record._MODELLED:  # pylint: disable=protected-access
+            data[key] = getattr(record, key)
+        else:
+            data[key] = _thaw(record.extra[key])
+    return data
+
+
+class CompactCatalog:
+    """A catalog held as compact records, with the lookups and summaries that CatalogTools and CatalogModel offer."""
+
+    def __init__(self, catalog: dict):
+        self._props: Dict[tuple, Prop] = {}
+
+        self.meta = _freeze({key: value for key, value in catalog.items() if key != "groups"})
+        self.groups: List[dict] = []
+        self.controls: Dict[str, ControlRecord] = {}
+        self.outline: List[Tuple[int, Tuple[str, ...]]] = []
+
+        for group in catalog.get("groups") or ():
+            position = len(self.groups)
+            self.groups.append(_freeze({key: value for key, value in group.items() if key != "controls"}))
+            top_level = []
+            for item in group.get("controls") or ():
+                top_level.append(self.intern(item.get("id")))
+                for control in (item, *(item.get("controls") or ())):
+                    record = ControlRecord(control, position, self)
+                    self.controls.setdefault(record.id, record)
+            self.outline.append((position, tuple(top_level)))
+
+        self.control_ids: Tuple[str, ...] = tuple(self.controls)
+        self._ordinals = {control_id: ordinal for ordinal, control_id in enumerate(self.control_ids)}
+        # Only needed while building.
+        del self._props
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], catalog_pk: Optional[int] = None) -> "CompactCatalog":
+        """Return the compact catalog for a file, reusing the shared catalog cache while the file is unchanged."""
+        return load_catalog_file(path, cls._load, kind="catalog-compact", catalog_pk=catalog_pk)
+
+    @classmethod
+    def _load(cls, path: Path) -> "CompactCatalog":
+        if profile := read_profile(path):
+            return cls.from_file(profile.catalog_path).select(profile)
+        return cls(cls._catalog_data(path))
+
+    @staticmethod
+    def _catalog_data(path: Path) -> dict:
+        if snapshot := CatalogSnapshot.open_fresh(path):
+            try:
+                return snapshot.to_catalog()
+            finally:
+                snapshot.close()
+
+        with open(path, "r") as file:
+            data = json.load(file)
+        return data.get("catalog", data)
+
+    def select(self, profile: BaselineProfile) -> "CompactCatalog":
+        """Return the baseline a profile selects, sharing group dicts and control records with this catalog.
+
+        Only controls that lose enhancements or get other parameter values are copied, and the copies share their parts.
+        """
+        selected = frozenset(profile.control_ids)
+        resources = {resource["uuid"]: resource for resource in self.meta.get("back-matter", {}).get("resources", [])}
+        meta = {"uuid": profile.uuid, "metadata": profile.metadata}
+        if profile.resource_uuids:
+            meta["back-matter"] = {
+                "resources": [resources[uuid] for uuid in profile.resource_uuids if uuid in resources]
+            }
+
+        baseline = CompactCatalog.__new__(CompactCatalog)
+        baseline.meta = _freeze(meta)
+        baseline.groups = self.groups
+        baseline.controls = {}
+        baseline.outline = []
+        for position, top_level in self.outline:
+            top_level = tuple(control_id for control_id in top_level if control_id in selected)
+            for control_id in top_level:
+                for record in (self.controls[control_id], *map(self.controls.get, self.controls[control_id].children)):
+                    if record.id in selected:
+                        baseline.controls[record.id] = baseline._select(record, selected, profile.set_parameters)
+            baseline.outline.append((position, top_level))
+
+        baseline.control_ids = tuple(baseline.controls)
+        baseline._ordinals = {control_id: ordinal for ordinal, control_id in enumerate(baseline.control_ids)}
+        return baseline
+
+    def _select(self, record: ControlRecord, selected: frozenset, set_parameters: Dict[str, dict]) -> ControlRecord:
+        children = tuple(child for child in record.children if child in selected)
+        overridden = any(param.id in set_parameters for param in record.params)
+        if children == record.children and not overridden:
+            return record
+
+        record = copy.copy(record)
+        record.children = children
+        if not children:
+            keys = tuple(key for key in record.keys if key != "controls")
+            record.keys = _KEY_ORDERS.setdefault(keys, keys)
+        if overridden:
+            record.params = tuple(
+                Param({**param.to_dict(), **set_parameters[param.id]}, self) if param.id in set_parameters else param
+                for param in record.params
+            )
+        return record
+
+    @staticmethod
+    def intern(value):
+        return sys.intern(value) if isinstance(value, str) else value
+
+    def props(self, items: Optional[list]) -> Tuple[Prop, ...]:
+        props = []
+        for item in items or ():
+            prop = Prop(_keys(item), tuple(_freeze(value) for value in item.values()))
+            try:
+                prop = self._props.setdefault(prop, prop)
+            except TypeError:  # Unhashable values, such as nested links; keep the prop unshared.
+                pass
+            props.append(prop)
+        return tuple(props)
+
+    @property
+    def title(self) -> str:
+        return self.meta.get("metadata", {}).get("title", "")
+
+    def __contains__(self, control_id: str) -> bool:
+        return control_id in self.controls
+
+    def __len__(self) -> int:
+        return len(self.controls)
+
+    def group_of(self, control_id: str) -> dict:
+        return self.groups[self.controls[control_id].group]
+
+    def next_id(self, control_id: str) -> str:
+        ordinal = self._ordinals[control_id] + 1
+        return self.control_ids[ordinal] if ordinal < len(self.control_ids) else ""
+
+    # Dicts, for CatalogTools
+    def control_dict(self, control_id: str) -> dict:
+        """Rebuild the OSCAL dict of a control, including its enhancements."""
+        record = self.controls[control_id]
+        return _to_dict(
+            record,
+            props=lambda: [prop.to_dict() for prop in record.props],
+            params=lambda: [param.to_dict() for param in record.params],
+            parts=lambda: [part.to_dict() for part in record.parts],
+            controls=lambda: [self.control_dict(child_id) for child_id in record.children],
+        )
+
+    def to_catalog(self) -> dict:
+        """Rebuild the whole OSCAL catalog object."""
+        catalog = _thaw(self.meta)
+        catalog["groups"] = []
+        for position, control_ids in self.outline:
+            group = _thaw(self.groups[position])
+            if control_ids:
+                group["controls"] = [self.control_dict(control_id) for control_id in control_ids]
+            catalog["groups"].append(group)
+        return catalog
+
+    # Summaries, for CatalogModel
+    def parameters(self, control_id: str) -> dict:
+        return {param.id: param.text for param in self.controls[control_id].params}
+
+    def statement_prose(self, control_id: str) -> str:
+        """The statement prose with labelled sub-parts, as ``Control.statement_template`` compiles it."""
+        prose: List[str] = []
+
+        def _collect(part: Part, depth: int):
+            if part.prose:
+                tabs = "\t" * depth
+                prose.append(part.prose if part.name == "statement" else f"\n{tabs}{part.label} {part.prose}")
+            for child in part.parts:
+                _collect(child, depth + 1)
+
+        if statement := self.controls[control_id].part("statement"):
+            _collect(statement, 0)
+        return "".join(prose)
+
+    def control_summary(self, control_id: str) -> dict:
+        return self.control_summaries([control_id])[control_id]
+
+    def control_summaries(self, control_ids: Iterable[str]) -> Dict[str, dict]:
+        """Return the same summaries as ``CatalogModel.control_summaries``. Unknown ids are skipped."""
+        summaries = {}
+        for control_id in control_ids:
+            if (record := self.controls.get(control_id)) is None:
+                continue
+
+            implementation, guidance = record.part("implementation"), record.part("guidance")
+            summaries[control_id] = {
+                "label": record.prop("label", record.id),
+                "sort_id": record.prop("sort-id", record.title),
+                "title": record.title,
+                "family": self.group_of(control_id).get("title"),
+                "description": ProseTemplate.compile(self.statement_prose(control_id)).render(
+                    self.parameters(control_id)
+                ),
+                "implementation": _part_prose(implementation),
+                "guidance": _part_prose(guidance),
+                "next_id": self.next_id(control_id),
+            }
+
+        return summaries
+
+
+def _part_prose(part: Optional[Part]) -> Optional[str]:
+    if part is None:
+        return ""
+    return part.prose if "prose" in part.keys else ""
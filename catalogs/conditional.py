@@ -0,0 +1,122 @@
+"""Conditional GET and precompressed responses for catalog endpoints.
+
+Catalog content only changes when a Catalog row or its file changes, so responses carry strong ETags derived from the
+file's SHA-256 and the row's ``updated`` timestamp. A matching ``If-None-Match`` is answered with a 304 before the
+catalog file is opened. Large bodies are gzip-compressed once per catalog version and served to clients that accept
+gzip; other clients get the uncompressed stream. gzip is the only coding offered, as it needs no extra dependency.
+"""
+import gzip
+import hashlib
+import logging
+from typing import Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from rest_framework.request import Request
+
+from catalogs.baselines import catalog_digest
+from catalogs.models import Catalog
+from ratoapi.cache import BoundedCache
+
+logger = logging.getLogger(__name__)
+
+IDENTITY = "identity"
+
+# Offered content codings, best first.
+_COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0),
+}
+
+compressed_cache = BoundedCache(
+    "compressed-catalog-responses", maxsize=getattr(settings, "CATALOG_RESPONSE_CACHE_SIZE", 16)
+)
+# Digests of catalog files that have no hash recorded at ingest, by catalog and file.
+file_digests = BoundedCache("catalog-file-digests", maxsize=getattr(settings, "CATALOG_RESPONSE_CACHE_SIZE", 16))
+
+
+def content_hash(catalog: Catalog) -> str:
+    """Return the SHA-256 of a catalog's file; for a baseline profile it also covers the catalog it imports.
+
+    Catalogs ingested without a hash get one computed here and kept in memory only. ``Catalog.content_hash`` marks the
+    file as validated at ingest, so it must not be filled in from an unvalidated file.
+    """
+    if catalog.content_hash:
+        return catalog.content_hash
+    return file_digests.get_or_load(
+        catalog.pk, lambda: catalog_digest(catalog.file_name.path).hex(), version=catalog.file_name.name
+    )
+
+
+def catalog_version(catalog: Catalog) -> str:
+    updated = catalog.updated.timestamp() if catalog.updated else 0
+    return f"{content_hash(catalog)[:32]}-{updated:.6f}"
+
+
+def catalog_list_version(rows: Iterable[tuple]) -> str:
+    """Return a version for a collection of catalogs from the values their representation is built from."""
+    return hashlib.sha256(repr(list(rows)).encode("utf-8")).hexdigest()[:32]
+
+
+def make_etag(version: str, encoding: str = IDENTITY) -> str:
+    """Return a strong ETag for a version of a resource; each content coding gets a distinct tag."""
+    return f'"{version}"' if encoding == IDENTITY else f'"{version}-{encoding}"'
+
+
+def negotiate_encoding(request: Request) -> str:
+    """Pick the best available content coding accepted by the client."""
+    accepted = {}
+    for item in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    for coding in _COMPRESSORS:
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return IDENTITY
+
+
+def not_modified(request: Request, etag: str, negotiated: bool = False) -> Optional[HttpResponseBase]:
+    """Return a 304 response if the client already holds the representation with this ETag."""
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        finalize(response, etag, negotiated)
+    return response
+
+
+def finalize(response: HttpResponseBase, etag: str, negotiated: bool = False) -> HttpResponseBase:
+    """Set the validator and caching headers shared by every catalog response.
+
+    Clients must revalidate before reusing a stored copy, which costs a 304 while the catalog is unchanged.
+    ``negotiated`` marks responses whose content coding depends on Accept-Encoding.
+    """
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True)
+    if negotiated:
+        patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def compressed_response(
+    request: Request, version: str, encoding: str, render: Callable[[], bytes], content_type: str
+) -> HttpResponse:
+    """Serve a body compressed with encoding, compressing it only once per resource version."""
+    key = (request.path, request.META.get("QUERY_STRING", ""), encoding)
+    body = compressed_cache.get(key, version)
+    if body is None:
+        body = _COMPRESSORS[encoding](render())
+        compressed_cache.set(key, body, version)
+        logger.debug("Compressed %s (%s) for version %s", request.path, encoding, version)
+
+    response = HttpResponse(body, content_type=content_type)
+    response["Content-Encoding"] = encoding
+    return response
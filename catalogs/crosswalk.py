@@ -0,0 +1,122 @@
+"""Crosswalk of control ids between successive catalog versions.
+
+A catalog marks the controls its version withdrew with a ``status`` prop of ``withdrawn``, and links each to the
+controls that took it over with ``incorporated-into`` or ``moved-to``. A control that is still live in the next version
+maps to itself, as ``renamed`` when its title changed. Controls that the next version's catalogs do not mention at all,
+such as enhancements left out of a resolved baseline, get no row.
+
+Resolved baselines leave withdrawn controls out, so the controls a version withdrew are also read from a checked-in
+table (``WITHDRAWN_TABLES``) in the same form. A control listed there is mapped even when no loaded catalog of either
+version has it.
+"""
+import itertools
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from django.db import transaction
+
+from catalogs.catalogio import CatalogTools
+from catalogs.models import Catalog, ControlCrosswalk
+
+logger = logging.getLogger(__name__)
+
+# The version each catalog version was superseded by.
+SUCCESSORS = {Catalog.Version.NIST_SP80053R4: Catalog.Version.NIST_SP80053R5}
+
+WITHDRAWN_LINKS = (ControlCrosswalk.Relation.INCORPORATED_INTO, ControlCrosswalk.Relation.MOVED_TO)
+
+# The controls each catalog version withdrew, as withdrawn OSCAL controls titled as in the previous version.
+WITHDRAWN_TABLES = {
+    Catalog.Version.NIST_SP80053R5: Path(__file__).parent / "data/NIST_SP80053/r5/NIST_SP-800-53_rev5_withdrawn.json",
+}
+
+
+class VersionControls(NamedTuple):
+    """The controls of every catalog of a version: live control titles, and the links of withdrawn controls."""
+
+    live: Dict[str, str]
+    withdrawn: Dict[str, List[Tuple[str, str]]]
+
+
+def version_controls(controls: Iterable[dict]) -> VersionControls:
+    result = VersionControls({}, {})
+    for control in controls:
+        control_id = control.get("id")
+        props = {prop.get("name"): prop.get("value") for prop in control.get("props", [])}
+        if str(props.get("status", "")).lower() != "withdrawn":
+            result.live.setdefault(control_id, control.get("title", ""))
+            continue
+
+        links = result.withdrawn.setdefault(control_id, [])
+        for link in control.get("links", []):
+            if link.get("rel") in WITHDRAWN_LINKS:
+                # Links point at a control or one of its parts, for example "#ac-2_smt.k".
+                target = (link["rel"], link.get("href", "").lstrip("#").split("_")[0])
+                if target[1] and target not in links:
+                    links.append(target)
+    return result
+
+
+def withdrawn_controls(version: str) -> List[dict]:
+    """Return the controls a version withdrew, from its withdrawn table."""
+    if version not in WITHDRAWN_TABLES:
+        return []
+    with open(WITHDRAWN_TABLES[version], "r") as file:
+        return json.load(file)["withdrawn"]["controls"]
+
+
+def _catalog_controls(version: str) -> Iterable[dict]:
+    for catalog in Catalog.objects.filter(version=version).order_by("pk"):
+        yield from CatalogTools.from_file(catalog.file_name.path, catalog_pk=catalog.pk).get_controls_all()
+
+
+def crosswalk_rows(
+    source_version: str, source: VersionControls, target_version: str, target: VersionControls
+) -> List[dict]:
+    """Return the ControlCrosswalk field values mapping every live source control to its target controls."""
+    rows = []
+    for source_id, title in source.live.items():
+        if source_id in target.live:
+            same = title.strip().casefold() == target.live[source_id].strip().casefold()
+            relations = [(ControlCrosswalk.Relation.SAME if same else ControlCrosswalk.Relation.RENAMED, source_id)]
+        elif source_id in target.withdrawn:
+            relations = target.withdrawn[source_id] or [(ControlCrosswalk.Relation.WITHDRAWN, "")]
+        else:
+            continue
+
+        rows.extend(
+            {
+                "source_version": source_version,
+                "source_id": source_id,
+                "target_version": target_version,
+                "target_id": target_id,
+                "relation": relation,
+            }
+            for relation, target_id in relations
+        )
+    return rows
+
+
+def rebuild_crosswalks(version: str) -> int:
+    """Rebuild the crosswalks from and to a catalog version from the catalogs now loaded. Returns the rows written."""
+    pairs = [(source, target) for source, target in SUCCESSORS.items() if version in (source, target)]
+    written = 0
+    for source_version, target_version in pairs:
+        withdrawn = withdrawn_controls(target_version)
+        # The withdrawn controls were live in the source version, under their listed titles.
+        previous = ({"id": control["id"], "title": control["title"]} for control in withdrawn)
+        rows = crosswalk_rows(
+            source_version,
+            version_controls(itertools.chain(_catalog_controls(source_version), previous)),
+            target_version,
+            version_controls(itertools.chain(_catalog_controls(target_version), withdrawn)),
+        )
+        with transaction.atomic():
+            ControlCrosswalk.objects.filter(source_version=source_version, target_version=target_version).delete()
+            ControlCrosswalk.objects.bulk_create([ControlCrosswalk(**row) for row in rows], batch_size=1000)
+
+        logger.info("Rebuilt the %s to %s crosswalk: %s rows", source_version, target_version, len(rows))
+        written += len(rows)
+    return written
@@ -0,0 +1,133 @@
+import logging
+from typing import List, NamedTuple, Optional
+
+from django.db import transaction
+
+from catalogs.crosswalk import rebuild_crosswalks
+from catalogs.models import Catalog, Controls
+from catalogs.parsing import CONTENT_FIELDS, ParsedCatalog, parse_catalog_file
+from catalogs.search import update_search_vectors
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = ("family", "description", "implementation", "guidance", "ordinal", "next_id")
+SORT_FIELDS = ("family_ordinal", "number", "enhancement")
+POSITION_FIELDS = ("ordinal", "next_id", *SORT_FIELDS)
+
+
+class SyncReport(NamedTuple):
+    """Control ids touched by a re-ingest, by kind of change."""
+
+    added: List[str]
+    updated: List[str]
+    reordered: List[str]
+    retired: List[str]
+    unchanged: List[str]
+
+    def __str__(self) -> str:
+        return ", ".join(f"{len(ids)} {kind}" for kind, ids in self._asdict().items())
+
+
+def create_controls(catalog: Catalog, parsed: Optional[ParsedCatalog] = None):
+    """Create the Controls rows, including rendered summaries, for a newly ingested Catalog, and update the crosswalks.
+
+    ``parsed`` lets callers that already parsed the catalog file, possibly in another process, skip parsing it again.
+    """
+    if parsed is None:
+        parsed = parse_catalog_file(catalog.file_name.path, catalog_pk=catalog.pk)
+
+    with transaction.atomic():
+        Controls.objects.bulk_create([Controls(catalog=catalog, **row) for row in parsed.rows])
+        update_search_vectors(Controls.objects.filter(catalog=catalog))
+        _store_catalog_metadata(catalog, parsed)
+        rebuild_crosswalks(catalog.version)
+
+
+def rebuild_control_summaries(catalog: Catalog) -> int:
+    """Re-render the stored control summaries of a Catalog from its file. Returns the number of rows updated."""
+    parsed = parse_catalog_file(catalog.file_name.path, catalog_pk=catalog.pk)
+    rows = {row["control_id"]: row for row in parsed.rows}
+
+    fields = (*SUMMARY_FIELDS, *SORT_FIELDS, "param_labels", "content_hash")
+    controls = list(Controls.objects.filter(catalog=catalog, control_id__in=rows))
+    for control in controls:
+        for field in fields:
+            setattr(control, field, rows[control.control_id][field])
+
+    with transaction.atomic():
+        Controls.objects.bulk_update(controls, fields, batch_size=500)
+        update_search_vectors(Controls.objects.filter(catalog=catalog))
+        _store_catalog_metadata(catalog, parsed)
+
+    logger.info("Rebuilt %s control summaries for catalog %s", len(controls), catalog)
+    return len(controls)
+
+
+def sync_controls(catalog: Catalog, parsed: Optional[ParsedCatalog] = None) -> SyncReport:
+    """Bring the Controls rows of a Catalog in line with its current file, writing only the rows that changed.
+
+    Controls missing from the file are retired rather than deleted, so the ProjectControl rows that reference them are
+    left intact. A retired control that reappears is restored and counted as updated. Added controls are added to the
+    projects that use the catalog, not started.
+    """
+    if parsed is None:
+        parsed = parse_catalog_file(catalog.file_name.path, catalog_pk=catalog.pk)
+
+    existing = {control.control_id: control for control in Controls.objects.filter(catalog=catalog)}
+    report = SyncReport([], [], [], [], [])
+    added, updated, reordered = [], [], []
+
+    for row in parsed.rows:
+        control = existing.pop(row["control_id"], None)
+        if control is None:
+            added.append(Controls(catalog=catalog, **row))
+            report.added.append(row["control_id"])
+        elif control.content_hash != row["content_hash"] or control.retired:
+            for field in (*CONTENT_FIELDS, *POSITION_FIELDS, "content_hash"):
+                setattr(control, field, row[field])
+            control.retired = False
+            updated.append(control)
+            report.updated.append(control.control_id)
+        elif any(getattr(control, field) != row[field] for field in POSITION_FIELDS):
+            for field in POSITION_FIELDS:
+                setattr(control, field, row[field])
+            reordered.append(control)
+            report.reordered.append(control.control_id)
+        else:
+            report.unchanged.append(control.control_id)
+
+    retired = [control for control in existing.values() if not control.retired]
+    report.retired.extend(control.control_id for control in retired)
+
+    with transaction.atomic():
+        Controls.objects.bulk_create(added, batch_size=500)
+        _add_to_projects(catalog, added)
+        Controls.objects.bulk_update(
+            updated, (*CONTENT_FIELDS, *POSITION_FIELDS, "content_hash", "retired"), batch_size=500
+        )
+        Controls.objects.bulk_update(reordered, POSITION_FIELDS, batch_size=500)
+        Controls.objects.filter(pk__in=[control.pk for control in retired]).update(retired=True)
+        update_search_vectors(
+            Controls.objects.filter(catalog=catalog, control_id__in=[*report.added, *report.updated])
+        )
+        _store_catalog_metadata(catalog, parsed)
+        rebuild_crosswalks(catalog.version)
+
+    logger.info("Synced controls for catalog %s: %s", catalog, report)
+    return report
+
+
+def _add_to_projects(catalog: Catalog, controls: List[Controls]):
+    # catalogs does not depend on projects, so the ProjectControl model is reached through the relation.
+    ProjectControl = Controls.project_controls.through
+    project_ids = list(catalog.projects_catalog.values_list("pk", flat=True))
+    ProjectControl.objects.bulk_create(
+        [ProjectControl(project_id=project_id, control=control) for project_id in project_ids for control in controls],
+        batch_size=500,
+    )
+
+
+def _store_catalog_metadata(catalog: Catalog, parsed: ParsedCatalog):
+    catalog.title = parsed.title
+    catalog.content_hash = parsed.content_hash
+    Catalog.objects.filter(pk=catalog.pk).update(title=catalog.title, content_hash=catalog.content_hash)
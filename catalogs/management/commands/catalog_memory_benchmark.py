@@ -0,0 +1,97 @@
+import gc
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalogs.catalogio import CatalogTools
+from catalogs.compact import CompactCatalog
+from ratoapi.cache import catalog_cache
+from ratoapi.oscal.catalog import CatalogModel
+
+MIB = 1024 * 1024
+
+
+def _catalog_dicts(path: Path):
+    return CatalogTools.from_file(path)
+
+
+def _catalog_model(path: Path):
+    return CatalogModel.from_json(path)
+
+
+def _compact(path: Path):
+    return CompactCatalog.from_file(path)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the memory each worker holds for parsed catalogs: the current dict (CatalogTools) and pydantic "
+        "(CatalogModel) representations against the compact one."
+    )
+
+    representations: Dict[str, Callable[[Path], object]] = {
+        "CatalogTools": _catalog_dicts,
+        "CatalogModel": _catalog_model,
+        "Compact": _compact,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--catalog-file",
+            action="append",
+            dest="catalog_files",
+            help="Catalog JSON file to measure. May be repeated; defaults to the shipped NIST SP 800-53 baselines.",
+        )
+
+    def handle(self, *args, **options):
+        if options["catalog_files"]:
+            paths = [Path(path) for path in options["catalog_files"]]
+        else:
+            paths = sorted(Path(__file__).parents[2].joinpath("data/NIST_SP80053").rglob("*baseline_profile.json"))
+
+        if missing := [str(path) for path in paths if not path.is_file()]:
+            raise CommandError(f"Catalog files not found: {', '.join(missing)}")
+
+        results = {name: self._measure(load, paths) for name, load in self.representations.items()}
+
+        width = max(len(path.name) for path in paths + [Path("Total")])
+        self.stdout.write(
+            f"{'Catalog':<{width}}  {'CatalogTools':>12}  {'CatalogModel':>12}  "
+            f"{'Current':>9}  {'Compact':>9}  {'Saved':>6}"
+        )
+        for index, name in enumerate([path.name for path in paths] + ["Total"]):
+            tools, model, compact = (
+                sizes[index] if index < len(paths) else sum(sizes) for sizes in results.values()
+            )
+            current = tools + model
+            self.stdout.write(
+                f"{name:<{width}}  {tools / MIB:>9.1f}MiB  {model / MIB:>9.1f}MiB  {current / MIB:>6.1f}MiB  "
+                f"{compact / MIB:>6.1f}MiB  {1 - compact / current:>6.0%}"
+            )
+
+    @staticmethod
+    def _measure(load: Callable[[Path], object], paths: List[Path]) -> List[int]:
+        """Load the catalogs one after another and return the memory each one adds while the others stay loaded.
+
+        The catalogs are loaded through the catalog cache and kept together, as in a worker, so strings and full
+        catalogs shared between baselines are only counted for the first catalog that uses them.
+        """
+        loaded = []
+        sizes = []
+        catalog_cache.clear()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            for path in paths:
+                before = tracemalloc.get_traced_memory()[0]
+                loaded.append(load(path))
+                gc.collect()
+                sizes.append(tracemalloc.get_traced_memory()[0] - before)
+        finally:
+            tracemalloc.stop()
+            loaded.clear()
+            catalog_cache.clear()
+            gc.collect()
+        return sizes
@@ -1,12 +1,21 @@
+import multiprocessing
+import os
 import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
 
 from django.core.files import File
 from django.core.management.base import BaseCommand, CommandError
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 
+from catalogs.baselines import read_profile, store_profile
 from catalogs.models import Catalog
+from catalogs.parsing import ParsedCatalog, parse_catalog_files
+from catalogs.snapshot import write_snapshot
+
+CatalogDefinition = Tuple[Path, str, Dict[str, str]]
 
 
 class Command(BaseCommand):
@@ -19,10 +28,16 @@ class Command(BaseCommand):
         parser.add_argument("--source", type=str, default=None)
         parser.add_argument("--catalog-version", type=str, default=None)
         parser.add_argument("--load-standard-catalogs", action="store_true")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of processes used to parse catalog files. Defaults to one per CPU; 1 parses in-process.",
+        )
 
     def handle(self, *args, **options):
         if options["load_standard_catalogs"]:
-            self._load_standards()
+            definitions = self._standard_definitions()
         else:
             input_file = Path(options["catalog_file"])
             name = input_name if (input_name := options["name"]) else input_file.name
@@ -33,27 +48,101 @@ class Command(BaseCommand):
                         arg if arg != "catalog_version" else "version"
                     ] = value
 
-            self._load_catalog(input_file, name, **create_kwargs)
+            definitions = [(input_file, name, create_kwargs)]
 
-    def _load_catalog(self, input_file: Path, name: str, **catalog_args):
-        if Catalog.objects.filter(name=name).exists():
-            self.stdout.write(
-                self.style.WARNING(
-                    f"Catalog, {name} has already been loaded. Skipping."
+        self._load_catalogs(definitions, options["workers"])
+
+    def _load_catalogs(self, definitions: List[CatalogDefinition], workers: Optional[int] = None):
+        """Parse catalog files in a process pool, then create each Catalog and its Controls in one transaction."""
+        pending = []
+        for input_file, name, catalog_args in definitions:
+            if Catalog.objects.filter(name=name).exists():
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"Catalog, {name} has already been loaded. Skipping."
+                    )
                 )
-            )
+            else:
+                pending.append((input_file, name, catalog_args))
+
+        if not pending:
             return
 
+        # Baselines importing the same catalog are parsed by the same worker, which parses that catalog once.
+        batches: Dict[Path, List[int]] = {}
+        for position, (input_file, _, _) in enumerate(pending):
+            profile = read_profile(input_file)
+            batches.setdefault((profile.catalog_path if profile else input_file).resolve(), []).append(position)
+
+        workers = min(workers or os.cpu_count() or 1, len(batches))
+        timings = {}
+        with self._executor(workers) as executor:
+            start = time.perf_counter()
+            parsed_catalogs: List[Optional[ParsedCatalog]] = [None] * len(pending)
+            try:
+                paths = [[str(pending[position][0]) for position in batch] for batch in batches.values()]
+                results = executor.map(parse_catalog_files, paths)
+                for batch, parsed_batch in zip(batches.values(), results):
+                    for position, parsed in zip(batch, parsed_batch):
+                        parsed_catalogs[position] = parsed
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Error loading catalog file: {exc}") from exc
+            timings["parse"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            catalogs = []
+            for (input_file, name, catalog_args), parsed in zip(pending, parsed_catalogs):
+                catalogs.append(self._create_catalog(input_file, name, parsed, **catalog_args))
+                self.stdout.write(
+                    self.style.SUCCESS(f"Successfully ingested catalog '{name}' (parsed in {parsed.seconds:.2f}s)")
+                )
+            timings["database"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            # Baselines are resolved from their stored catalog, so that is the file that gets a snapshot.
+            snapshot_paths = {}
+            for catalog in catalogs:
+                profile = read_profile(catalog.file_name.path)
+                snapshot_paths.setdefault(profile.catalog_path if profile else Path(catalog.file_name.path), catalog)
+            snapshots = [(catalog, executor.submit(write_snapshot, path)) for path, catalog in snapshot_paths.items()]
+            for catalog, snapshot in snapshots:
+                try:
+                    snapshot.result()
+                except (OSError, ValueError) as exc:
+                    self.stdout.write(
+                        self.style.WARNING(f"Could not write a snapshot for catalog '{catalog.name}': {exc}")
+                    )
+            timings["snapshots"] = time.perf_counter() - start
+
+        self.stdout.write(
+            f"Loaded {len(catalogs)} catalog(s) with {workers} worker(s): "
+            + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items())
+        )
+
+    @staticmethod
+    def _executor(workers: int) -> Executor:
+        if workers <= 1:
+            return ThreadPoolExecutor(max_workers=1)
+        # Spawned workers do not inherit the parent's database connections.
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    @staticmethod
+    def _create_catalog(input_file: Path, name: str, parsed: ParsedCatalog, **catalog_args) -> Catalog:
         try:
-            with open(input_file, mode="rb") as catalog:
-                file = File(catalog, name=input_file)
-                Catalog.objects.create(file_name=file, name=name, **catalog_args)
+            with transaction.atomic(), open(input_file, mode="rb") as file:
+                if read_profile(input_file):
+                    # The profile is stored with the catalog it imports, which its baselines share.
+                    file = store_profile(input_file, str(input_file))
+                catalog = Catalog(file_name=File(file, name=input_file), name=name, **catalog_args)
+                # Picked up by the post_save signal, so the file is not parsed a second time.
+                catalog.parsed_catalog = parsed
+                catalog.save(force_insert=True)
         except IntegrityError as exc:
             raise CommandError(f"Error in creating new catalog: {exc}") from exc
         except (IOError, FileNotFoundError) as exc:
             raise CommandError(f"Error loading catalog file: {exc}") from exc
 
-        self.stdout.write(self.style.SUCCESS(f"Successfully ingested catalog '{name}'"))
+        return catalog
 
     @staticmethod
     def _parse_standard_catalog_path(path: Path) -> Tuple[str, str, str, str]:
@@ -69,21 +158,23 @@ class Command(BaseCommand):
 
         return version, impact_level, name, source
 
-    def _load_standards(self):
-        """Load standard catalogs from catalogs/data"""
+    def _standard_definitions(self) -> List[CatalogDefinition]:
+        """Return the standard catalogs from catalogs/data"""
         catalogs_path = Path(__file__).parents[2].joinpath("data/NIST_SP80053")
-        catalog_files = list(catalogs_path.rglob("*json"))
+        catalog_files = sorted(catalogs_path.rglob("*baseline_profile.json"))
         catalog_defs = [
             self._parse_standard_catalog_path(path) for path in catalog_files
         ]
         base_path = "https://raw.githubusercontent.com/usnistgov/oscal-content/main/nist.gov/SP800-53"
-        for (version, impact_level, name, source), file in zip(
-            catalog_defs, catalog_files
-        ):
-            self._load_catalog(
-                input_file=file.relative_to(file.parents[4]),
-                name=name,
-                version=source,
-                impact_level=impact_level,
-                source=f"{base_path}/{version}/json/{source}_catalog.json",
+        return [
+            (
+                file.relative_to(file.parents[4]),
+                name,
+                {
+                    "version": source,
+                    "impact_level": impact_level,
+                    "source": f"{base_path}/{version}/json/{source}_catalog.json",
+                },
             )
+            for (version, impact_level, name, source), file in zip(catalog_defs, catalog_files)
+        ]
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalogs.ingest import rebuild_control_summaries
+from catalogs.models import Catalog
+
+
+class Command(BaseCommand):
+    help = "Re-render the control summaries stored on the Controls table from the catalog files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--catalog",
+            type=int,
+            action="append",
+            dest="catalogs",
+            help="Catalog id to rebuild. May be repeated; defaults to every catalog.",
+        )
+
+    def handle(self, *args, **options):
+        catalogs = Catalog.objects.order_by("pk")
+        if options["catalogs"]:
+            catalogs = catalogs.filter(pk__in=options["catalogs"])
+
+        for catalog in catalogs:
+            try:
+                count = rebuild_control_summaries(catalog)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Could not rebuild summaries for catalog '{catalog}': {exc}") from exc
+
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} control summaries for catalog '{catalog}'"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalogs.crosswalk import SUCCESSORS, rebuild_crosswalks
+
+
+class Command(BaseCommand):
+    help = "Rebuild the control crosswalks between catalog versions from the catalogs now loaded."
+
+    def handle(self, *args, **options):
+        for source_version, target_version in SUCCESSORS.items():
+            try:
+                count = rebuild_crosswalks(source_version)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Could not rebuild the {source_version} crosswalk: {exc}") from exc
+
+            self.stdout.write(
+                self.style.SUCCESS(f"Rebuilt the {source_version} to {target_version} crosswalk: {count} rows")
+            )
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from catalogs.baselines import read_profile, store_profile
+from catalogs.ingest import SyncReport, sync_controls
+from catalogs.models import Catalog
+
+
+class Command(BaseCommand):
+    help = "Re-ingest catalog files, writing only the Controls rows that changed, and report the changes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--catalog",
+            type=int,
+            action="append",
+            dest="catalogs",
+            help="Catalog id to re-ingest. May be repeated; defaults to every catalog.",
+        )
+        parser.add_argument(
+            "--catalog-file",
+            type=str,
+            help="New file for the catalog, for example an updated NIST release. Requires a single --catalog.",
+        )
+
+    def handle(self, *args, **options):
+        catalogs = Catalog.objects.order_by("pk")
+        if options["catalogs"]:
+            catalogs = catalogs.filter(pk__in=options["catalogs"])
+
+        if options["catalog_file"]:
+            if not options["catalogs"] or len(options["catalogs"]) != 1:
+                raise CommandError("--catalog-file requires exactly one --catalog.")
+            try:
+                catalog = catalogs.get()
+            except Catalog.DoesNotExist as exc:
+                raise CommandError(f"Catalog {options['catalogs'][0]} does not exist.") from exc
+            self._report(catalog, self._replace_file(catalog, Path(options["catalog_file"])))
+            return
+
+        for catalog in catalogs:
+            try:
+                report = sync_controls(catalog)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Could not re-ingest catalog '{catalog}': {exc}") from exc
+            self._report(catalog, report)
+
+    @staticmethod
+    def _replace_file(catalog: Catalog, input_file: Path) -> SyncReport:
+        """Save a new file on the Catalog; the catalog signals retire the old file and sync the controls."""
+        try:
+            with open(input_file, mode="rb") as file:
+                if read_profile(input_file):
+                    file = store_profile(input_file, input_file.name)
+                catalog.file_name = File(file, name=input_file.name)
+                catalog.save()
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Could not re-ingest catalog '{catalog}' from {input_file}: {exc}") from exc
+
+        return catalog.sync_report
+
+    def _report(self, catalog: Catalog, report: SyncReport):
+        self.stdout.write(self.style.SUCCESS(f"Re-ingested catalog '{catalog}': {report}"))
+        for kind in ("added", "updated", "retired"):
+            if ids := getattr(report, kind):
+                self.stdout.write(f"  {kind}: {', '.join(ids)}")
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import uuid
+from os.path import commonprefix
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalogs.baselines import read_profile, resolve_baseline, split_baselines
+
+RESOLUTION_SOURCE = "resolution-source"
+BASELINES_REMARKS = (
+    "The union of the controls selected by this revision's baselines, which the baseline profiles import. "
+    "It is not the full catalog: controls outside every baseline, and withdrawn controls, are left out."
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Split the resolved baseline catalogs of one revision into a catalog of their controls and a baseline profile "
+        "for each, and check that every profile resolves back to its baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("catalog_files", nargs="+", help="Resolved baseline catalog JSON files of one revision.")
+        parser.add_argument(
+            "--catalog-name",
+            required=True,
+            help=(
+                "File name of the catalog of baseline controls, written next to the baselines, "
+                "e.g. NIST_SP-800-53_rev5_baselines_catalog.json."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        paths = [Path(path) for path in options["catalog_files"]]
+        if missing := [str(path) for path in paths if not path.is_file()]:
+            raise CommandError(f"Catalog files not found: {', '.join(missing)}")
+
+        baselines = {}
+        for path in paths:
+            with open(path, "r") as file:
+                catalog = json.load(file)["catalog"]
+            baselines[self._profile_name(path, catalog)] = catalog
+
+        directory = paths[0].parent
+        catalog_name = options["catalog_name"]
+        # The same baselines always give the same catalog uuid, which OSCAL requires to be a version 4 uuid.
+        seed = hashlib.sha256("/".join(sorted(catalog["uuid"] for catalog in baselines.values())).encode("utf-8"))
+        full, profiles = split_baselines(
+            baselines,
+            catalog_name,
+            str(uuid.UUID(bytes=seed.digest()[:16], version=4)),
+            self._full_metadata(list(baselines.values())),
+        )
+
+        self._write(directory / catalog_name, full)
+        for name, profile in profiles.items():
+            self._write(directory / name, profile)
+
+        for name, catalog in baselines.items():
+            resolved = resolve_baseline(read_profile(directory / name), full["catalog"])
+            if resolved != catalog:
+                raise CommandError(f"{name} does not resolve to the catalog it was split from.")
+            self.stdout.write(f"Wrote {directory / name}")
+        self.stdout.write(f"Wrote {directory / catalog_name}")
+
+    @staticmethod
+    def _profile_name(path: Path, catalog: dict) -> str:
+        for link in catalog["metadata"].get("links", []):
+            if link.get("rel") == RESOLUTION_SOURCE:
+                return Path(link["href"]).name
+        return path.name.replace("-resolved-profile_catalog", "_profile")
+
+    @staticmethod
+    def _full_metadata(catalogs: list) -> dict:
+        """The metadata of the first baseline, titled with what the baseline titles share.
+
+        The catalog only has the controls of these baselines, so it is not titled or described as the full catalog.
+        """
+        metadata = {key: value for key, value in catalogs[0]["metadata"].items() if key != "links"}
+        if links := [link for link in catalogs[0]["metadata"].get("links", []) if link.get("rel") != RESOLUTION_SOURCE]:
+            metadata["links"] = links
+        titles = [catalog["metadata"]["title"] for catalog in catalogs]
+        prefix = commonprefix(titles).rsplit(" ", 1)[0] if len(titles) > 1 else titles[0]
+        metadata["title"] = f"{prefix.strip()} baseline controls"
+        metadata["last-modified"] = max(catalog["metadata"]["last-modified"] for catalog in catalogs)
+        metadata["remarks"] = BASELINES_REMARKS
+        return metadata
+
+    @staticmethod
+    def _write(path: Path, document: dict):
+        with open(path, "w") as file:
+            json.dump(document, file, indent=2, ensure_ascii=False)
+            file.write("\n")
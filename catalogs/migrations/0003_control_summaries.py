@@ -0,0 +1,54 @@
+# Generated by Django 4.1.6 on 2026-10-18 17:35
+
+"""Add the control summary columns.
+
+Existing Controls rows are left blank here, because rendering a summary needs the catalog file and the parsing
+code of the running release. Run ``manage.py rebuild_control_summaries`` after migrating to fill them.
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogs', '0002_alter_catalog_source'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalog',
+            name='title',
+            field=models.CharField(blank=True, help_text='Catalog title from the OSCAL metadata, recorded at ingest', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='controls',
+            name='description',
+            field=models.TextField(blank=True, help_text='Control statement with the catalog parameter values substituted'),
+        ),
+        migrations.AddField(
+            model_name='controls',
+            name='family',
+            field=models.CharField(blank=True, help_text='Title of the control family, for example Access Control', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='controls',
+            name='guidance',
+            field=models.TextField(blank=True, help_text='Control guidance prose'),
+        ),
+        migrations.AddField(
+            model_name='controls',
+            name='implementation',
+            field=models.TextField(blank=True, help_text='Control implementation prose'),
+        ),
+        migrations.AddField(
+            model_name='controls',
+            name='next_id',
+            field=models.CharField(blank=True, help_text='Catalog control ID of the next control in catalog order', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='controls',
+            name='ordinal',
+            field=models.PositiveIntegerField(blank=True, help_text='Position of the control in catalog order; empty until summaries are stored', null=True),
+        ),
+    ]
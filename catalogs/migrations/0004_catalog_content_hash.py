@@ -0,0 +1,41 @@
+# Generated by Django 4.1.6 on 2026-10-18 17:41
+
+import hashlib
+import logging
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+
+def add_content_hashes(apps, schema_editor):
+    """Record the SHA-256 of each existing catalog file, so the first request for a catalog need not hash it."""
+    Catalog = apps.get_model("catalogs", "Catalog")
+    for catalog in Catalog.objects.filter(content_hash="").exclude(file_name=""):
+        digest = hashlib.sha256()
+        try:
+            with open(os.path.join(settings.MEDIA_ROOT, catalog.file_name.name), "rb") as file:
+                for chunk in iter(lambda: file.read(1 << 20), b""):
+                    digest.update(chunk)
+        except OSError as exc:
+            logger.warning("Could not hash the file of catalog %s: %s", catalog.pk, exc)
+            continue
+        Catalog.objects.filter(pk=catalog.pk).update(content_hash=digest.hexdigest())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogs', '0003_control_summaries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalog',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the catalog file, recorded at ingest', max_length=64),
+        ),
+        migrations.RunPython(add_content_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.6 on 2026-10-18 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogs', '0004_catalog_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='controls',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the control content, used to detect changes on re-ingest', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='controls',
+            name='retired',
+            field=models.BooleanField(default=False, help_text='The control is no longer in the catalog file; kept for the projects that reference it'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.1.6 on 2026-10-18 17:47
+
+"""Add the control search vector.
+
+The vector is built from the stored summaries, which are blank for rows ingested before 0003. For those, search only
+matches titles until ``manage.py rebuild_control_summaries`` has run; that command also recomputes the vectors.
+"""
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+
+def populate_search_vectors(apps, schema_editor):
+    Controls = apps.get_model("catalogs", "Controls")
+    Controls.objects.update(
+        search_vector=SearchVector("title", weight="A", config="english")
+        + SearchVector("description", weight="B", config="english")
+        + SearchVector("param_labels", weight="C", config="english")
+        + SearchVector("guidance", weight="D", config="english")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogs', '0005_control_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='controls',
+            name='param_labels',
+            field=models.TextField(blank=True, help_text='Labels of the control parameters'),
+        ),
+        migrations.AddField(
+            model_name='controls',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(help_text='Weighted full-text vector of the title, statement, parameter labels and guidance', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='controls',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='controls_search_vector_gin'),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+    ]
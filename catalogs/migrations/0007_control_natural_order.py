@@ -0,0 +1,69 @@
+# Generated by Django 4.1.6 on 2026-10-18 17:56
+
+import re
+
+from django.db import migrations, models
+
+# A frozen copy of ratoapi.oscal.oscal.control_sort_key, so later changes there do not change the keys written here.
+_SIMPLE = re.compile(r"^([a-z]{2})-(\d+)$")
+_ENHANCEMENT = re.compile(r"^([a-z]{2})-(\d+)\.(\d+)$")
+_EXTENDED = re.compile(r"^([a-z]{2})-(\d+)\s*\((\d+)\)$")
+
+
+def control_sort_key(control_id):
+    control_id = control_id.strip().lower()
+    match = _SIMPLE.match(control_id)
+    if match:
+        return match.group(1), int(match.group(2)), 0
+
+    match = _ENHANCEMENT.match(control_id) or _EXTENDED.match(control_id)
+    if match:
+        return match.group(1), int(match.group(2)), int(match.group(3))
+
+    return None, None, None
+
+
+def populate_sort_keys(apps, schema_editor):
+    Controls = apps.get_model("catalogs", "Controls")
+    Catalog = apps.get_model("catalogs", "Catalog")
+    for catalog in Catalog.objects.all():
+        controls = list(Controls.objects.filter(catalog=catalog).order_by("ordinal", "pk"))
+        family_ordinals = {}
+        for control in controls:
+            family, control.number, control.enhancement = control_sort_key(control.control_id)
+            control.family_ordinal = family_ordinals.setdefault(family, len(family_ordinals)) if family else None
+        Controls.objects.bulk_update(controls, ["family_ordinal", "number", "enhancement"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogs', '0006_control_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='controls',
+            name='enhancement',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Control enhancement number, for example 10 for ac-2.10; 0 for a base control', null=True),
+        ),
+        migrations.AddField(
+            model_name='controls',
+            name='family_ordinal',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Position of the control family in catalog order', null=True),
+        ),
+        migrations.AddField(
+            model_name='controls',
+            name='number',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Control number within the family, for example 2 for ac-2 and ac-2.10', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='controls',
+            index=models.Index(fields=['catalog', 'family_ordinal', 'number', 'enhancement'], name='controls_natural_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='controls',
+            index=models.Index(fields=['catalog', 'control_id'], name='controls_catalog_control_idx'),
+        ),
+        migrations.RunPython(populate_sort_keys, migrations.RunPython.noop),
+    ]
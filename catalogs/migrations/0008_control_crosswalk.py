@@ -0,0 +1,34 @@
+# Generated by Django 4.1.6 on 2026-10-18 18:03
+
+"""Add the control crosswalk table.
+
+The table is left empty here, because building it needs the catalog files and the parsing code of the running release.
+Run ``manage.py rebuild_crosswalks`` after migrating to fill it; ingesting a catalog also rebuilds it.
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogs', '0007_control_natural_order'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ControlCrosswalk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_version', models.CharField(choices=[('NIST_SP80053r5', 'NIST 800-53 r5'), ('NIST_SP80053r4', 'NIST 800-53 r4')], max_length=24)),
+                ('source_id', models.CharField(help_text='Control ID in the source version, for example ac-2.10', max_length=12)),
+                ('target_version', models.CharField(choices=[('NIST_SP80053r5', 'NIST 800-53 r5'), ('NIST_SP80053r4', 'NIST 800-53 r4')], max_length=24)),
+                ('target_id', models.CharField(blank=True, help_text='Control ID in the target version, for example ac-2; empty when the control was withdrawn outright', max_length=12)),
+                ('relation', models.CharField(choices=[('same', 'Same'), ('renamed', 'Renamed'), ('incorporated-into', 'Incorporated into'), ('moved-to', 'Moved to'), ('withdrawn', 'Withdrawn')], max_length=20)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='controlcrosswalk',
+            constraint=models.UniqueConstraint(fields=('source_version', 'target_version', 'source_id', 'target_id'), name='control_crosswalk_unique'),
+        ),
+    ]
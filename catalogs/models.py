@@ -1,24 +1,65 @@
 import json
 
-import jsonschema
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from jsonschema.exceptions import SchemaError, ValidationError
+from jsonschema.exceptions import SchemaError
 
+from ratoapi.oscal import schemas
 
-def validate_catalog(file_name):
-    cat = json.load(file_name.file)
-    with open("catalogs/schemas/oscal_catalog_schema.json", "r") as file:
-        oscal_schema = json.load(file)
 
+def _validate_document(document: dict, name: str):
     try:
-        jsonschema.validate(instance=cat, schema=oscal_schema)
-    except ValidationError as exc:
-        raise ValidationError("The Catalog is not a valid OSCAL catalog.") from exc
+        errors = schemas.validation_errors(document, name)
     except SchemaError as exc:
         raise ValidationError(
-            "The Catalog schema is not a valid OSCAL catalog schema."
+            f"The {name.capitalize()} schema is not a valid OSCAL {name} schema."
         ) from exc
+    if errors:
+        raise ValidationError(f"The {name.capitalize()} is not a valid OSCAL {name}.") from errors[0]
+
+
+def _control_ids(items: list) -> set:
+    return {
+        control_id
+        for item in items
+        for control_id in (item.get("id"), *_control_ids(item.get("groups", []) + item.get("controls", [])))
+    }
+
+
+def validate_catalog(file_name):
+    """Validate an OSCAL catalog, or a baseline profile and the catalog it imports.
+
+    A profile's import names the catalog file in the same storage, as ``catalogs.baselines.store_profile`` saves it.
+    """
+    cat = json.load(file_name.file)
+    if "profile" not in cat:
+        _validate_document(cat, "catalog")
+        return
+
+    _validate_document(cat, "profile")
+    imports = cat["profile"]["imports"]
+    if len(imports) != 1:
+        raise ValidationError("A baseline profile must import exactly one catalog.")
+
+    try:
+        with file_name.storage.open(imports[0]["href"], "rb") as file:
+            imported = json.load(file)
+    except (OSError, ValueError) as exc:
+        raise ValidationError(f"The catalog imported by the profile, {imports[0]['href']}, could not be read.") from exc
+    _validate_document(imported, "catalog")
+
+    selected = {
+        control_id
+        for include in imports[0].get("include-controls", [])
+        for control_id in include.get("with-ids", [])
+    }
+    if missing := selected - _control_ids([imported["catalog"]]):
+        raise ValidationError(
+            f"The profile selects controls its catalog does not have: {', '.join(sorted(missing))}."
+        )
 
 
 class Catalog(models.Model):
@@ -32,11 +73,21 @@ class Catalog(models.Model):
         NIST_SP80053R4 = "NIST_SP80053r4", _("NIST 800-53 r4")
 
     name = models.CharField(max_length=100, help_text="Name of Catalog", unique=True)
+    title = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Catalog title from the OSCAL metadata, recorded at ingest",
+    )
     file_name = models.FileField(
         max_length=100,
         help_text="Location of static catalog data file",
         validators=[validate_catalog],
     )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA-256 of the catalog file, recorded at ingest",
+    )
     source = models.URLField(
         max_length=500,
         null=False,
@@ -67,6 +118,9 @@ class Catalog(models.Model):
 
 
 class Controls(models.Model):
+    # Natural control order within a catalog (ac-2, ac-2.1, ac-2.2, ..., ac-2.10), covered by an index per catalog.
+    NATURAL_ORDER = ("family_ordinal", "number", "enhancement", "control_id")
+
     catalog = models.ForeignKey(to="catalogs.Catalog", on_delete=models.CASCADE)
     control_id = models.CharField(
         max_length=12,
@@ -84,6 +138,97 @@ class Controls(models.Model):
         max_length=124,
         help_text="Catalog control title, for example Access Control Policy and Procedures.",
     )
+    family = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Title of the control family, for example Access Control",
+    )
+    description = models.TextField(
+        blank=True,
+        help_text="Control statement with the catalog parameter values substituted",
+    )
+    implementation = models.TextField(blank=True, help_text="Control implementation prose")
+    guidance = models.TextField(blank=True, help_text="Control guidance prose")
+    ordinal = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Position of the control in catalog order; empty until summaries are stored",
+    )
+    next_id = models.CharField(
+        max_length=12,
+        blank=True,
+        help_text="Catalog control ID of the next control in catalog order",
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA-256 of the control content, used to detect changes on re-ingest",
+    )
+    retired = models.BooleanField(
+        default=False,
+        help_text="The control is no longer in the catalog file; kept for the projects that reference it",
+    )
+    param_labels = models.TextField(blank=True, help_text="Labels of the control parameters")
+    family_ordinal = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text="Position of the control family in catalog order",
+    )
+    number = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text="Control number within the family, for example 2 for ac-2 and ac-2.10",
+    )
+    enhancement = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text="Control enhancement number, for example 10 for ac-2.10; 0 for a base control",
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        help_text="Weighted full-text vector of the title, statement, parameter labels and guidance",
+    )
 
     def __str__(self):
         return self.control_label
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="controls_search_vector_gin"),
+            models.Index(
+                fields=["catalog", "family_ordinal", "number", "enhancement"], name="controls_natural_order_idx"
+            ),
+            models.Index(fields=["catalog", "control_id"], name="controls_catalog_control_idx"),
+        ]
+
+
+class ControlCrosswalk(models.Model):
+    """Where a control of one catalog version went in the next version, built at ingest by catalogs.crosswalk."""
+
+    class Relation(models.TextChoices):
+        SAME = "same", _("Same")
+        RENAMED = "renamed", _("Renamed")
+        INCORPORATED_INTO = "incorporated-into", _("Incorporated into")
+        MOVED_TO = "moved-to", _("Moved to")
+        WITHDRAWN = "withdrawn", _("Withdrawn")
+
+    source_version = models.CharField(choices=Catalog.Version.choices, max_length=24)
+    source_id = models.CharField(max_length=12, help_text="Control ID in the source version, for example ac-2.10")
+    target_version = models.CharField(choices=Catalog.Version.choices, max_length=24)
+    target_id = models.CharField(
+        max_length=12,
+        blank=True,
+        help_text="Control ID in the target version, for example ac-2; empty when the control was withdrawn outright",
+    )
+    relation = models.CharField(choices=Relation.choices, max_length=20)
+
+    def __str__(self):
+        return f"{self.source_id} {self.relation} {self.target_id}".strip()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source_version", "target_version", "source_id", "target_id"],
+                name="control_crosswalk_unique",
+            ),
+        ]
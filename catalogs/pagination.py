@@ -0,0 +1,94 @@
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+from typing import List, Optional
+
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class ControlCursorPagination(BasePagination):
+    """Cursor pagination over an in-memory, catalog-ordered list of control ids.
+
+    The cursor is an opaque encoding of the id of the first control on the page, so a page always starts at the same
+    control for a given catalog file.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE") or 20
+        self.base_url = ""
+        self.next_id: Optional[str] = None
+        self.previous_id: Optional[str] = None
+        self.has_previous = False
+
+    def is_requested(self, request: Request) -> bool:
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset: List[str], request: Request, view=None) -> List[str]:
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        start = 0
+        if encoded := request.query_params.get(self.cursor_query_param):
+            control_id = self.decode_cursor(encoded)
+            try:
+                start = queryset.index(control_id)
+            except ValueError as exc:
+                raise NotFound(self.invalid_cursor_message) from exc
+
+        end = start + self.page_size
+        previous = start - self.page_size
+        self.next_id = queryset[end] if end < len(queryset) else None
+        self.has_previous = start > 0
+        self.previous_id = queryset[previous] if previous > 0 else None
+
+        return queryset[start:end]
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def get_paginated_response(self, data: List[dict]) -> Response:
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "controls": data,
+            }
+        )
+
+    def get_next_link(self) -> Optional[str]:
+        if self.next_id is None:
+            return None
+        url = replace_query_param(self.base_url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_id))
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        url = replace_query_param(self.base_url, self.page_size_query_param, self.page_size)
+        if self.previous_id is None:  # The previous page is the first page.
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.previous_id))
+
+    @staticmethod
+    def encode_cursor(control_id: str) -> str:
+        return b64encode(control_id.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, encoded: str) -> str:
+        try:
+            return b64decode(encoded.encode("ascii"), validate=True).decode("utf-8")
+        except (BinasciiError, UnicodeError) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
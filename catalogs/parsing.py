@@ -0,0 +1,89 @@
+"""Catalog file parsing that does not touch the database.
+
+Everything here only depends on the catalog file, so it can run in worker processes while the database writes stay in
+the parent process.
+"""
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Union
+
+from catalogs.baselines import catalog_digest
+from ratoapi.oscal.catalog import CatalogModel
+from ratoapi.oscal.oscal import control_sort_key
+
+# Controls fields that make up a control's content. Position fields (ordinal, next_id and the natural sort keys) are
+# compared separately so a control inserted early in a catalog does not mark every later control as changed.
+CONTENT_FIELDS = (
+    "control_label",
+    "sort_id",
+    "title",
+    "family",
+    "description",
+    "implementation",
+    "guidance",
+    "param_labels",
+)
+
+
+class ParsedCatalog(NamedTuple):
+    """The values stored for a catalog at ingest: its title, file hash and Controls rows."""
+
+    title: str
+    content_hash: str
+    rows: List[dict]
+    seconds: float = 0.0
+
+
+def control_rows(catalog_data: CatalogModel) -> List[dict]:
+    """Return the Controls field values for every control in a parsed catalog, in catalog order."""
+    controls = catalog_data.controls
+    summaries = catalog_data.control_summaries(control.id for control in controls)
+
+    rows = []
+    family_ordinals: dict = {}
+    for control in controls:
+        summary = summaries[control.id]
+        family, number, enhancement = control_sort_key(control.id)
+        row = {
+            **control.to_orm(),
+            "family": summary["family"],
+            "description": summary["description"] or "",
+            "implementation": summary["implementation"] or "",
+            "guidance": summary["guidance"] or "",
+            "ordinal": catalog_data.index.ordinals[control.id],
+            "next_id": summary["next_id"],
+            "family_ordinal": family_ordinals.setdefault(family, len(family_ordinals)) if family else None,
+            "number": number,
+            "enhancement": enhancement,
+            "param_labels": " ".join(dict.fromkeys(str(param.label) for param in control.params or [] if param.label)),
+        }
+        row["content_hash"] = content_hash(row)
+        rows.append(row)
+
+    return rows
+
+
+def content_hash(row: dict) -> str:
+    """Return the SHA-256 of a control row's content fields."""
+    content = json.dumps([row[field] for field in CONTENT_FIELDS], separators=(",", ":"))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def parse_catalog_file(path: Union[str, Path], catalog_pk: Optional[int] = None) -> ParsedCatalog:
+    """Parse and validate a catalog file or baseline profile into the values stored at ingest."""
+    start = time.perf_counter()
+    catalog_data = CatalogModel.from_json(path, catalog_pk=catalog_pk)
+
+    return ParsedCatalog(
+        title=catalog_data.metadata.title,
+        content_hash=catalog_digest(path).hex(),
+        rows=control_rows(catalog_data),
+        seconds=time.perf_counter() - start,
+    )
+
+
+def parse_catalog_files(paths: List[Union[str, Path]]) -> List[ParsedCatalog]:
+    """Parse catalog files in one process, so baselines importing the same catalog share one parse of it."""
+    return [parse_catalog_file(path) for path in paths]
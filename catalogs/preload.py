@@ -0,0 +1,104 @@
+"""Load every catalog into the per-process caches before a pre-forking server starts its workers.
+
+Workers forked after ``preload_catalogs`` find the parsed catalogs already cached and share those pages with the
+master. ``gc.freeze()`` moves the preloaded objects out of the collector's generations, so garbage collection in a
+worker does not write to them and force private copies.
+"""
+import gc
+import logging
+from typing import Dict
+
+from django.conf import settings
+from django.db import connections
+
+from catalogs.catalogio import CatalogTools
+from catalogs.models import Catalog
+from ratoapi.cache import catalog_cache
+from ratoapi.oscal.catalog import CatalogModel
+
+logger = logging.getLogger(__name__)
+
+# Fields of /proc/<pid>/smaps_rollup reported by memory_usage, in KiB.
+_MEMORY_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def memory_usage(pid: str = "self") -> Dict[str, int]:
+    """Return the memory of a process in KiB, split into shared and private pages where the kernel reports them."""
+    usage = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as file:
+            for line in file:
+                name, _, value = line.partition(":")
+                if name in _MEMORY_FIELDS:
+                    usage[name] = int(value.split()[0])
+    except OSError:
+        try:
+            with open(f"/proc/{pid}/status", "r") as file:
+                for line in file:
+                    if line.startswith("VmRSS:"):
+                        usage["Rss"] = int(line.split()[1])
+        except OSError:
+            pass
+    return usage
+
+
+def format_memory(usage: Dict[str, int]) -> str:
+    if not usage:
+        return "memory usage unavailable"
+
+    shared = usage.get("Shared_Clean", 0) + usage.get("Shared_Dirty", 0)
+    private = usage.get("Private_Clean", 0) + usage.get("Private_Dirty", 0)
+    parts = [f"rss={usage['Rss'] / 1024:.1f}MiB"]
+    if "Pss" in usage:
+        parts += [
+            f"pss={usage['Pss'] / 1024:.1f}MiB",
+            f"shared={shared / 1024:.1f}MiB",
+            f"private={private / 1024:.1f}MiB",
+        ]
+    return " ".join(parts)
+
+
+def _warm_catalog_model(path: str, catalog: Catalog):
+    # Decode snapshot-backed controls now, so they live in the shared heap rather than each worker's.
+    CatalogTools.from_file(path, catalog_pk=catalog.pk).get_controls_all()
+    catalog_data = CatalogModel.from_json(path, catalog_pk=catalog.pk, trusted_hash=catalog.content_hash)
+    for control in catalog_data.index.ordered:
+        control.statement_template  # pylint: disable=pointless-statement
+
+
+def preload_catalogs() -> int:
+    """Parse and index every Catalog into the catalog cache, then freeze the heap. Returns the number loaded."""
+    before = memory_usage()
+    evictions = catalog_cache.evictions
+    loaded = 0
+    for catalog in Catalog.objects.order_by("pk"):
+        path = catalog.file_name.path
+        try:
+            if settings.CATALOG_COMPACT:
+                # CatalogTools and the control summaries both read the cached compact catalog.
+                CatalogTools.from_file(path, catalog_pk=catalog.pk)
+            else:
+                _warm_catalog_model(path, catalog)
+        except (OSError, ValueError) as exc:
+            logger.warning("Could not preload catalog %s: %s", catalog, exc)
+            continue
+        loaded += 1
+
+    # Baselines also cache the full catalogs they are selected from, so count what was pushed out rather than entries.
+    if catalog_cache.evictions > evictions:
+        logger.warning(
+            "CATALOG_CACHE_SIZE (%s) is too small to keep %s preloaded catalogs", catalog_cache.maxsize, loaded
+        )
+
+    # Forked workers must open their own database connections.
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+
+    logger.info(
+        "Preloaded %s catalogs; memory before: %s; after: %s",
+        loaded,
+        format_memory(before),
+        format_memory(memory_usage()),
+    )
+    return loaded
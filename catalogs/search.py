@@ -0,0 +1,142 @@
+"""Full-text search over the controls of a catalog.
+
+On Postgres, controls are matched against ``Controls.search_vector`` (GIN indexed, filled at ingest) and ranked with
+``ts_rank``. Other databases use an in-memory inverted index built from the same Controls rows, weighted the same way
+but without stemming.
+"""
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, QuerySet, Value
+from django.db.models.functions import Concat
+
+from catalogs.models import Catalog, Controls
+from ratoapi.cache import BoundedCache
+
+SEARCH_CONFIG = "english"
+
+# Controls fields in the search vector, with their weight class.
+WEIGHTED_FIELDS = (("title", "A"), ("description", "B"), ("param_labels", "C"), ("guidance", "D"))
+# The default weights used by Postgres ts_rank.
+WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+
+RESULT_FIELDS = ("control_id", "control_label", "title", "family")
+SNIPPET_WORDS = 35
+START_SEL, STOP_SEL = "<b>", "</b>"
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+search_index_cache = BoundedCache("catalog-search-indexes", maxsize=getattr(settings, "CATALOG_CACHE_SIZE", 32))
+
+
+def control_search_vector() -> SearchVector:
+    vectors = [SearchVector(field, weight=weight, config=SEARCH_CONFIG) for field, weight in WEIGHTED_FIELDS]
+    vector = vectors[0]
+    for other in vectors[1:]:
+        vector = vector + other
+    return vector
+
+
+def update_search_vectors(controls: QuerySet):
+    """Recompute the search vector of the given Controls rows."""
+    if connection.vendor == "postgresql":
+        controls.update(search_vector=control_search_vector())
+
+
+def search_controls(catalog: Catalog, query: str, limit: int = 20) -> List[dict]:
+    """Return the controls of a catalog that match query, best match first, with highlighted snippets."""
+    if connection.vendor == "postgresql":
+        return _search_database(catalog, query, limit)
+
+    version = (catalog.content_hash, catalog.updated)
+    index = search_index_cache.get_or_load(catalog.pk, lambda: ControlSearchIndex(_indexed_rows(catalog)), version)
+    return index.search(query, limit)
+
+
+def _search_database(catalog: Catalog, query: str, limit: int) -> List[dict]:
+    search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+    ranked = list(
+        Controls.objects.filter(catalog=catalog, retired=False, search_vector=search_query)
+        .annotate(rank=SearchRank(F("search_vector"), search_query))
+        .order_by("-rank", "ordinal")
+        .values_list("pk", "rank")[:limit]
+    )
+    if not ranked:
+        return []
+
+    # Headlines are expensive, so only build them for the controls on the page.
+    snippets = (
+        Controls.objects.filter(pk__in=[pk for pk, _ in ranked])
+        .annotate(
+            snippet=SearchHeadline(
+                Concat("description", Value(" "), "guidance"),
+                search_query,
+                config=SEARCH_CONFIG,
+                start_sel=START_SEL,
+                stop_sel=STOP_SEL,
+                max_words=SNIPPET_WORDS,
+            )
+        )
+        .values("pk", "snippet", *RESULT_FIELDS)
+    )
+    rows = {row.pop("pk"): row for row in snippets}
+
+    return [{**rows[pk], "rank": rank} for pk, rank in ranked]
+
+
+def _indexed_rows(catalog: Catalog) -> List[dict]:
+    fields = {*RESULT_FIELDS, *(field for field, _ in WEIGHTED_FIELDS)}
+    return list(Controls.objects.filter(catalog=catalog, retired=False).order_by("ordinal", "pk").values(*fields))
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class ControlSearchIndex:
+    """In-memory inverted index over Controls rows, for databases without Postgres full-text search."""
+
+    def __init__(self, controls: Iterable[dict]):
+        self._controls = list(controls)
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        for position, control in enumerate(self._controls):
+            for field, weight in WEIGHTED_FIELDS:
+                for token in _tokenize(control[field] or ""):
+                    postings = self._postings[token]
+                    postings[position] = postings.get(position, 0.0) + WEIGHTS[weight]
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        terms = list(dict.fromkeys(_tokenize(query)))
+        if not terms:
+            return []
+
+        matches = set(self._postings.get(terms[0], ()))
+        for term in terms[1:]:
+            matches &= set(self._postings.get(term, ()))
+
+        scores = {position: sum(self._postings[term][position] for term in terms) for position in matches}
+        ranked = sorted(scores, key=lambda position: (-scores[position], position))[:limit]
+
+        return [
+            {
+                **{field: self._controls[position][field] for field in RESULT_FIELDS},
+                "snippet": self._snippet(self._controls[position], set(terms)),
+                "rank": scores[position],
+            }
+            for position in ranked
+        ]
+
+    @staticmethod
+    def _snippet(control: dict, terms: set) -> str:
+        words = f"{control['description']} {control['guidance']}".split()
+        first = next((idx for idx, word in enumerate(words) if terms.intersection(_tokenize(word))), 0)
+        start = max(0, first - SNIPPET_WORDS // 3)
+
+        return " ".join(
+            f"{START_SEL}{word}{STOP_SEL}" if terms.intersection(_tokenize(word)) else word
+            for word in words[start:start + SNIPPET_WORDS]
+        )
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from .catalogio import CatalogTools
 from .models import Catalog, Controls
 
 
@@ -19,4 +20,22 @@ class CatalogListSerializer(serializers.ModelSerializer):
 class ControlSerializer(serializers.ModelSerializer):
     class Meta:
         model = Controls
-        fields = "__all__"
+        fields = (
+            "id",
+            "control_id",
+            "control_label",
+            "sort_id",
+            "title",
+            "catalog",
+        )
+
+
+class ControlBatchSerializer(serializers.Serializer):
+    control_ids = serializers.ListField(
+        child=serializers.CharField(max_length=32), allow_empty=False, max_length=500
+    )
+    fields = serializers.ListField(
+        child=serializers.ChoiceField(choices=CatalogTools.CONTROL_FIELDS),
+        allow_empty=False,
+        default=("description",),
+    )
@@ -1,38 +1,40 @@
-import os
+import logging
 
-from catalogs.models import Catalog, Controls
-from ratoapi.oscal.catalog import CatalogModel
+from catalogs.baselines import is_catalog, read_profile
+from catalogs.ingest import create_controls, sync_controls
+from catalogs.models import Catalog
+from catalogs.snapshot import snapshot_path, write_snapshot
+
+logger = logging.getLogger(__name__)
 
 
 # noinspection PyUnusedLocal
 def add_controls(
     sender, instance: Catalog, created: bool, **kwargs
 ):  # pylint: disable=unused-argument
+    # load_catalog parses catalog files ahead of time and attaches the result to the instance.
+    parsed = getattr(instance, "parsed_catalog", None)
     if created:
-        catalog_data = CatalogModel.from_json(instance.file_name.path)
-        Controls.objects.bulk_create(
-            [
-                Controls(**{"catalog": instance, **item.to_orm()})
-                for item in catalog_data.controls
-            ]
-        )
+        create_controls(instance, parsed)
+    elif not instance.content_hash:
+        # The file was replaced (auto_delete_file_on_change cleared the hash); only write the controls that changed.
+        instance.sync_report = sync_controls(instance, parsed)
 
 
 # noinspection PyUnusedLocal
 def auto_delete_file_on_delete(
     sender, instance: Catalog, **kwargs
 ):  # pylint: disable=unused-argument
-    """Delete files from the filesystem when a Catalog object is deleted."""
+    """Evict the file and its snapshot from the local cache when a Catalog object is deleted."""
     if instance.file_name:
-        if os.path.isfile(instance.file_name.path):
-            os.remove(instance.file_name.path)
+        instance.file_name.storage.delete(instance.file_name.name)
 
 
 # noinspection PyUnusedLocal
 def auto_delete_file_on_change(
     sender, instance: Catalog, **kwargs
 ):  # pylint: disable=unused-argument
-    """Delete old file from filesystem when Catalog object is update with a new file."""
+    """Evict the old file and its snapshot from the local cache when a Catalog object is updated with a new file."""
     if not instance.pk:
         return False
 
@@ -42,6 +44,26 @@ def auto_delete_file_on_change(
         return False
 
     new_file = instance.file_name
-    if not old_file == new_file:
-        if os.path.isfile(old_file.path):
-            os.remove(old_file.path)
+    # An uploaded file is uncommitted until it is saved, even when it has the same name as the old one.
+    if not old_file == new_file or not new_file._committed:  # pylint: disable=protected-access
+        instance.content_hash = ""
+        old_file.storage.delete(old_file.name)
+
+
+# noinspection PyUnusedLocal
+def imported_catalog(sender, name: str, path: str, **kwargs):  # pylint: disable=unused-argument
+    """Return the stored catalog a baseline profile imports, so the blob store fetches and keeps it with the profile."""
+    if profile := read_profile(path):
+        return {profile.catalog_path.name}
+    return set()
+
+
+# noinspection PyUnusedLocal
+def snapshot_fetched_catalog(sender, name: str, path: str, **kwargs):  # pylint: disable=unused-argument
+    """Write the snapshot of a catalog file fetched into this node's blob cache, as ingest does where it ran."""
+    if not is_catalog(path) or snapshot_path(path).exists():
+        return
+    try:
+        write_snapshot(path)
+    except (OSError, ValueError) as exc:
+        logger.warning("Could not write a snapshot for %s: %s", name, exc)
@@ -0,0 +1,214 @@
+"""Compiled, memory-mappable catalog snapshots.
+
+A snapshot is written next to a catalog file and holds the same catalog in a layout that can be read lazily:
+
+    header   magic, format version, SHA-256 digest of the source file, meta offset/length, table offset/count
+    meta     compact JSON of the catalog without control bodies, plus an outline of group -> control -> enhancement ids
+    table    one entry per control: id length, id, payload offset, payload length
+    payload  compact JSON of each control, without its nested enhancements
+
+Only the header, meta and table are decoded when a snapshot is opened. Control payloads are decoded on demand, so a
+lookup only pays for the controls it touches.
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"OSCALSNP"
+FORMAT_VERSION = 1
+SUFFIX = ".snapshot"
+
+_HEADER = struct.Struct("<8sH32sIIII")
+_ENTRY_ID_LENGTH = struct.Struct("<H")
+_ENTRY_LOCATION = struct.Struct("<II")
+
+Outline = List[Tuple[dict, List[Tuple[str, List[str]]]]]
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def snapshot_path(source: Union[str, Path]) -> Path:
+    source = Path(source)
+    return source.with_name(source.name + SUFFIX)
+
+
+def source_digest(source: Union[str, Path]) -> bytes:
+    """Return the SHA-256 digest of a catalog source file."""
+    digest = hashlib.sha256()
+    with open(source, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _compact(data) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def write_snapshot(source: Union[str, Path]) -> Path:
+    """Compile a catalog JSON file into a snapshot next to it and return the snapshot path."""
+    source = Path(source)
+    with open(source, "rb") as file:
+        raw = file.read()
+
+    data = json.loads(raw)
+    catalog = data.get("catalog", data)
+
+    meta = {key: value for key, value in catalog.items() if key != "groups"}
+    meta["groups"] = []
+    outline: list = []
+    payloads: List[Tuple[str, bytes]] = []
+
+    for group in catalog.get("groups", []):
+        meta["groups"].append({key: value for key, value in group.items() if key != "controls"})
+        group_outline = []
+        for control in group.get("controls", []):
+            children = control.get("controls", [])
+            group_outline.append([control["id"], [child["id"] for child in children]])
+            for item in (control, *children):
+                payloads.append((item["id"], _compact({k: v for k, v in item.items() if k != "controls"})))
+        outline.append(group_outline)
+
+    meta_bytes = _compact({"catalog": meta, "outline": outline})
+
+    table = bytearray()
+    body = bytearray()
+    table_offset = _HEADER.size + len(meta_bytes)
+    table_size = sum(_ENTRY_ID_LENGTH.size + len(cid.encode()) + _ENTRY_LOCATION.size for cid, _ in payloads)
+    payload_offset = table_offset + table_size
+    for control_id, payload in payloads:
+        encoded_id = control_id.encode("utf-8")
+        table += _ENTRY_ID_LENGTH.pack(len(encoded_id)) + encoded_id
+        table += _ENTRY_LOCATION.pack(payload_offset + len(body), len(payload))
+        body += payload
+
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        hashlib.sha256(raw).digest(),
+        _HEADER.size,
+        len(meta_bytes),
+        table_offset,
+        len(payloads),
+    )
+
+    target = snapshot_path(source)
+    # Write to a temporary file and rename it so readers never see a partial snapshot.
+    handle, temp_name = tempfile.mkstemp(dir=target.parent, prefix=target.name, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(header)
+            file.write(meta_bytes)
+            file.write(table)
+            file.write(body)
+        os.replace(temp_name, target)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+    logger.info("Wrote catalog snapshot %s (%s controls)", target, len(payloads))
+    return target
+
+
+def remove_snapshot(source: Union[str, Path]):
+    target = snapshot_path(source)
+    if target.is_file():
+        os.remove(target)
+
+
+class CatalogSnapshot:
+    """Read-only, memory-mapped view of a compiled catalog snapshot."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, digest, meta_offset, meta_length, table_offset, count = _HEADER.unpack_from(self._buffer)
+        except struct.error as exc:
+            raise SnapshotError(f"Truncated catalog snapshot {self.path}") from exc
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise SnapshotError(f"Unsupported catalog snapshot {self.path}")
+
+        self.digest = digest
+        meta = json.loads(self._buffer[meta_offset:meta_offset + meta_length])
+        self.meta: dict = meta["catalog"]
+        self.outline: Outline = [
+            (group, [(control_id, children) for control_id, children in controls])
+            for group, controls in zip(self.meta["groups"], meta["outline"])
+        ]
+
+        self._locations = {}
+        position = table_offset
+        for _ in range(count):
+            (id_length,) = _ENTRY_ID_LENGTH.unpack_from(self._buffer, position)
+            position += _ENTRY_ID_LENGTH.size
+            control_id = self._buffer[position:position + id_length].decode("utf-8")
+            position += id_length
+            self._locations.setdefault(control_id, _ENTRY_LOCATION.unpack_from(self._buffer, position))
+            position += _ENTRY_LOCATION.size
+
+    @classmethod
+    def open_fresh(cls, source: Union[str, Path]) -> Optional["CatalogSnapshot"]:
+        """Open the snapshot of a catalog file if it exists and was compiled from the file's current contents."""
+        path = snapshot_path(source)
+        if not path.is_file():
+            return None
+
+        try:
+            snapshot = cls(path)
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable catalog snapshot %s: %s", path, exc)
+            return None
+
+        if snapshot.digest != source_digest(source):
+            logger.info("Ignoring stale catalog snapshot %s", path)
+            snapshot.close()
+            return None
+
+        return snapshot
+
+    def __contains__(self, control_id: str) -> bool:
+        return control_id in self._locations
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._locations)
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def control(self, control_id: str) -> dict:
+        """Decode a single control, without its nested enhancements."""
+        offset, length = self._locations[control_id]
+        return json.loads(self._buffer[offset:offset + length])
+
+    def to_catalog(self) -> dict:
+        """Decode the whole catalog into the same structure as the source file's "catalog" object."""
+        catalog = dict(self.meta)
+        catalog["groups"] = []
+        for group, controls in self.outline:
+            group = dict(group)
+            if controls:
+                group["controls"] = []
+                for control_id, child_ids in controls:
+                    control = self.control(control_id)
+                    if child_ids:
+                        control["controls"] = [self.control(child_id) for child_id in child_ids]
+                    group["controls"].append(control)
+            catalog["groups"].append(group)
+        return catalog
+
+    def close(self):
+        self._buffer.close()
@@ -1,12 +1,28 @@
+import gc
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.exceptions import ValidationError
 from django.core.files import File
 from django.core.management import call_command
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from django.urls import reverse
 from rest_framework import status
 
+from catalogs.baselines import catalog_digest, read_profile, resolve_baseline, split_baselines, store_profile
 from catalogs.catalogio import CatalogTools as Tools
-from catalogs.models import Catalog, Controls
+from catalogs.crosswalk import crosswalk_rows, version_controls
+from catalogs.models import Catalog, ControlCrosswalk, Controls
+from catalogs.parsing import parse_catalog_file
+from catalogs.preload import format_memory, preload_catalogs
+from catalogs.search import ControlSearchIndex
+from projects.models import Project, ProjectControl
+from ratoapi.cache import catalog_cache
 from testing_utils import AuthenticatedAPITestCase, prevent_request_warnings
+from users.models import User
 
 
 class CatalogModelTest(AuthenticatedAPITestCase):
@@ -44,6 +60,186 @@ class CatalogModelTest(AuthenticatedAPITestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    def test_get_all_controls_streams_every_control(self):
+        catalog = Tools(self.cat.file_name.path)
+        response = self.client.get(reverse("get_all_controls", kwargs={"catalog": self.cat.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        chunks = list(response.streaming_content)
+        controls = json.loads(b"".join(chunks))["controls"]
+        self.assertEqual([control["id"] for control in controls], catalog.get_controls_all_ids())
+        self.assertLess(len(chunks), len(controls))
+
+    def test_get_all_controls_paginated(self):
+        url = reverse("get_all_controls", kwargs={"catalog": self.cat.id})
+        first = self.client.get(url, {"page_size": 2, "fields": "title"}).json()
+        self.assertEqual(len(first["controls"]), 2)
+        self.assertEqual(set(first["controls"][0]), {"id", "title"})
+        self.assertIsNone(first["previous"])
+
+        second = self.client.get(first["next"]).json()
+        ids = Tools(self.cat.file_name.path).get_controls_all_ids()
+        self.assertEqual([control["id"] for control in second["controls"]], ids[2:4])
+        self.assertIsNotNone(second["previous"])
+
+    @prevent_request_warnings
+    def test_get_all_controls_invalid_cursor(self):
+        response = self.client.get(
+            reverse("get_all_controls", kwargs={"catalog": self.cat.id}), {"cursor": "not-a-cursor"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_all_controls_by_family(self):
+        response = self.client.get(
+            reverse("get_all_controls", kwargs={"catalog": self.cat.id}), {"family": "AT", "page_size": 500}
+        )
+        controls = response.json()["controls"]
+        self.assertTrue(controls)
+        self.assertTrue(all(control["id"].startswith("at-") for control in controls))
+
+    def test_get_all_controls_not_modified(self):
+        url = reverse("get_all_controls", kwargs={"catalog": self.cat.id})
+        response = self.client.get(url)
+        self.assertIn("ETag", response)
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached["ETag"], response["ETag"])
+
+    def test_get_all_controls_gzip(self):
+        url = reverse("get_all_controls", kwargs={"catalog": self.cat.id})
+        streamed = json.loads(b"".join(self.client.get(url).streaming_content))
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(json.loads(gzip.decompress(response.content)), streamed)
+
+    def test_get_all_controls_brotli_only_is_uncompressed(self):
+        url = reverse("get_all_controls", kwargs={"catalog": self.cat.id})
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="br")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertTrue(response.streaming)
+
+    def test_etag_changes_with_catalog(self):
+        url = reverse("get_control_by_id", kwargs={"catalog": self.cat.id, "control_id": "ac-1"})
+        etag = self.client.get(url)["ETag"]
+
+        self.cat.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_does_not_record_content_hash(self):
+        Catalog.objects.filter(pk=self.cat.pk).update(content_hash="")
+        url = reverse("get_control_by_id", kwargs={"catalog": self.cat.id, "control_id": "ac-1"})
+
+        response = self.client.get(url)
+
+        self.assertIn("ETag", response)
+        self.assertEqual(Catalog.objects.get(pk=self.cat.pk).content_hash, "")
+
+    def test_catalog_list_not_modified(self):
+        url = reverse("catalog-list")
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_get_controls_batch(self):
+        response = self.client.post(
+            reverse("get_controls_batch", kwargs={"catalog": self.cat.id}),
+            {"control_ids": ["ac-1", "ac-2", "zz-99"], "fields": ["title", "description"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = response.json()
+        single = self.client.get(
+            reverse("get_control_by_id", kwargs={"catalog": self.cat.id, "control_id": "ac-1"})
+        ).json()
+        self.assertEqual(list(data["controls"]), ["ac-1", "ac-2"])
+        self.assertEqual(data["controls"]["ac-1"]["description"], single["description"])
+        self.assertEqual(data["controls"]["ac-2"]["title"], "Account Management")
+        self.assertEqual(data["missing"], ["zz-99"])
+
+    @prevent_request_warnings
+    def test_get_controls_batch_invalid_field(self):
+        response = self.client.post(
+            reverse("get_controls_batch", kwargs={"catalog": self.cat.id}),
+            {"control_ids": ["ac-1"], "fields": ["not-a-field"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_controls(self):
+        response = self.client.get(reverse("catalog-search", kwargs={"catalog": self.cat.id}), {"q": "literacy"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"][0]["control_id"], "at-2")
+
+    @prevent_request_warnings
+    def test_search_requires_query(self):
+        response = self.client.get(reverse("catalog-search", kwargs={"catalog": self.cat.id}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ControlSearchIndexTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.index = ControlSearchIndex(parse_catalog_file("ratoapi/testdata/NIST_SP-800-53_rev5_test.json").rows)
+
+    def test_title_matches_rank_first(self):
+        results = self.index.search("incident response")
+        self.assertEqual(results[0]["control_id"], "ir-2")
+        self.assertIn("<b>incident</b>", results[0]["snippet"].lower())
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.index.search("literacy nonexistentterm"), [])
+        self.assertEqual(self.index.search("   "), [])
+
+
+class ControlSummariesTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with open("ratoapi/testdata/NIST_SP-800-53_rev5_test.json", "rb") as file:
+            cls.cat = Catalog.objects.create(
+                name="NIST Test Catalog",
+                file_name=File(file),
+            )
+
+    def test_summaries_are_stored_at_ingest(self):
+        self.cat.refresh_from_db()
+        control = Controls.objects.get(catalog=self.cat, control_id="ac-2")
+
+        self.assertEqual(self.cat.title, "NIST SP 800-53 Rev 5 Controls Test Catalog")
+        self.assertEqual(len(self.cat.content_hash), 64)
+        self.assertEqual(control.family, "Access Control")
+        self.assertEqual(control.next_id, "at-1")
+        self.assertEqual(control.ordinal, 1)
+        self.assertNotIn("{{ insert: param", control.description)
+        self.assertTrue(control.guidance)
+
+    def test_natural_sort_keys_are_stored_at_ingest(self):
+        control_ids = list(
+            Controls.objects.filter(catalog=self.cat)
+            .order_by(*Controls.NATURAL_ORDER)
+            .values_list("control_id", flat=True)
+        )
+
+        self.assertEqual(control_ids[:3], ["ac-1", "ac-2", "at-1"])
+        self.assertLess(control_ids.index("sa-2"), control_ids.index("sa-16"))
+        self.assertEqual(
+            Controls.objects.filter(catalog=self.cat, control_id="sa-16").values_list(*Controls.NATURAL_ORDER).get(),
+            (16, 16, 0, "sa-16"),
+        )
+
+    def test_rebuild_control_summaries(self):
+        Controls.objects.filter(catalog=self.cat).update(description="", ordinal=None)
+        call_command("rebuild_control_summaries", catalog=[self.cat.pk])
+
+        control = Controls.objects.get(catalog=self.cat, control_id="ac-2")
+        self.assertEqual(control.ordinal, 1)
+        self.assertTrue(control.description)
+
 
 class LoadCatalogCommandTestCase(TestCase):
     def test_load_standard_catalogs(self):
@@ -81,3 +277,308 @@ class LoadCatalogCommandTestCase(TestCase):
         call_command("load_catalog", load_standard_catalogs=True)
 
         self.assertEqual(Catalog.objects.count(), 6)
+
+    def test_load_standard_catalogs_in_worker_processes(self):
+        output = StringIO()
+        call_command("load_catalog", load_standard_catalogs=True, workers=2, stdout=output)
+
+        self.assertEqual(Catalog.objects.exclude(content_hash="").count(), 6)
+        self.assertEqual(Controls.objects.filter(ordinal__isnull=False).count(), 1534)
+        self.assertIn("Loaded 6 catalog(s) with 2 worker(s)", output.getvalue())
+
+    def test_baselines_share_one_stored_catalog(self):
+        call_command("load_catalog", load_standard_catalogs=True)
+
+        catalog_paths = {
+            read_profile(catalog.file_name.path).catalog_path
+            for catalog in Catalog.objects.filter(version=Catalog.Version.NIST_SP80053R5)
+        }
+        self.assertEqual(len(catalog_paths), 1)
+        catalog_path = catalog_paths.pop()
+        self.assertTrue(catalog_path.with_name(f"{catalog_path.name}.snapshot").is_file())
+
+    def test_shipped_baseline_is_valid(self):
+        call_command("load_catalog", load_standard_catalogs=True)
+
+        Catalog.objects.get(name="NIST_SP80053r5_MODERATE").full_clean()
+
+    def test_baseline_selecting_unknown_controls_is_invalid(self):
+        path = "catalogs/data/NIST_SP80053/r5/NIST_SP-800-53_rev5_LOW-baseline_profile.json"
+        profile = json.load(store_profile(path, path))
+        profile["profile"]["imports"][0]["include-controls"][0]["with-ids"].append("zz-99")
+        catalog = Catalog(
+            name="Unknown controls",
+            file_name=File(StringIO(json.dumps(profile)), name=path),
+            version=Catalog.Version.NIST_SP80053R5,
+            impact_level=Catalog.ImpactLevel.LOW,
+        )
+
+        with self.assertRaisesMessage(ValidationError, "zz-99"):
+            catalog.full_clean()
+
+    def test_baseline_with_unstored_catalog_is_invalid(self):
+        path = "catalogs/data/NIST_SP80053/r5/NIST_SP-800-53_rev5_LOW-baseline_profile.json"
+        with open(path, "rb") as file:
+            catalog = Catalog(
+                name="Unstored catalog",
+                file_name=File(file, name=path),
+                version=Catalog.Version.NIST_SP80053R5,
+                impact_level=Catalog.ImpactLevel.LOW,
+            )
+
+            with self.assertRaisesMessage(ValidationError, "could not be read"):
+                catalog.full_clean()
+
+
+class BaselineTestCase(SimpleTestCase):
+    @staticmethod
+    def _control(control_id, *children, **fields):
+        control = {"id": control_id, "title": control_id.upper(), **fields}
+        if children:
+            control["controls"] = list(children)
+        return control
+
+    def setUp(self):
+        self.high = {
+            "uuid": "high",
+            "metadata": {"title": "HIGH"},
+            "groups": [
+                {
+                    "id": "ac",
+                    "title": "Access Control",
+                    "controls": [self._control("ac-1"), self._control("ac-2", self._control("ac-2.1"))],
+                },
+                {"id": "au", "title": "Audit", "controls": [self._control("au-1")]},
+            ],
+        }
+        self.low = {
+            "uuid": "low",
+            "metadata": {"title": "LOW"},
+            "groups": [
+                {"id": "ac", "title": "Access Control", "controls": [self._control("ac-1"), self._control("ac-2")]},
+                {"id": "au", "title": "Audit"},
+            ],
+        }
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        full, profiles = split_baselines({"high.json": self.high, "low.json": self.low}, "full.json", "full", {})
+        for name, document in {"full.json": full, **profiles}.items():
+            with open(os.path.join(self.directory.name, name), "w") as file:
+                json.dump(document, file)
+        self.full = full["catalog"]
+
+    def _profile(self, name):
+        return read_profile(os.path.join(self.directory.name, name))
+
+    def test_profiles_resolve_to_their_baselines(self):
+        self.assertEqual(resolve_baseline(self._profile("high.json"), self.full), self.high)
+        self.assertEqual(resolve_baseline(self._profile("low.json"), self.full), self.low)
+        self.assertIsNone(read_profile(os.path.join(self.directory.name, "full.json")))
+
+    def test_baseline_shares_unchanged_controls(self):
+        low = resolve_baseline(self._profile("low.json"), self.full)
+        full_ac = self.full["groups"][0]["controls"]
+
+        self.assertIs(low["groups"][0]["controls"][0], full_ac[0])
+        # ac-2 loses its enhancement, so only it is copied.
+        self.assertIsNot(low["groups"][0]["controls"][1], full_ac[1])
+        self.assertNotIn("controls", low["groups"][0]["controls"][1])
+
+    def test_set_parameters_override_catalog_values(self):
+        self.full["groups"][0]["controls"][0]["params"] = [{"id": "ac-1_prm_1", "label": "frequency"}]
+        profile = self._profile("low.json")._replace(set_parameters={"ac-1_prm_1": {"values": ["annually"]}})
+
+        resolved = resolve_baseline(profile, self.full)
+
+        self.assertEqual(
+            resolved["groups"][0]["controls"][0]["params"],
+            [{"id": "ac-1_prm_1", "label": "frequency", "values": ["annually"]}],
+        )
+        self.assertEqual(self.full["groups"][0]["controls"][0]["params"], [{"id": "ac-1_prm_1", "label": "frequency"}])
+
+    def test_digest_covers_imported_catalog_but_not_its_location(self):
+        path = os.path.join(self.directory.name, "low.json")
+        digest = catalog_digest(path)
+
+        os.rename(os.path.join(self.directory.name, "full.json"), os.path.join(self.directory.name, "moved.json"))
+        with open(path) as file:
+            profile = json.load(file)
+        profile["profile"]["imports"][0]["href"] = "moved.json"
+        with open(path, "w") as file:
+            json.dump(profile, file)
+        self.assertEqual(catalog_digest(path), digest)
+
+        with open(os.path.join(self.directory.name, "moved.json"), "a") as file:
+            file.write("\n")
+        self.assertNotEqual(catalog_digest(path), digest)
+
+
+class ReingestCatalogTestCase(TestCase):
+    def setUp(self):
+        with open("ratoapi/testdata/NIST_SP-800-53_rev5_test.json", "rb") as file:
+            self.cat = Catalog.objects.create(name="NIST Test Catalog", file_name=File(file))
+
+    def _write_release(self, directory: str) -> str:
+        with open("ratoapi/testdata/NIST_SP-800-53_rev5_test.json", "r") as file:
+            data = json.load(file)
+        groups = data["catalog"]["groups"]
+        groups[0]["controls"][0]["title"] = "Policy and Procedures, Revised"
+        groups[-1]["controls"][-1]["id"] = "sr-4"
+
+        path = os.path.join(directory, "NIST_SP-800-53_rev5_test.json")
+        with open(path, "w") as file:
+            json.dump(data, file)
+        return path
+
+    def test_reingest_writes_only_changed_controls(self):
+        count = Controls.objects.filter(catalog=self.cat).count()
+        output = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                "reingest_catalog", catalog=[self.cat.pk], catalog_file=self._write_release(directory), stdout=output
+            )
+
+        self.assertIn("1 added, 1 updated, 1 reordered, 1 retired", output.getvalue())
+        self.assertEqual(Controls.objects.filter(catalog=self.cat).count(), count + 1)
+        self.assertTrue(Controls.objects.get(catalog=self.cat, control_id="sr-3").retired)
+        self.assertEqual(Controls.objects.get(catalog=self.cat, control_id="sr-2").next_id, "sr-4")
+        self.assertEqual(
+            Controls.objects.get(catalog=self.cat, control_id="ac-1").title, "Policy and Procedures, Revised"
+        )
+
+    def test_reingest_adds_new_controls_to_projects(self):
+        user = User.objects.create()
+        project = Project.objects.create(
+            creator=user,
+            title="Reingest",
+            acronym="RI",
+            catalog=self.cat,
+            catalog_version=self.cat.version,
+            impact_level=self.cat.impact_level,
+            location="other",
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                "reingest_catalog",
+                catalog=[self.cat.pk],
+                catalog_file=self._write_release(directory),
+                stdout=StringIO(),
+            )
+
+        added = project.to_project.get(control__control_id="sr-4")
+        self.assertEqual(added.status, ProjectControl.Status.NOT_STARTED)
+        self.assertTrue(project.to_project.filter(control__control_id="sr-3").exists())
+
+    def test_reingest_unchanged_file(self):
+        output = StringIO()
+        call_command("reingest_catalog", catalog=[self.cat.pk], stdout=output)
+
+        self.assertIn("0 added, 0 updated, 0 reordered, 0 retired", output.getvalue())
+
+
+class PreloadCatalogsTestCase(TestCase):
+    def setUp(self):
+        with open("ratoapi/testdata/NIST_SP-800-53_rev5_test.json", "rb") as file:
+            self.cat = Catalog.objects.create(name="NIST Test Catalog", file_name=File(file))
+        catalog_cache.clear()
+        self.addCleanup(gc.unfreeze)
+
+    def test_preload_fills_catalog_cache(self):
+        self.assertEqual(preload_catalogs(), 1)
+        self.assertGreater(gc.get_freeze_count(), 0)
+
+        misses = catalog_cache.stats()["misses"]
+        Tools.from_file(self.cat.file_name.path, catalog_pk=self.cat.pk)
+        self.assertEqual(catalog_cache.stats()["misses"], misses)
+
+    def test_format_memory(self):
+        usage = {
+            "Rss": 2048, "Pss": 1024, "Shared_Clean": 512, "Shared_Dirty": 0, "Private_Clean": 0, "Private_Dirty": 1536
+        }
+
+        self.assertEqual(format_memory(usage), "rss=2.0MiB pss=1.0MiB shared=0.5MiB private=1.5MiB")
+        self.assertEqual(format_memory({"Rss": 1024}), "rss=1.0MiB")
+        self.assertEqual(format_memory({}), "memory usage unavailable")
+
+
+class CrosswalkTestCase(SimpleTestCase):
+    r4 = Catalog.Version.NIST_SP80053R4
+    r5 = Catalog.Version.NIST_SP80053R5
+
+    @staticmethod
+    def _withdrawn(control_id: str, *links) -> dict:
+        return {
+            "id": control_id,
+            "title": "Withdrawn",
+            "props": [{"name": "status", "value": "withdrawn"}],
+            "links": [{"href": href, "rel": rel} for rel, href in links],
+        }
+
+    def test_crosswalk_rows(self):
+        source = version_controls(
+            [
+                {"id": "ac-1", "title": "Access Control Policy and Procedures"},
+                {"id": "ac-2", "title": "Account Management"},
+                {"id": "ac-2.10", "title": "Shared / Group Account Credential Termination"},
+                {"id": "ac-9", "title": "Previous Logon Notification"},
+                {"id": "sa-12", "title": "Supply Chain Protection"},
+                self._withdrawn("ac-13"),
+            ]
+        )
+        target = version_controls(
+            [
+                {"id": "ac-1", "title": "Policy and Procedures"},
+                {"id": "ac-2", "title": "Account Management"},
+                self._withdrawn("ac-2.10", ("incorporated-into", "#ac-2_smt.k"), ("related", "#ac-3")),
+                self._withdrawn("sa-12", ("incorporated-into", "#sr-1"), ("incorporated-into", "#sr-2")),
+                self._withdrawn("ac-9"),
+            ]
+        )
+
+        rows = crosswalk_rows(self.r4, source, self.r5, target)
+
+        self.assertEqual(
+            [(row["source_id"], row["relation"], row["target_id"]) for row in rows],
+            [
+                ("ac-1", ControlCrosswalk.Relation.RENAMED, "ac-1"),
+                ("ac-2", ControlCrosswalk.Relation.SAME, "ac-2"),
+                ("ac-2.10", ControlCrosswalk.Relation.INCORPORATED_INTO, "ac-2"),
+                ("ac-9", ControlCrosswalk.Relation.WITHDRAWN, ""),
+                ("sa-12", ControlCrosswalk.Relation.INCORPORATED_INTO, "sr-1"),
+                ("sa-12", ControlCrosswalk.Relation.INCORPORATED_INTO, "sr-2"),
+            ],
+        )
+
+
+class CrosswalkIngestTestCase(TestCase):
+    def test_rebuild_crosswalks_command(self):
+        call_command("load_catalog", load_standard_catalogs=True)
+        count = ControlCrosswalk.objects.count()
+        ControlCrosswalk.objects.all().delete()
+
+        output = StringIO()
+        call_command("rebuild_crosswalks", stdout=output)
+
+        self.assertEqual(ControlCrosswalk.objects.count(), count)
+        self.assertIn(f"crosswalk: {count} rows", output.getvalue())
+
+    def test_crosswalk_is_built_at_ingest(self):
+        call_command("load_catalog", load_standard_catalogs=True)
+
+        crosswalk = ControlCrosswalk.objects.filter(
+            source_version=Catalog.Version.NIST_SP80053R4, target_version=Catalog.Version.NIST_SP80053R5
+        )
+        self.assertEqual(crosswalk.get(source_id="ac-2").relation, ControlCrosswalk.Relation.SAME)
+        self.assertEqual(crosswalk.get(source_id="ac-1").relation, ControlCrosswalk.Relation.RENAMED)
+        self.assertEqual(
+            list(crosswalk.filter(source_id="ac-2.10").values_list("relation", "target_id")),
+            [(ControlCrosswalk.Relation.INCORPORATED_INTO, "ac-2")],
+        )
+        self.assertEqual(
+            list(crosswalk.filter(source_id="au-8.1").values_list("relation", "target_id")),
+            [(ControlCrosswalk.Relation.MOVED_TO, "sc-45.1")],
+        )
+        self.assertEqual(
+            list(crosswalk.filter(source_id="sc-19").values_list("relation", "target_id")),
+            [(ControlCrosswalk.Relation.WITHDRAWN, "")],
+        )
@@ -1,10 +1,16 @@
+from pathlib import Path
 from typing import List
 
 from django.core.files import File
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 
-from .catalogio import CatalogTools as Tools
+from ratoapi.cache import catalog_cache
+from ratoapi.oscal.catalog import CatalogModel
+
+from .catalogio import CatalogLoadError, CatalogTools as Tools
+from .compact import CompactCatalog
 from .models import Catalog
+from .snapshot import CatalogSnapshot, remove_snapshot, write_snapshot
 
 
 class CatalogModelTest(TestCase):
@@ -112,3 +118,184 @@ class CatalogModelTest(TestCase):
         """Get a control by the Control ID"""
         control = self.catalog.get_next_control_by_id("ac-1")
         self.assertEqual(control, "ac-2")
+
+    def test_get_next_control_by_id_at_end_or_missing(self):
+        last = self.catalog.get_control_ids()[-1]
+        self.assertEqual(self.catalog.get_next_control_by_id(last), "")
+        self.assertEqual(self.catalog.get_next_control_by_id("zz-1"), "")
+
+    def test_get_previous_control_by_id(self):
+        self.assertEqual(self.catalog.get_previous_control_by_id("ac-2"), "ac-1")
+        self.assertEqual(self.catalog.get_previous_control_by_id("ac-1"), "")
+
+    def test_get_control_data_simplified(self):
+        data = self.catalog.get_control_data_simplified("ac-2")
+        self.assertEqual(data["family"], "Access Control")
+        self.assertEqual(data["next_id"], "at-1")
+
+
+class CatalogCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with open("ratoapi/testdata/NIST_SP-800-53_rev5_test.json", "rb") as file:
+            cls.cat = Catalog.objects.create(
+                name="NIST Test Catalog",
+                file_name=File(file),
+            )
+
+    def setUp(self):
+        catalog_cache.clear()
+
+    def test_from_file_is_cached(self):
+        first = Tools.from_file(self.cat.file_name.path, catalog_pk=self.cat.pk)
+        second = Tools.from_file(self.cat.file_name.path, catalog_pk=self.cat.pk)
+
+        self.assertIs(first, second)
+        self.assertEqual(catalog_cache.stats()["hits"], 1)
+        self.assertEqual(catalog_cache.stats()["misses"], 1)
+
+    def test_changed_file_is_reloaded(self):
+        first = Tools.from_file(self.cat.file_name.path, catalog_pk=self.cat.pk)
+        with open(self.cat.file_name.path, "a") as file:
+            file.write("\n")
+        second = Tools.from_file(self.cat.file_name.path, catalog_pk=self.cat.pk)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(len(catalog_cache), 1)
+
+    def test_missing_file_raises_load_error(self):
+        with self.assertRaises(CatalogLoadError):
+            Tools.from_file("not/a/catalog.json")
+
+
+class CatalogSnapshotTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with open("ratoapi/testdata/NIST_SP-800-53_rev5_test.json", "rb") as file:
+            cls.cat = Catalog.objects.create(
+                name="NIST Test Catalog",
+                file_name=File(file),
+            )
+
+    def setUp(self):
+        catalog_cache.clear()
+        self.path = self.cat.file_name.path
+        write_snapshot(self.path)
+        self.addCleanup(remove_snapshot, self.path)
+
+    def test_snapshot_matches_json(self):
+        from_json = Tools(self.path)
+        from_snapshot = Tools.from_file(self.path)
+
+        self.assertIsNotNone(from_snapshot._snapshot)
+        self.assertEqual(from_snapshot.get_controls_all_ids(), from_json.get_controls_all_ids())
+        self.assertEqual(
+            from_snapshot.get_control_data_simplified("ac-2"),
+            from_json.get_control_data_simplified("ac-2"),
+        )
+        self.assertEqual(from_snapshot.oscal, from_json.oscal)
+
+    def test_lookup_decodes_only_requested_controls(self):
+        catalog = Tools.from_file(self.path)
+        catalog.get_control_by_id("ac-2")
+
+        self.assertEqual(list(catalog._controls_by_id._decoded), ["ac-2"])
+
+    def test_stale_snapshot_is_ignored(self):
+        with open(self.path, "a") as file:
+            file.write("\n")
+
+        self.assertIsNone(CatalogSnapshot.open_fresh(self.path))
+        self.assertIsNone(Tools.from_file(self.path)._snapshot)
+
+
+class CompactCatalogTest(SimpleTestCase):
+    path = "ratoapi/testdata/NIST_SP-800-53_rev5_test.json"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tools = Tools(cls.path)
+        cls.compact = CompactCatalog._load(Path(cls.path))
+
+    def test_rebuilds_catalog(self):
+        self.assertEqual(self.compact.to_catalog(), self.tools.oscal)
+        self.assertEqual(self.compact.control_dict("ac-2"), self.tools.get_control_by_id("ac-2"))
+
+    def test_control_summaries_match_catalog_model(self):
+        model = CatalogModel._parse_json(self.path)
+        control_ids = self.tools.get_controls_all_ids()
+
+        self.assertEqual(self.compact.control_summaries(control_ids), model.control_summaries(control_ids))
+        self.assertEqual(self.compact.title, model.metadata.title)
+
+    def test_strings_and_props_are_shared(self):
+        other = CompactCatalog._load(Path(self.path))
+        ac_2, other_ac_2 = self.compact.controls["ac-2"], other.controls["ac-2"]
+
+        self.assertIs(ac_2.parts[0].prose, other_ac_2.parts[0].prose)
+        self.assertIs(ac_2.props[0].keys, self.compact.controls["ac-1"].props[0].keys)
+
+    def test_catalog_tools_reads_compact_catalog(self):
+        tools = Tools.from_compact(self.compact)
+
+        self.assertEqual(tools.get_controls_all_ids(), self.tools.get_controls_all_ids())
+        self.assertEqual(tools.get_control_data_simplified("ac-2"), self.tools.get_control_data_simplified("ac-2"))
+        self.assertEqual(tools.get_next_control_by_id("ac-2"), self.tools.get_next_control_by_id("ac-2"))
+        self.assertEqual(tools.oscal, self.tools.oscal)
+        self.assertEqual(tools.get_group_ids(), self.tools.get_group_ids())
+
+    def test_compact_catalog_is_assembled_once(self):
+        tools = Tools.from_compact(self.compact)
+
+        self.assertIs(tools.oscal, tools.oscal)
+        self.assertIs(tools.info["groups"], tools.oscal["groups"])
+
+    def test_control_dicts_are_copies(self):
+        tools = Tools.from_compact(self.compact)
+        tools.get_control_by_id("ac-2")["title"] = "Changed"
+
+        self.assertEqual(tools.get_control_by_id("ac-2")["title"], self.tools.get_control_by_id("ac-2")["title"])
+
+    @override_settings(CATALOG_COMPACT=True)
+    def test_from_file_uses_compact_catalog(self):
+        catalog_cache.clear()
+        self.addCleanup(catalog_cache.clear)
+
+        tools = Tools.from_file(self.path, catalog_pk=1)
+
+        self.assertIs(tools._compact, CompactCatalog.from_file(self.path, catalog_pk=1))
+
+
+class BaselineCatalogTest(SimpleTestCase):
+    path = "catalogs/data/NIST_SP80053/r5/NIST_SP-800-53_rev5_LOW-baseline_profile.json"
+    catalog_path = "catalogs/data/NIST_SP80053/r5/NIST_SP-800-53_rev5_baselines_catalog.json"
+
+    def setUp(self):
+        catalog_cache.clear()
+        self.addCleanup(catalog_cache.clear)
+
+    def test_catalog_tools_shares_full_catalog_controls(self):
+        baseline = Tools.from_file(self.path)
+        full = Tools.from_file(self.catalog_path)
+
+        self.assertIs(Tools.from_file(self.path), baseline)
+        self.assertIs(baseline.get_control_by_id("ac-1"), full.get_control_by_id("ac-1"))
+        self.assertNotIn("ac-2.1", baseline.get_controls_all_ids())
+        self.assertEqual(Tools(self.path).oscal, baseline.oscal)
+
+    def test_catalog_model_shares_full_catalog_controls(self):
+        baseline = CatalogModel.from_json(self.path)
+        full = CatalogModel.from_json(self.catalog_path)
+
+        self.assertIs(baseline.get_control("ac-1"), full.get_control("ac-1"))
+        self.assertIsNone(baseline.get_control("ac-2.1"))
+        self.assertEqual(baseline.get_next(baseline.get_control("ac-2")), "ac-3")
+        self.assertEqual(baseline.metadata.title, "NIST Special Publication 800-53 Revision 5 LOW IMPACT BASELINE")
+
+    def test_compact_catalog_shares_full_catalog_records(self):
+        baseline = CompactCatalog.from_file(self.path)
+        full = CompactCatalog.from_file(self.catalog_path)
+
+        self.assertIs(baseline.controls["ac-1"], full.controls["ac-1"])
+        self.assertEqual(baseline.to_catalog(), Tools.from_file(self.path).oscal)
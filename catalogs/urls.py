@@ -1,11 +1,19 @@
 from django.urls import path
 
-from .views import CatalogListView, CatalogControlsView, CatalogControlDescriptionView
+from .views import (
+    CatalogControlBatchView,
+    CatalogControlDescriptionView,
+    CatalogControlsView,
+    CatalogListView,
+    CatalogSearchView,
+)
 
 urlpatterns = [
     path("", CatalogListView.as_view(), name="catalog-list"),
     path("<int:catalog>/controls/all/", CatalogControlsView.as_view(), name="get_all_controls"),
+    path("<int:catalog>/controls/batch/", CatalogControlBatchView.as_view(), name="get_controls_batch"),
     path(
         "<int:catalog>/control/<str:control_id>/", CatalogControlDescriptionView.as_view(), name="get_control_by_id",
     ),
+    path("<int:catalog>/search/", CatalogSearchView.as_view(), name="catalog-search"),
 ]
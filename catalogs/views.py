@@ -1,13 +1,23 @@
+import json
 from pathlib import Path
+from typing import Any, Iterable, Iterator, List
 
+from django.http import StreamingHttpResponse
+from django.http.response import HttpResponseBase
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.request import Request
 
+from . import conditional
 from .catalogio import CatalogTools as Tools
 from .models import Catalog
-from .serializers import CatalogListSerializer
+from .pagination import ControlCursorPagination
+from .search import search_controls
+from .serializers import CatalogListSerializer, ControlBatchSerializer
+
+# Streamed control lists are written in chunks of about this many characters, rather than one write per control.
+_STREAM_CHUNK_SIZE = 8192
 
 
 class CatalogListView(generics.ListAPIView):
@@ -18,6 +28,15 @@ class CatalogListView(generics.ListAPIView):
     permission_classes = [AllowAny, ]
     serializer_class = CatalogListSerializer
 
+    def list(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        queryset = self.filter_queryset(self.get_queryset())
+        fields = self.get_serializer_class().Meta.fields
+        etag = conditional.make_etag(conditional.catalog_list_version(queryset.values_list("updated", *fields)))
+        if response := conditional.not_modified(request, etag):
+            return response
+
+        return conditional.finalize(super().list(request, *args, **kwargs), etag)
+
 
 class CatalogControlBaseView(generics.GenericAPIView):
     queryset = Catalog.objects.all()
@@ -27,23 +46,162 @@ class CatalogControlBaseView(generics.GenericAPIView):
     @staticmethod
     def _parse_catalog(catalog: Catalog) -> Tools:
         """Parse Catalog instance into CatalogTools for easy data access."""
-        return Tools(Path(catalog.file_name.path))
+        return Tools.from_file(Path(catalog.file_name.path), catalog_pk=catalog.pk)
+
+    def get_catalog(self) -> Catalog:
+        return super().get_object()
 
     def get_object(self):
-        instance = super().get_object()
-        return self._parse_catalog(instance)
+        return self._parse_catalog(self.get_catalog())
 
 
 class CatalogControlsView(CatalogControlBaseView):
-    def get(self, request: Request, *args, **kwargs) -> Response:
-        catalog = self.get_object()
+    """List the controls of a catalog.
+
+    Supports ``family`` (comma-separated group ids) filtering and ``fields`` (comma-separated control keys)
+    projection. Passing ``page_size`` or ``cursor`` returns cursor-paginated results; otherwise every control is
+    returned as a single JSON document, precompressed when the client accepts it and streamed when it does not.
+    """
+
+    pagination_class = ControlCursorPagination
+
+    def get(self, request: Request, *args, **kwargs) -> HttpResponseBase:
+        instance = self.get_catalog()
+        paginated = self.paginator.is_requested(request)
+        encoding = conditional.IDENTITY if paginated else conditional.negotiate_encoding(request)
+        version = conditional.catalog_version(instance)
+        etag = conditional.make_etag(version, encoding)
+        if response := conditional.not_modified(request, etag, negotiated=not paginated):
+            return response
+
+        if paginated:
+            catalog = self._parse_catalog(instance)
+            page = self.paginate_queryset(self._filter_control_ids(catalog, request))
+            response = self.get_paginated_response(list(self._get_controls(catalog, page, request)))
+            return conditional.finalize(response, etag)
 
-        return Response({"controls": catalog.get_controls_all()}, status=status.HTTP_200_OK)
+        if encoding == conditional.IDENTITY:
+            response = StreamingHttpResponse(
+                self._stream_controls(instance, request),
+                content_type="application/json",
+                status=status.HTTP_200_OK,
+            )
+        else:
+            response = conditional.compressed_response(
+                request,
+                version,
+                encoding,
+                lambda: "".join(self._stream_controls(instance, request)).encode("utf-8"),
+                content_type="application/json",
+            )
+        return conditional.finalize(response, etag, negotiated=True)
+
+    def _stream_controls(self, instance: Catalog, request: Request) -> Iterator[str]:
+        catalog = self._parse_catalog(instance)
+        control_ids = self._filter_control_ids(catalog, request)
+        return _stream_json_list("controls", self._get_controls(catalog, control_ids, request))
+
+    @staticmethod
+    def _filter_control_ids(catalog: Tools, request: Request) -> List[str]:
+        control_ids = catalog.get_controls_all_ids()
+
+        if families := _split_param(request, "family"):
+            families = {family.lower() for family in families}
+            control_ids = [
+                control_id
+                for control_id in control_ids
+                if catalog.get_group_id_by_control_id(control_id).lower() in families
+            ]
+
+        return control_ids
+
+    @staticmethod
+    def _get_controls(catalog: Tools, control_ids: Iterable[str], request: Request) -> Iterator[dict]:
+        keys = None
+        if fields := _split_param(request, "fields"):
+            keys = ["id", *(field for field in fields if field != "id")]
+
+        for control_id in control_ids:
+            control = catalog.get_control_by_id(control_id)
+            yield control if keys is None else {key: control[key] for key in keys if key in control}
 
 
 class CatalogControlDescriptionView(CatalogControlBaseView):
-    def get(self, request: Request, control_id: str, *args, **kwargs) -> Response:
-        catalog = self.get_object()
+    def get(self, request: Request, control_id: str, *args, **kwargs) -> HttpResponseBase:
+        instance = self.get_catalog()
+        etag = conditional.make_etag(conditional.catalog_version(instance))
+        if response := conditional.not_modified(request, etag):
+            return response
+
+        catalog = self._parse_catalog(instance)
         control = catalog.get_control_by_id(control_id)
 
-        return Response({"description": catalog.get_control_statement(control)})
+        return conditional.finalize(Response({"description": catalog.get_control_statement(control)}), etag)
+
+
+class CatalogControlBatchView(CatalogControlBaseView):
+    """Return fields of many controls at once, read from a single parsed catalog.
+
+    Takes ``control_ids`` (up to 500) and an optional ``fields`` projection, which defaults to the statement returned
+    by the control detail endpoint as ``description``. Ids that are not in the catalog are listed under ``missing``.
+    """
+
+    serializer_class = ControlBatchSerializer
+
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        fields = list(dict.fromkeys(serializer.validated_data["fields"]))
+
+        catalog = self.get_object()
+        controls, missing = {}, []
+        for control_id in dict.fromkeys(serializer.validated_data["control_ids"]):
+            if catalog.get_control_by_id(control_id):
+                controls[control_id] = catalog.get_control_fields(control_id, fields)
+            else:
+                missing.append(control_id)
+
+        return Response({"controls": controls, "missing": missing}, status=status.HTTP_200_OK)
+
+
+class CatalogSearchView(CatalogControlBaseView):
+    """Full-text search of a catalog's controls by title, statement, parameter labels and guidance.
+
+    ``q`` takes web-search syntax (quoted phrases, ``or``, ``-term``); ``limit`` caps the number of results.
+    """
+
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response({"message": "A search query, q, is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = min(int(request.query_params.get("limit", self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+
+        results = search_controls(self.get_catalog(), query, max(limit, 1))
+        return Response({"query": query, "results": results}, status=status.HTTP_200_OK)
+
+
+def _split_param(request: Request, name: str) -> List[str]:
+    return [value.strip() for value in request.query_params.get(name, "").split(",") if value.strip()]
+
+
+def _stream_json_list(key: str, items: Iterable[Any]) -> Iterator[str]:
+    """Encode {key: items} incrementally, in chunks of about _STREAM_CHUNK_SIZE characters."""
+    encoder = json.JSONEncoder()
+    chunk = [f"{{{json.dumps(key)}: ["]
+    size = 0
+    for position, item in enumerate(items):
+        encoded = encoder.encode(item)
+        chunk.append(f", {encoded}" if position else encoded)
+        size += len(encoded)
+        if size >= _STREAM_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk, size = [], 0
+    chunk.append("]}")
+    yield "".join(chunk)
@@ -1,5 +1,6 @@
 from django.apps import AppConfig
-from django.db.models.signals import pre_save
+from django.conf import settings
+from django.db.models.signals import post_save, pre_save
 
 
 class ComponentsConfig(AppConfig):
@@ -8,7 +9,14 @@ class ComponentsConfig(AppConfig):
 
     def ready(self):
         from components.signals import (
-            parse_component_json, add_description, convert_to_lowercase, add_controls, add_supported_catalog_versions
+            parse_component_json,
+            add_description,
+            convert_to_lowercase,
+            add_controls,
+            add_supported_catalog_versions,
+            record_content_hash,
+            sync_requirements,
+            update_search_vector,
         )
 
         signal_setup = [
@@ -16,8 +24,16 @@ class ComponentsConfig(AppConfig):
             (add_description, "parse_component_description"),
             (convert_to_lowercase, "lower_case_component_type"),
             (add_controls, "parse_component_controls"),
-            (add_supported_catalog_versions, "add_supported_catalog_versions")
+            (add_supported_catalog_versions, "add_supported_catalog_versions"),
+            (record_content_hash, "record_component_content_hash"),
         ]
 
         for receiver, uid in signal_setup:
             pre_save.connect(receiver, sender="components.Component", dispatch_uid=uid)
+        post_save.connect(sync_requirements, sender="components.Component", dispatch_uid="sync_component_requirements")
+        post_save.connect(update_search_vector, sender="components.Component", dispatch_uid="update_component_search")
+
+        if settings.OSCAL_SCHEMA_PRECOMPILE:
+            from ratoapi.oscal.schemas import get_validator
+
+            get_validator("component")
@@ -0,0 +1,66 @@
+"""Parsed component documents, cached per worker.
+
+Building a ``ComponentModel`` for every component on every control request is the main cost of the project control
+views, so each worker keeps the models it built in a bounded cache. An entry is keyed by the Component pk and is only
+reused while the component's ``updated`` time and content hash are unchanged, so a saved component is parsed again on
+its next use. ``component_cache.stats()`` reports the hit rate and the approximate memory of the cached models.
+
+Cached models are shared between requests and must not be changed; ``get_component_model(component, copy=True)``
+returns a copy that can be.
+"""
+from typing import Dict, NamedTuple, Optional
+
+from django.conf import settings
+
+from components.models import Component
+from ratoapi.cache import BoundedCache, approximate_size
+from ratoapi.oscal.component import ComponentModel, ImplementedRequirement
+
+component_cache = BoundedCache(
+    "components", maxsize=getattr(settings, "COMPONENT_CACHE_SIZE", 256), sizeof=approximate_size
+)
+
+
+class ParsedComponent(NamedTuple):
+    model: ComponentModel
+    # catalog version -> control id -> implemented requirement, for the first component in the definition.
+    requirements: Dict[str, Dict[str, ImplementedRequirement]]
+
+    def get_control(self, control_id: str, catalog_version: str) -> Optional[ImplementedRequirement]:
+        return self.requirements.get(str(catalog_version), {}).get(control_id)
+
+
+def index_requirements(model: ComponentModel) -> Dict[str, Dict[str, ImplementedRequirement]]:
+    """Index the implemented requirements of the first component by catalog version and control id."""
+    requirements: Dict[str, Dict[str, ImplementedRequirement]] = {}
+    if not model.component_definition.components:
+        return requirements
+
+    for implementation in model.component_definition.components[0].control_implementations:
+        # Like ComponentDefinition.get_control, use the first implementation of a version and its first requirement.
+        if str(implementation.description) in requirements:
+            continue
+        controls = requirements[str(implementation.description)] = {}
+        for requirement in implementation.implemented_requirements:
+            controls.setdefault(requirement.control_id, requirement)
+    return requirements
+
+
+def _parse(component: Component) -> ParsedComponent:
+    model = ComponentModel.from_document(component.component_json, trusted_hash=component.content_hash)
+    return ParsedComponent(model, index_requirements(model))
+
+
+def parsed_component(component: Component) -> ParsedComponent:
+    """Return the parsed document of a saved Component, with its requirements indexed by catalog version and control."""
+    if component.pk is None or component.updated is None:
+        return _parse(component)
+
+    return component_cache.get_or_load(
+        component.pk, lambda: _parse(component), version=(component.updated, component.content_hash)
+    )
+
+
+def get_component_model(component: Component, copy: bool = False) -> ComponentModel:
+    model = parsed_component(component).model
+    return model.copy(deep=True) if copy else model
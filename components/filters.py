@@ -1,9 +1,9 @@
-from django.db.models import Q
 from django_filters import rest_framework as filters
 from guardian.shortcuts import get_objects_for_user
 from rest_framework.filters import BaseFilterBackend
 
 from components.models import Component
+from components.search import search_components
 
 
 class ComponentFilter(filters.FilterSet):
@@ -19,9 +19,7 @@ class ComponentFilter(filters.FilterSet):
         fields = ["search", "type"]
 
     def keyword_search(self, queryset, name, value):  # pylint: disable=unused-argument
-        return queryset.filter(
-            Q(title__icontains=value) | Q(description__icontains=value)
-        )
+        return search_components(queryset, value)
 
     def filter_version(self, queryset, name, value):  # pylint: disable=unused-argument
         return queryset.filter(supported_catalog_versions__overlap=[value])
@@ -1,11 +1,15 @@
 import json
 
-import jsonschema
 from django.core.exceptions import ValidationError
 from django.forms import ModelForm
 
+from ratoapi.oscal import schemas
+
 from .models import Component
 
+# Number of schema errors reported back to the admin for an invalid upload.
+MAX_REPORTED_ERRORS = 10
+
 
 class ComponentAdminForm(ModelForm):
     class Meta:
@@ -19,10 +23,12 @@ class ComponentAdminForm(ModelForm):
     def clean_component_file(self):
         component_upload = self.cleaned_data.get("component_file")
         component = json.load(component_upload.file)
-        with open("components/schema/oscal_component_schema.json", "r") as file:
-            oscal_schema = json.load(file)
-        try:
-            jsonschema.validate(instance=component, schema=oscal_schema)
-        except ValidationError as exc:
-            raise ValidationError("OSCAL validation error") from exc
+        errors = schemas.validation_errors(component, "component", collect_all=True)
+        if errors:
+            raise ValidationError(
+                [
+                    "OSCAL validation error",
+                    *(f"{error.json_path}: {error.message}" for error in errors[:MAX_REPORTED_ERRORS]),
+                ]
+            )
         return component_upload
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from pydantic import ValidationError
+
+from components.models import Component
+from ratoapi.oscal.component import ComponentModel
+from ratoapi.oscal.oscal import document_hash
+
+
+class Command(BaseCommand):
+    help = "Validate the component_json of components without a content hash and record the hash of those that pass."
+
+    def handle(self, *args, **options):
+        recorded = invalid = 0
+        components = Component.objects.exclude(component_json=None).filter(content_hash="")
+        for pk, document in components.values_list("pk", "component_json").iterator():
+            try:
+                ComponentModel(**document)
+            except (ValidationError, TypeError):
+                invalid += 1
+                continue
+            # update() rather than save(), so the components keep their updated time and cached documents.
+            Component.objects.filter(pk=pk).update(content_hash=document_hash(document))
+            recorded += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Recorded the content hash of {recorded} components; {invalid} failed validation")
+        )
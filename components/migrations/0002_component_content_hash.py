@@ -0,0 +1,23 @@
+# Generated by Django 4.1.6 on 2026-10-18 17:54
+
+"""Adds Component.content_hash, the hash of component_json when it last passed validation.
+
+Existing components start without a hash, so their documents are validated on every read until they are saved again.
+``python manage.py record_component_hashes`` records them after migrating.
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of component_json when it last passed validation', max_length=64),
+        ),
+    ]
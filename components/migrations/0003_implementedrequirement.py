@@ -0,0 +1,92 @@
+# Generated by Django 4.1.6 on 2026-10-18 18:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# The catalog versions the application knew when this migration was written.
+CATALOG_VERSIONS = ("NIST_SP80053r5", "NIST_SP80053r4")
+
+
+def _prop(requirement, name):
+    return next((prop.get("value") for prop in requirement.get("props") or () if prop.get("name") == name), None)
+
+
+def requirement_rows(document):
+    """Return the row values of a component_json document's requirements, keyed by catalog version and control.
+
+    A frozen copy of components.requirements.requirement_rows over the raw document: the first implementation of a
+    version and its first requirement for each control are used.
+    """
+    rows = {}
+    components = document.get("component-definition", {}).get("components") or []
+    if not components:
+        return rows
+
+    seen = set()
+    for implementation in components[0].get("control-implementations") or ():
+        version = str(implementation.get("description"))
+        if version in seen:
+            continue
+        seen.add(version)
+        if version not in CATALOG_VERSIONS:
+            continue
+        for requirement in implementation.get("implemented-requirements") or ():
+            rows.setdefault(
+                (version, requirement["control-id"]),
+                {
+                    "description": str(requirement.get("description") or ""),
+                    "responsibility": _prop(requirement, "security_control_type"),
+                    "provider": _prop(requirement, "provider"),
+                },
+            )
+    return rows
+
+
+def add_implemented_requirements(apps, schema_editor):
+    Component = apps.get_model("components", "Component")
+    ImplementedRequirement = apps.get_model("components", "ImplementedRequirement")
+    for component in Component.objects.exclude(component_json=None).only("pk", "component_json"):
+        try:
+            rows = requirement_rows(component.component_json)
+        except (AttributeError, KeyError, TypeError):
+            continue
+        ImplementedRequirement.objects.bulk_create(
+            [
+                ImplementedRequirement(
+                    component_id=component.pk, catalog_version=version, control_id=control_id, **values
+                )
+                for (version, control_id), values in rows.items()
+            ],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0002_component_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImplementedRequirement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('catalog_version', models.CharField(choices=[('NIST_SP80053r5', 'NIST 800-53 r5'), ('NIST_SP80053r4', 'NIST 800-53 r4')], max_length=16)),
+                ('control_id', models.CharField(max_length=30)),
+                ('description', models.TextField(blank=True)),
+                ('responsibility', models.TextField(blank=True, null=True)),
+                ('provider', models.TextField(blank=True, null=True)),
+                ('component', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='implemented_requirements', to='components.component')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='implementedrequirement',
+            index=models.Index(fields=['control_id', 'catalog_version'], name='implemented_req_control_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='implementedrequirement',
+            constraint=models.UniqueConstraint(fields=('component', 'catalog_version', 'control_id'), name='implemented_req_unique'),
+        ),
+        migrations.RunPython(add_implemented_requirements, migrations.RunPython.noop),
+    ]
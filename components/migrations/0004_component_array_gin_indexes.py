@@ -0,0 +1,22 @@
+# Generated by Django 4.1.6 on 2026-10-18 18:28
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0003_implementedrequirement'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='component',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['controls'], name='component_controls_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['supported_catalog_versions'], name='component_versions_gin'),
+        ),
+    ]
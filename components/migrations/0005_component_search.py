@@ -0,0 +1,74 @@
+# Generated by Django 4.1.6 on 2026-10-18 18:29
+
+import logging
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import F, Func, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+logger = logging.getLogger(__name__)
+
+
+def populate_search_vectors(apps, schema_editor):
+    Component = apps.get_model("components", "Component")
+    ImplementedRequirement = apps.get_model("components", "ImplementedRequirement")
+    narratives = Subquery(
+        ImplementedRequirement.objects.filter(component=OuterRef("pk"))
+        .order_by()
+        .values("component")
+        .annotate(text=StringAgg("description", " "))
+        .values("text"),
+        output_field=TextField(),
+    )
+    Component.objects.update(
+        search_vector=SearchVector("title", weight="A", config="english")
+        + SearchVector("description", weight="B", config="english")
+        + SearchVector(
+            Func(F("search_terms"), Value(" "), function="array_to_string", output_field=TextField()),
+            weight="C",
+            config="english",
+        )
+        + SearchVector(Coalesce(narratives, Value(""), output_field=TextField()), weight="D", config="english")
+    )
+
+
+def add_title_trigram_index(apps, schema_editor):
+    """Install pg_trgm and index component titles for similarity search, where the server provides pg_trgm."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            logger.warning("pg_trgm is not available; component search will not match misspelled titles")
+            return
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS component_title_trgm ON components_component USING gin (title gin_trgm_ops)"
+        )
+
+
+def remove_title_trigram_index(apps, schema_editor):
+    schema_editor.execute("DROP INDEX IF EXISTS component_title_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('components', '0004_component_array_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Weighted full-text vector of the title, description, search terms and narratives', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='component_search_vector_gin'),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+        migrations.RunPython(add_title_trigram_index, remove_title_trigram_index),
+    ]
@@ -1,5 +1,7 @@
 from django.contrib.postgres.fields import ArrayField
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 
 from catalogs.models import Catalog
 
@@ -60,6 +62,55 @@ class Component(models.Model):
         help_text="Upload an OSCAL formatted JSON Component file",
     )
     status = models.IntegerField(default=Status.PUBLIC, choices=Status.choices)
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text="SHA-256 of component_json when it last passed validation",
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Weighted full-text vector of the title, description, search terms and narratives",
+    )
+
+    def save(self, *args, **kwargs):
+        # The implemented_requirements rows are synced from component_json by a post_save signal; saving both in one
+        # transaction keeps them from disagreeing.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
+
+    class Meta:
+        indexes = [
+            # Serve containment lookups such as controls @> ARRAY['ac-2'].
+            GinIndex(fields=["controls"], name="component_controls_gin"),
+            GinIndex(fields=["supported_catalog_versions"], name="component_versions_gin"),
+            GinIndex(fields=["search_vector"], name="component_search_vector_gin"),
+        ]
+
+
+class ImplementedRequirement(models.Model):
+    """A control narrative of a Component, copied from its component_json by components.requirements."""
+
+    component = models.ForeignKey(Component, on_delete=models.CASCADE, related_name="implemented_requirements")
+    catalog_version = models.CharField(choices=Catalog.Version.choices, max_length=16)
+    control_id = models.CharField(max_length=30)
+    description = models.TextField(blank=True)
+    responsibility = models.TextField(null=True, blank=True)
+    provider = models.TextField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.component_id} {self.catalog_version} {self.control_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["control_id", "catalog_version"], name="implemented_req_control_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["component", "catalog_version", "control_id"], name="implemented_req_unique"
+            ),
+        ]
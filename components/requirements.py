@@ -0,0 +1,67 @@
+"""The implemented requirements of each Component as ImplementedRequirement rows.
+
+The narratives of a component otherwise live only in its component_json, so finding the components that implement a
+control would mean parsing every component. The rows are synced whenever a component is saved, in the same
+transaction, and hold the requirements of the catalog versions the application knows.
+"""
+import logging
+from typing import Dict, Tuple
+
+from django.db import transaction
+from pydantic import ValidationError
+
+from catalogs.models import Catalog
+from components.cache import parsed_component
+from components.models import Component, ImplementedRequirement
+from ratoapi.oscal import component as oscal_component
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("description", "responsibility", "provider")
+
+
+def requirement_rows(
+    requirements: Dict[str, Dict[str, oscal_component.ImplementedRequirement]]
+) -> Dict[Tuple[str, str], dict]:
+    """Return the row values of indexed requirements (see components.cache), keyed by catalog version and control."""
+    return {
+        (version, control_id): {
+            "description": str(requirement.description),
+            "responsibility": requirement.responsibility,
+            "provider": requirement.provider,
+        }
+        for version, controls in requirements.items()
+        if version in Catalog.Version.values
+        for control_id, requirement in controls.items()
+    }
+
+
+def sync_implemented_requirements(component: Component):
+    """Bring the ImplementedRequirement rows of a saved Component in line with its component_json."""
+    rows: Dict[Tuple[str, str], dict] = {}
+    if component.component_json:
+        try:
+            rows = requirement_rows(parsed_component(component).requirements)
+        except (ValidationError, TypeError, AttributeError) as exc:
+            logger.warning("Could not read the implemented requirements of component %s: %s", component.pk, exc)
+
+    existing = {
+        (requirement.catalog_version, requirement.control_id): requirement
+        for requirement in ImplementedRequirement.objects.filter(component=component)
+    }
+    added, updated = [], []
+    for key, values in rows.items():
+        requirement = existing.pop(key, None)
+        if requirement is None:
+            added.append(
+                ImplementedRequirement(component=component, catalog_version=key[0], control_id=key[1], **values)
+            )
+        elif any(getattr(requirement, field) != values[field] for field in FIELDS):
+            for field in FIELDS:
+                setattr(requirement, field, values[field])
+            updated.append(requirement)
+
+    with transaction.atomic():
+        ImplementedRequirement.objects.filter(pk__in=[requirement.pk for requirement in existing.values()]).delete()
+        ImplementedRequirement.objects.bulk_create(added, batch_size=500)
+        ImplementedRequirement.objects.bulk_update(updated, FIELDS, batch_size=500)
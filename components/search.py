@@ -0,0 +1,64 @@
+"""Ranked keyword search over components.
+
+Components are matched against ``Component.search_vector`` (GIN indexed), a weighted vector of the title, description,
+search terms and implemented-requirement narratives, and ranked with ``ts_rank``. Where the ``pg_trgm`` extension is
+installed, titles within trigram similarity of the query also match, so a misspelled name still finds its component;
+those matches rank after full-text matches, by similarity.
+"""
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connection
+from django.db.models import F, Func, OuterRef, Q, QuerySet, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+from components.models import ImplementedRequirement
+
+SEARCH_CONFIG = "english"
+
+_trigram_available = {}
+
+
+def component_search_vector() -> SearchVector:
+    search_terms = Func(F("search_terms"), Value(" "), function="array_to_string", output_field=TextField())
+    narratives = Subquery(
+        ImplementedRequirement.objects.filter(component=OuterRef("pk"))
+        .order_by()
+        .values("component")
+        .annotate(text=StringAgg("description", " "))
+        .values("text"),
+        output_field=TextField(),
+    )
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="B", config=SEARCH_CONFIG)
+        + SearchVector(search_terms, weight="C", config=SEARCH_CONFIG)
+        + SearchVector(Coalesce(narratives, Value(""), output_field=TextField()), weight="D", config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(components: QuerySet):
+    """Recompute the search vector of the given Component rows."""
+    components.update(search_vector=component_search_vector())
+
+
+def trigram_available() -> bool:
+    """Return whether the pg_trgm extension is installed in the database."""
+    key = connection.settings_dict["NAME"]
+    if key not in _trigram_available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available[key] = cursor.fetchone() is not None
+    return _trigram_available[key]
+
+
+def search_components(queryset: QuerySet, query: str) -> QuerySet:
+    """Return the components of queryset that match query, best match first."""
+    search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+    matches = Q(search_vector=search_query)
+    queryset = queryset.annotate(rank=SearchRank(F("search_vector"), search_query))
+    if trigram_available():
+        matches |= Q(title__trigram_similar=query)
+        queryset = queryset.annotate(similarity=TrigramSimilarity("title", query))
+        return queryset.filter(matches).order_by("-rank", "-similarity", "pk")
+
+    return queryset.filter(matches).order_by("-rank", "pk")
@@ -7,12 +7,18 @@ from rest_framework import serializers
 
 from catalogs.catalogio import CatalogTools
 from catalogs.models import Catalog
+from components.cache import get_component_model
 from components.models import Component
 from projects.models import Project
 from ratoapi.oscal.component import ComponentModel, ImplementedRequirement
+from ratoapi.serializers import FieldSelectionMixin
 
 
-class ComponentListSerializer(serializers.ModelSerializer):
+# Large columns that list views defer unless the serializer outputs them.
+DEFERRABLE_COLUMNS = ("component_json", "search_vector")
+
+
+class ComponentListSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     controls_count = serializers.SerializerMethodField()
 
     def get_controls_count(self, obj):
@@ -35,9 +41,11 @@ class ComponentListSerializer(serializers.ModelSerializer):
             "supported_catalog_versions",
             "id",
         )
+        # The OSCAL document is only sent when asked for with ?expand=component_json.
+        expandable_fields = ("component_json",)
 
 
-class ComponentSerializer(serializers.ModelSerializer):
+class ComponentSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     catalog_data = serializers.SerializerMethodField()
     component_data = serializers.SerializerMethodField()
     project_data = serializers.SerializerMethodField()
@@ -68,7 +76,7 @@ class ComponentSerializer(serializers.ModelSerializer):
         return data
 
     def get_component_data(self, obj):
-        data = collect_component_data(obj.component_json)
+        data = collect_component_data(obj)
         return data
 
     def get_project_data(self, obj):
@@ -112,7 +120,7 @@ def collect_catalog_data(
         if (version := catalog.version) not in data:
             data[version] = {}
 
-        cat_data = CatalogTools(catalog.file_name.path)
+        cat_data = CatalogTools.from_file(catalog.file_name.path, catalog_pk=catalog.pk)
         data[version][catalog.impact_level] = {
             "controls": {
                 control: cat_data.get_control_data_simplified(control)
@@ -123,9 +131,8 @@ def collect_catalog_data(
     return data
 
 
-def collect_component_data(component: dict) -> dict:
-    component_model = ComponentModel(**component)
-    component_def = component_model.component_definition.components[0]
+def collect_component_data(component: Component) -> dict:
+    component_def = get_component_model(component).component_definition.components[0]
 
     return {
         "title": component_def.title,
@@ -154,7 +161,7 @@ def get_control_responsibility(control: dict, name: str) -> Optional[Any]:  # ty
                 return prop.get("value")
 
 
-class ComponentListBasicSerializer(serializers.ModelSerializer):
+class ComponentListBasicSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     controls_count = serializers.SerializerMethodField()
 
     def get_controls_count(self, obj):
@@ -269,7 +276,8 @@ class ComponentControlSerializer(serializers.ModelSerializer):
         instance: Component, catalog_version: str
     ) -> Optional[Tuple[List[ImplementedRequirement], ComponentModel]]:
         """Find the sections of a Component's json that needs to be updated."""
-        component_data = ComponentModel(**instance.component_json)
+        # The model is changed and saved, so work on a copy rather than the cached model.
+        component_data = get_component_model(instance, copy=True)
         requirements = []
         for component in component_data.component_definition.components:
             for implementation in component.control_implementations:
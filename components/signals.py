@@ -1,8 +1,13 @@
 import json
 
+from pydantic import ValidationError
+
 from components.componentio import ComponentTools
 from components.models import Component
+from components.requirements import sync_implemented_requirements
+from components.search import update_search_vectors
 from ratoapi.oscal.component import ComponentModel
+from ratoapi.oscal.oscal import document_hash
 
 
 # noinspection PyUnusedLocal
@@ -57,9 +62,50 @@ def add_supported_catalog_versions(
         not hasattr(instance, "supported_catalog_versions")
         or not instance.supported_catalog_versions
     ):
-        component_data = ComponentModel(**instance.component_json)
+        # Unchanged documents keep their recorded hash and skip validation; the saved component is not cached yet.
+        component_data = ComponentModel.from_document(instance.component_json, trusted_hash=instance.content_hash)
         # Assume a single item in the "component" field for now
         implemented_versions = component_data.component_definition.components[
             0
         ].catalog_versions
         instance.supported_catalog_versions = implemented_versions
+
+
+# noinspection PyUnusedLocal
+def record_content_hash(
+    sender, instance: Component, *args, **kwargs
+):  # pylint: disable=unused-argument
+    """Validate a changed component_json and record its hash, so reads can skip validating it again."""
+    if not instance.component_json:
+        instance.content_hash = ""
+        return
+
+    content_hash = document_hash(instance.component_json)
+    if content_hash == instance.content_hash:
+        return
+
+    try:
+        ComponentModel(**instance.component_json)
+    except ValidationError:
+        instance.content_hash = ""
+    else:
+        instance.content_hash = content_hash
+
+
+# noinspection PyUnusedLocal
+def sync_requirements(
+    sender, instance: Component, *args, raw: bool = False, update_fields=None, **kwargs
+):  # pylint: disable=unused-argument
+    """Sync the ImplementedRequirement rows of a saved Component from its component_json."""
+    if raw or (update_fields is not None and "component_json" not in update_fields):
+        return
+    sync_implemented_requirements(instance)
+
+
+# noinspection PyUnusedLocal
+def update_search_vector(
+    sender, instance: Component, *args, raw: bool = False, **kwargs
+):  # pylint: disable=unused-argument
+    """Recompute the search vector of a saved Component, after its narratives are synced."""
+    if not raw:
+        update_search_vectors(Component.objects.filter(pk=instance.pk))
@@ -1,6 +1,10 @@
+import copy
+import importlib
 import json
+from io import StringIO
 from typing import List
 
+from django.apps import apps
 from django.core.files import File
 from django.core.management import call_command
 from django.test import TestCase
@@ -9,9 +13,12 @@ from rest_framework import status
 from rest_framework.authtoken.models import Token
 
 from catalogs.models import Catalog
+from components.cache import component_cache, get_component_model, parsed_component
 from components.componentio import ComponentTools, create_empty_component_json
-from components.models import Component
+from components.models import Component, ImplementedRequirement
+from components.search import trigram_available
 from components.serializers import ComponentListSerializer, ComponentSerializer
+from ratoapi.oscal.oscal import document_hash
 from testing_utils import AuthenticatedAPITestCase, prevent_request_warnings
 from users.models import User
 
@@ -102,10 +109,22 @@ class GetAllComponentsTest(AuthenticatedAPITestCase):
         expected_num_components = 2
         received_num_components = len(response.data)
 
-        self.assertEqual(response.data, serializer.data)
+        # component_json is left out of the list unless expanded.
+        expected = [{key: value for key, value in item.items() if key != "component_json"} for item in serializer.data]
+        self.assertEqual(response.data, expected)
         self.assertEqual(received_num_components, expected_num_components)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_expand_includes_component_json(self):
+        response = self.client.get(reverse("component-list"), {"expand": "component_json"})
+
+        self.assertEqual(response.data[0]["component_json"], TEST_COMPONENT_JSON_BLOB)
+
+    def test_fields_limits_response(self):
+        response = self.client.get(reverse("component-list"), {"fields": "id,title"})
+
+        self.assertEqual([set(item) for item in response.data], [{"id", "title"}, {"id", "title"}])
+
     def test_controls_count_is_returned(self):
         response = self.client.get(reverse("component-list"))
         component = response.data
@@ -117,6 +136,82 @@ class GetAllComponentsTest(AuthenticatedAPITestCase):
         self.assertEqual(received_controls_count, expected_controls_count)
 
 
+class ComponentByControlViewTest(AuthenticatedAPITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.public = Component.objects.create(
+            title="Public Component",
+            supported_catalog_versions=[Catalog.Version.NIST_SP80053R5],
+            component_json=TEST_COMPONENT_JSON_BLOB,
+        )
+        cls.private = Component.objects.create(
+            title="Private Component",
+            supported_catalog_versions=[Catalog.Version.NIST_SP80053R5],
+            component_json=TEST_COMPONENT_JSON_BLOB,
+            status=Component.Status.SYSTEM,
+        )
+        unrelated = copy.deepcopy(TEST_COMPONENT_JSON_BLOB)
+        for requirement in unrelated["component-definition"]["components"][0]["control-implementations"][0][
+            "implemented-requirements"
+        ]:
+            requirement["control-id"] = "si-1"
+        Component.objects.create(
+            title="Unrelated Component",
+            supported_catalog_versions=[Catalog.Version.NIST_SP80053R5],
+            component_json=unrelated,
+        )
+
+    def _get(self, control_id: str, **params):
+        return self.client.get(reverse("component-by-control", kwargs={"control_id": control_id}), params)
+
+    def test_lists_components_that_implement_the_control(self):
+        response = self._get("ac-2", catalog_version=Catalog.Version.NIST_SP80053R5)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual([item["id"] for item in response.data["results"]], [self.public.pk, self.private.pk])
+
+    def test_private_components_need_view_permission(self):
+        user = User.objects.create(username="assessor")
+        self.client.force_authenticate(user=user, token=Token.objects.create(user=user))
+
+        response = self._get("ac-2")
+
+        self.assertEqual([item["id"] for item in response.data["results"]], [self.public.pk])
+
+    def test_other_catalog_version_has_no_components(self):
+        response = self._get("ac-2", catalog_version=Catalog.Version.NIST_SP80053R4)
+
+        self.assertEqual(response.data["count"], 0)
+
+    def test_control_must_be_implemented_for_the_catalog_version(self):
+        document = copy.deepcopy(TEST_COMPONENT_JSON_BLOB)
+        implementations = document["component-definition"]["components"][0]["control-implementations"]
+        implementations[0]["description"] = Catalog.Version.NIST_SP80053R4
+        other = copy.deepcopy(implementations[0])
+        other["description"] = Catalog.Version.NIST_SP80053R5
+        for requirement in other["implemented-requirements"]:
+            requirement["control-id"] = "si-1"
+        implementations.append(other)
+        component = Component.objects.create(
+            title="Revision 4 Component",
+            supported_catalog_versions=[Catalog.Version.NIST_SP80053R4, Catalog.Version.NIST_SP80053R5],
+            component_json=document,
+        )
+
+        r4 = self._get("ac-2", catalog_version=Catalog.Version.NIST_SP80053R4)
+        r5 = self._get("ac-2", catalog_version=Catalog.Version.NIST_SP80053R5)
+
+        self.assertEqual([item["id"] for item in r4.data["results"]], [component.pk])
+        self.assertNotIn(component.pk, [item["id"] for item in r5.data["results"]])
+
+    @prevent_request_warnings
+    def test_invalid_catalog_version_returns_400(self):
+        response = self._get("ac-2", catalog_version="not-a-version")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class GetSingleComponentTest(AuthenticatedAPITestCase):
     @classmethod
     def setUpTestData(cls):
@@ -311,6 +406,32 @@ class ComponentViewTest(AuthenticatedAPITestCase):
         self.assertEqual(content.get("results")[0].get("type"), "software")
         self.assertEqual(content.get("count"), 2)
 
+    def _search(self, query: str) -> List[str]:
+        resp = self.client.get("/api/components/search/", {"search": query}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        return [item["title"] for item in resp.json()["results"]]
+
+    def test_search_ranks_stronger_matches_first(self):
+        # All three have the search term "magic"; only the first also says "magical" in its description.
+        self.assertEqual(
+            self._search("magical"), ["Cool Component", "testing title", "testing different catalog"]
+        )
+
+    def test_search_matches_narratives(self):
+        self.assertEqual(len(self._search("statisfies")), 3)
+
+    def test_search_follows_saved_changes(self):
+        self.test_component_2.search_terms = ["firewall"]
+        self.test_component_2.save()
+
+        self.assertEqual(self._search("firewall"), ["testing title"])
+
+    def test_search_matches_misspelled_titles(self):
+        if not trigram_available():
+            self.skipTest("pg_trgm is not installed")
+
+        self.assertEqual(self._search("Cool Componnet")[0], "Cool Component")
+
 
 class ComponentioTest(TestCase):
     @classmethod
@@ -614,6 +735,157 @@ class ComponentImplementedRequirementViewTest(AuthenticatedAPITestCase):
                 self.assertEqual(implemented.get("control-id"), test_control_id)
 
 
+class ComponentContentHashTest(TestCase):
+    def test_hash_is_recorded_for_valid_json(self):
+        component = Component.objects.create(
+            title="Hashed Component",
+            supported_catalog_versions=[Catalog.Version.NIST_SP80053R5],
+            component_json=TEST_COMPONENT_JSON_BLOB,
+        )
+        component.refresh_from_db()
+
+        self.assertEqual(component.content_hash, document_hash(TEST_COMPONENT_JSON_BLOB))
+
+    def test_hash_is_cleared_for_invalid_json(self):
+        component = Component.objects.create(
+            title="Hashed Component",
+            supported_catalog_versions=[Catalog.Version.NIST_SP80053R5],
+            component_json=TEST_COMPONENT_JSON_BLOB,
+        )
+        component.component_json = copy.deepcopy(TEST_COMPONENT_JSON_BLOB)
+        component.component_json["component-definition"]["uuid"] = "not-a-uuid"
+        component.save()
+
+        self.assertEqual(component.content_hash, "")
+
+    def test_command_records_missing_hashes_of_valid_json(self):
+        valid = Component.objects.create(title="Valid Component", component_json=TEST_COMPONENT_JSON_BLOB)
+        invalid_json = copy.deepcopy(TEST_COMPONENT_JSON_BLOB)
+        invalid_json["component-definition"]["uuid"] = "not-a-uuid"
+        invalid = Component.objects.create(
+            title="Invalid Component",
+            supported_catalog_versions=[Catalog.Version.NIST_SP80053R5],
+            component_json=invalid_json,
+        )
+        Component.objects.update(content_hash="")
+
+        call_command("record_component_hashes", stdout=StringIO())
+
+        valid.refresh_from_db()
+        invalid.refresh_from_db()
+        self.assertEqual(valid.content_hash, document_hash(TEST_COMPONENT_JSON_BLOB))
+        self.assertEqual(invalid.content_hash, "")
+
+
+class ComponentCacheTest(TestCase):
+    def setUp(self):
+        self.component = Component.objects.create(
+            title="Cached Component",
+            supported_catalog_versions=[Catalog.Version.NIST_SP80053R5],
+            component_json=copy.deepcopy(TEST_COMPONENT_JSON_BLOB),
+        )
+        component_cache.clear()
+        self.addCleanup(component_cache.clear)
+
+    def test_model_is_parsed_once_per_update(self):
+        first = parsed_component(Component.objects.get(pk=self.component.pk))
+        second = parsed_component(Component.objects.get(pk=self.component.pk))
+
+        self.assertIs(first, second)
+        stats = component_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertGreater(stats["bytes"], 0)
+
+    def test_saved_component_is_parsed_again(self):
+        parsed_component(self.component)
+        self.component.component_json["component-definition"]["components"][0]["control-implementations"][0][
+            "implemented-requirements"
+        ][0]["description"] = "Changed."
+        self.component.save()
+
+        requirement = parsed_component(self.component).get_control("ac-1", Catalog.Version.NIST_SP80053R5)
+
+        self.assertEqual(requirement.description, "Changed.")
+        self.assertEqual(component_cache.stats()["misses"], 2)
+
+    def test_control_index_matches_component_model(self):
+        parsed = parsed_component(self.component)
+        component_def = parsed.model.component_definition.components[0]
+
+        for control_id in ("ac-1", "at-3"):
+            self.assertIs(
+                parsed.get_control(control_id, Catalog.Version.NIST_SP80053R5),
+                component_def.get_control(control_id, catalog_version=Catalog.Version.NIST_SP80053R5),
+            )
+        self.assertIsNone(parsed.get_control("si-1", Catalog.Version.NIST_SP80053R5))
+        self.assertIsNone(parsed.get_control("ac-1", Catalog.Version.NIST_SP80053R4))
+
+    def test_copy_leaves_cached_model_unchanged(self):
+        model = get_component_model(self.component, copy=True)
+        model.component_definition.components[0].title = "Changed"
+
+        self.assertEqual(get_component_model(self.component).component_definition.components[0].title, "Cool Component")
+
+
+class ImplementedRequirementTableTest(TestCase):
+    def setUp(self):
+        self.component = Component.objects.create(
+            title="Indexed Component",
+            supported_catalog_versions=[Catalog.Version.NIST_SP80053R5],
+            component_json=copy.deepcopy(TEST_COMPONENT_JSON_BLOB),
+        )
+
+    def _requirements(self) -> dict:
+        return dict(
+            ImplementedRequirement.objects.filter(component=self.component).values_list("control_id", "description")
+        )
+
+    def test_rows_are_created_from_component_json(self):
+        requirements = self._requirements()
+
+        self.assertEqual(sorted(requirements), ["ac-1", "ac-2", "at-1", "at-2", "at-3"])
+        self.assertEqual(requirements["ac-1"], "This component statisfies a.")
+        self.assertEqual(
+            ImplementedRequirement.objects.filter(
+                control_id="ac-2", catalog_version=Catalog.Version.NIST_SP80053R5
+            ).get().component,
+            self.component,
+        )
+
+    def test_rows_follow_changes_to_component_json(self):
+        implementation = self.component.component_json["component-definition"]["components"][0][
+            "control-implementations"
+        ][0]
+        implementation["implemented-requirements"] = implementation["implemented-requirements"][:2]
+        implementation["implemented-requirements"][0]["description"] = "Changed."
+        self.component.save()
+
+        self.assertEqual(self._requirements(), {"ac-1": "Changed.", "ac-2": "This component statisfies b."})
+
+    def test_rows_are_removed_for_invalid_component_json(self):
+        self.component.component_json["component-definition"]["uuid"] = "not-a-uuid"
+        self.component.save()
+
+        self.assertEqual(self._requirements(), {})
+
+    def test_migration_adds_rows_for_existing_components(self):
+        add_implemented_requirements = importlib.import_module(
+            "components.migrations.0003_implementedrequirement"
+        ).add_implemented_requirements
+        expected = self._requirements()
+        ImplementedRequirement.objects.all().delete()
+
+        add_implemented_requirements(apps, None)
+
+        self.assertEqual(self._requirements(), expected)
+
+    def test_saving_other_fields_leaves_rows_alone(self):
+        ImplementedRequirement.objects.filter(component=self.component).delete()
+        self.component.save(update_fields=["title"])
+
+        self.assertEqual(self._requirements(), {})
+
+
 class LoadComponentsTestCase(TestCase):
     @classmethod
     def setUpTestData(cls):
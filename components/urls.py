@@ -1,6 +1,7 @@
 from django.urls import path
 
 from .views import (
+    ComponentByControlView,
     ComponentDetailView,
     ComponentImplementedRequirementView,
     ComponentListSearchView,
@@ -13,6 +14,7 @@ urlpatterns = [
     path("<int:pk>/", ComponentDetailView.as_view(), name="component-detail"),
     path("search/", ComponentListSearchView.as_view(), name="component-search"),
     path("types/", ComponentTypeListView.as_view(), name="component-search"),
+    path("by-control/<str:control_id>/", ComponentByControlView.as_view(), name="component-by-control"),
     path(
         "<int:pk>/implemented-requirements/",
         ComponentImplementedRequirementView.as_view(),
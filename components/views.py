@@ -5,14 +5,18 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from catalogs.models import Catalog
 from components.filters import ComponentFilter, ComponentPermissionsFilter
 from components.models import Component
 from components.permissions import ComponentPermissions
 from components.serializers import (
+    DEFERRABLE_COLUMNS,
     ComponentControlSerializer,
+    ComponentListBasicSerializer,
     ComponentListSerializer,
     ComponentSerializer,
 )
+from ratoapi.serializers import omitted_columns
 
 
 class ComponentListView(generics.ListCreateAPIView):
@@ -29,6 +33,9 @@ class ComponentListView(generics.ListCreateAPIView):
         ComponentPermissionsFilter,
     ]
 
+    def get_queryset(self) -> QuerySet:
+        return super().get_queryset().defer(*omitted_columns(self.get_serializer(), DEFERRABLE_COLUMNS))
+
     def filter_queryset(self, queryset: QuerySet) -> QuerySet:
         # Need to apply the order_by after the union in ComponentPermissionsFilter
         return super().filter_queryset(queryset).order_by("pk")
@@ -56,7 +63,48 @@ class ComponentListSearchView(generics.ListAPIView):
     pagination_class = PageNumberPagination
 
     def get_queryset(self):
-        return Component.objects.exclude(status=Component.Status.SYSTEM).order_by("pk")
+        return (
+            Component.objects.exclude(status=Component.Status.SYSTEM)
+            .defer(*omitted_columns(self.get_serializer(), DEFERRABLE_COLUMNS))
+            .order_by("pk")
+        )
+
+
+class ComponentByControlView(generics.ListAPIView):
+    """List the components the user can see that implement a control, optionally for one catalog version."""
+
+    queryset = Component.objects.all()
+    serializer_class = ComponentListBasicSerializer
+    permission_classes = [
+        ComponentPermissions,
+    ]
+    filter_backends = [
+        ComponentPermissionsFilter,
+    ]
+    pagination_class = PageNumberPagination
+
+    def get_queryset(self) -> QuerySet:
+        # Filter before ComponentPermissionsFilter builds its union, so both sides use the indexes.
+        control_id = self.kwargs["control_id"]
+        queryset = super().get_queryset().defer(*omitted_columns(self.get_serializer(), DEFERRABLE_COLUMNS))
+        if catalog_version := self.request.query_params.get("catalog_version"):
+            # Component.controls does not say which version a control is implemented for; the requirement rows do.
+            return queryset.filter(
+                implemented_requirements__control_id=control_id,
+                implemented_requirements__catalog_version=catalog_version,
+            )
+        return queryset.filter(controls__contains=[control_id])
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        return super().filter_queryset(queryset).order_by("pk")
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        catalog_version = request.query_params.get("catalog_version")
+        if catalog_version and catalog_version not in Catalog.Version.values:
+            return Response(
+                {"message": f"Invalid catalog version: '{catalog_version}'"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return super().list(request, *args, **kwargs)
 
 
 class ComponentTypeListView(generics.ListAPIView):
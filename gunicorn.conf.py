@@ -0,0 +1,32 @@
+# Gunicorn reads this file from the working directory. Command-line options still take precedence.
+#
+# Set CATALOG_PRELOAD=True to load the Django app and every catalog in the master process before the workers are
+# forked, so the workers share the parsed catalogs instead of each parsing its own copy.
+import logging
+import os
+
+logger = logging.getLogger("gunicorn.error")
+
+preload_catalogs = os.environ.get("CATALOG_PRELOAD", "False").capitalize() == "True"
+preload_app = preload_catalogs
+
+
+def on_starting(server):  # pylint: disable=unused-argument
+    if preload_catalogs:
+        from catalogs.preload import preload_catalogs as preload  # pylint: disable=import-outside-toplevel
+
+        preload()
+
+
+def post_fork(server, worker):  # pylint: disable=unused-argument
+    if preload_catalogs:
+        from catalogs.preload import format_memory, memory_usage  # pylint: disable=import-outside-toplevel
+
+        logger.info("Worker %s started: %s", worker.pid, format_memory(memory_usage()))
+
+
+def worker_exit(server, worker):  # pylint: disable=unused-argument
+    if preload_catalogs:
+        from catalogs.preload import format_memory, memory_usage  # pylint: disable=import-outside-toplevel
+
+        logger.info("Worker %s exiting: %s", worker.pid, format_memory(memory_usage()))
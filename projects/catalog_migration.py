@@ -0,0 +1,248 @@
+"""Move a project to another catalog, carrying its control progress across with the catalog crosswalk.
+
+The whole move is a handful of set-based statements in one transaction, so its cost does not grow with a query per
+control. Each control of the target catalog gets a ProjectControl row. When one source control maps to it, that
+control's status, remarks and disabled narratives are copied. When several source controls map to it, or when a source
+control was only incorporated into it, their remarks are joined under their control ids and their disabled narratives
+are merged. The status is then ``incomplete`` if any of them had been started, since the merged control needs review.
+
+The project's "This System" component moves with it: its implemented requirements for the old catalog version are
+re-keyed to the target control ids the same way, and their narratives joined where several controls merge.
+
+Source controls with no target control are removed from the project. Their status, remarks and narrative are returned
+in the report, so the caller can keep them.
+"""
+import time
+import uuid
+from typing import Dict, List, NamedTuple
+
+from django.db import connection, transaction
+
+from catalogs.models import Catalog, ControlCrosswalk, Controls
+from components.models import Component
+from projects.models import Project, ProjectControl
+
+
+class DroppedControl(NamedTuple):
+    """A source control without a target control, and the progress it had in the project."""
+
+    control_id: str
+    status: str
+    remarks: str
+    narrative: str = ""
+
+
+class CatalogMigrationReport(NamedTuple):
+    carried: int
+    added: int
+    dropped: List[DroppedControl]
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.carried} carried over, {self.added} added, {len(self.dropped)} without a target control, "
+            f"in {self.seconds:.2f}s"
+        )
+
+
+class CatalogMigrationError(ValueError):
+    pass
+
+
+# Source control ids mapped to target control ids. Between catalogs of the same version every control maps to itself.
+_CROSSWALK_MAPPING = """
+    SELECT source_id, target_id, relation FROM {crosswalk}
+    WHERE source_version = %(source_version)s AND target_version = %(target_version)s
+"""
+_IDENTITY_MAPPING = """
+    SELECT control_id, control_id, %(same)s FROM {controls} WHERE catalog_id = %(source_catalog)s
+"""
+
+_CARRIED = """
+    WITH mapping (source_id, target_id, relation) AS ({mapping}),
+    source AS (
+        SELECT c.control_id, pc.status, pc.remarks, pc.disabled_narratives
+        FROM {project_controls} pc JOIN {controls} c ON c.id = pc.control_id
+        WHERE pc.project_id = %(project)s AND c.catalog_id = %(source_catalog)s
+    ),
+    carried AS (
+        SELECT t.id AS control_id, s.control_id AS source_id, s.status, s.remarks, s.disabled_narratives, m.relation
+        FROM source s
+        JOIN mapping m ON m.source_id = s.control_id
+        JOIN {controls} t ON t.catalog_id = %(target_catalog)s AND t.control_id = m.target_id AND NOT t.retired
+    )
+"""
+
+_CARRIED_COUNT = """
+    SELECT count(DISTINCT control_id) FROM carried
+"""
+
+_DROPPED = """
+    SELECT s.control_id, s.status, s.remarks FROM source s
+    WHERE NOT EXISTS (SELECT 1 FROM carried c WHERE c.source_id = s.control_id)
+    ORDER BY s.control_id
+"""
+
+_TARGETS = """
+    WITH mapping (source_id, target_id, relation) AS ({mapping})
+    SELECT m.source_id, m.target_id FROM mapping m
+    JOIN {controls} t ON t.catalog_id = %(target_catalog)s AND t.control_id = m.target_id AND NOT t.retired
+    ORDER BY m.source_id, m.target_id
+"""
+
+_INSERT = """
+    INSERT INTO {project_controls} (project_id, control_id, status, remarks, disabled_narratives)
+    SELECT
+        %(project)s,
+        t.id,
+        COALESCE(merged.status, %(not_started)s),
+        COALESCE(merged.remarks, ''),
+        COALESCE(merged.disabled_narratives, '{{}}')
+    FROM {controls} t
+    LEFT JOIN (
+        SELECT
+            control_id,
+            CASE
+                WHEN count(*) = 1 AND bool_and(relation <> %(incorporated_into)s) THEN min(status)
+                WHEN bool_and(status = %(not_applicable)s) THEN %(not_applicable)s
+                WHEN bool_or(status <> %(not_started)s) THEN %(incomplete)s
+                ELSE %(not_started)s
+            END AS status,
+            CASE
+                WHEN count(*) = 1 THEN min(remarks)
+                ELSE string_agg(upper(source_id) || ': ' || remarks, E'\\n\\n' ORDER BY source_id)
+                    FILTER (WHERE remarks <> '')
+            END AS remarks,
+            (
+                SELECT array_agg(DISTINCT narrative ORDER BY narrative)
+                FROM carried other, unnest(other.disabled_narratives) narrative
+                WHERE other.control_id = carried.control_id
+            ) AS disabled_narratives
+        FROM carried
+        GROUP BY control_id
+    ) merged ON merged.control_id = t.id
+    WHERE t.catalog_id = %(target_catalog)s AND NOT t.retired
+    ORDER BY t.id
+"""
+
+_DELETE = """
+    DELETE FROM {project_controls} pc USING {controls} c
+    WHERE pc.project_id = %(project)s AND c.id = pc.control_id AND c.catalog_id = %(source_catalog)s
+"""
+
+
+def migrate_project_catalog(project: Project, catalog: Catalog, dry_run: bool = False) -> CatalogMigrationReport:
+    """Move a project and its ProjectControl rows to another catalog. With dry_run, report without changing anything."""
+    start = time.perf_counter()
+    with transaction.atomic():
+        # Lock the project so controls are not edited while they move.
+        project = Project.objects.select_for_update(of=("self",)).select_related("catalog").get(pk=project.pk)
+        if project.catalog_id == catalog.pk:
+            raise CatalogMigrationError(f"Project '{project}' already uses catalog '{catalog}'.")
+
+        source = project.catalog
+        mapping = _IDENTITY_MAPPING if source.version == catalog.version else _CROSSWALK_MAPPING
+        tables = {
+            "controls": Controls._meta.db_table,
+            "crosswalk": ControlCrosswalk._meta.db_table,
+            "project_controls": ProjectControl._meta.db_table,
+        }
+        carried = _CARRIED.format(mapping=mapping.format(**tables), **tables)
+        targets_query = _TARGETS.format(mapping=mapping.format(**tables), **tables)
+        params = {
+            "project": project.pk,
+            "source_catalog": source.pk,
+            "target_catalog": catalog.pk,
+            "source_version": source.version,
+            "target_version": catalog.version,
+            "same": ControlCrosswalk.Relation.SAME.value,
+            "incorporated_into": ControlCrosswalk.Relation.INCORPORATED_INTO.value,
+            "not_started": ProjectControl.Status.NOT_STARTED.value,
+            "incomplete": ProjectControl.Status.INCOMPLETE.value,
+            "not_applicable": ProjectControl.Status.NA.value,
+        }
+
+        with connection.cursor() as cursor:
+            cursor.execute(carried + _CARRIED_COUNT, params)
+            (carried_count,) = cursor.fetchone()
+            cursor.execute(carried + _DROPPED, params)
+            dropped_rows = cursor.fetchall()
+            cursor.execute(targets_query, params)
+            targets: Dict[str, List[str]] = {}
+            for source_id, target_id in cursor.fetchall():
+                targets.setdefault(source_id, []).append(target_id)
+            cursor.execute(carried + _INSERT.format(**tables), params)
+            added = cursor.rowcount - carried_count
+            cursor.execute(_DELETE.format(**tables), params)
+
+        narratives = {}
+        if component := project.components.filter(title=f"{project.title} This System").first():
+            narratives = _migrate_component(component, source, catalog, targets)
+
+        Project.objects.filter(pk=project.pk).update(
+            catalog=catalog, catalog_version=catalog.version, impact_level=catalog.impact_level
+        )
+
+        if dry_run:
+            transaction.set_rollback(True)
+
+    dropped = [
+        DroppedControl(control_id, status, remarks, narratives.pop(control_id, ""))
+        for control_id, status, remarks in dropped_rows
+    ]
+    dropped.extend(
+        DroppedControl(control_id, "", "", narrative) for control_id, narrative in sorted(narratives.items())
+    )
+    return CatalogMigrationReport(carried_count, added, dropped, time.perf_counter() - start)
+
+
+def _migrate_component(
+    component: Component, source: Catalog, catalog: Catalog, targets: Dict[str, List[str]]
+) -> Dict[str, str]:
+    """Move a component's implemented requirements for the source catalog version to the target catalog.
+
+    Returns the narratives of requirements whose control has no target control, by control id.
+    """
+    document = component.component_json
+    dropped: Dict[str, str] = {}
+    for definition in document.get("component-definition", {}).get("components", []):
+        for implementation in definition.get("control-implementations", []):
+            if implementation.get("description") != source.version:
+                continue
+            implementation["description"] = catalog.version
+            implementation["source"] = catalog.source
+
+            by_target: Dict[str, List[dict]] = {}
+            for requirement in implementation.get("implemented-requirements", []):
+                if requirement["control-id"] not in targets:
+                    dropped[requirement["control-id"]] = requirement.get("description", "")
+                for target_id in targets.get(requirement["control-id"], []):
+                    by_target.setdefault(target_id, []).append(requirement)
+            migrated = [_merge_requirements(target_id, requirements) for target_id, requirements in by_target.items()]
+            uuids = set()
+            for requirement in migrated:
+                # A requirement copied to several target controls needs a uuid for each copy.
+                if requirement["uuid"] in uuids:
+                    requirement["uuid"] = str(uuid.uuid4())
+                uuids.add(requirement["uuid"])
+            implementation["implemented-requirements"] = migrated
+
+    versions = [
+        catalog.version if version == source.version else version for version in component.supported_catalog_versions
+    ]
+    component.component_json = document
+    component.supported_catalog_versions = list(dict.fromkeys(versions))
+    component.save()
+    return dropped
+
+
+def _merge_requirements(target_id: str, requirements: List[dict]) -> dict:
+    """Return the requirement for a target control, joining the narratives of the source requirements mapped to it."""
+    merged = {**requirements[0], "control-id": target_id}
+    if len(requirements) > 1:
+        merged["description"] = "\n\n".join(
+            f"{requirement['control-id'].upper()}: {requirement['description']}"
+            for requirement in requirements
+            if requirement.get("description")
+        )
+    return merged
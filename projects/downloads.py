@@ -2,7 +2,7 @@ import re
 import uuid
 from typing import List
 
-from components.componentio import ComponentTools
+from components.models import ImplementedRequirement as ComponentRequirement
 from projects.models import Project
 from ratoapi.oscal.oscal import Metadata, Property, Resource
 from ratoapi.oscal.ssp import (
@@ -167,23 +167,34 @@ class OscalSSP:
         self.control_implementations = ControlImplementation(
             description="[INSERT SYSTEM DESCRIPTION HERE]", implemented_requirements=[]
         )
+        narratives: dict = {}
+        for requirement in (
+            ComponentRequirement.objects.filter(
+                component__in=self.project.components.all(),
+                catalog_version=self.project.catalog.version,
+            )
+            .select_related("component")
+            .only("control_id", "description", "component", "component__title")
+            .order_by("component_id")
+        ):
+            narratives.setdefault(requirement.control_id, []).append(requirement)
+
         for control in self.project.controls.all():
+            if control.control_id not in narratives:
+                continue
             implemented_requirement = ImplementedRequirement(
                 control_id=control.control_id,
             )
-            for component in self.project.components.all():
-                cmp = ComponentTools(component.component_json)
-                if control.control_id in component.controls:
-                    ctrl = cmp.get_control_by_id(control.control_id)
-                    implemented_requirement.add_by_component(
-                        ByComponent(
-                            component_uuid=self.component_ref[component.title],
-                            description=ctrl[0].get("description"),
-                        )
-                    )
-                    self.control_implementations.implemented_requirements.append(
-                        implemented_requirement
+            for requirement in narratives[control.control_id]:
+                implemented_requirement.add_by_component(
+                    ByComponent(
+                        component_uuid=self.component_ref[requirement.component.title],
+                        description=requirement.description,
                     )
+                )
+            self.control_implementations.implemented_requirements.append(
+                implemented_requirement
+            )
 
     @staticmethod
     def get_back_matter():
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalogs.models import Catalog
+from projects.catalog_migration import CatalogMigrationError, migrate_project_catalog
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Move a project to another catalog, for example from NIST 800-53 r4 to r5, carrying control statuses, remarks "
+        "and disabled narratives across with the control crosswalk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, required=True, help="Project id to move.")
+        parser.add_argument("--catalog", type=int, required=True, help="Catalog id to move the project to.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be carried over and dropped without changing the project.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(pk=options["project"])
+            catalog = Catalog.objects.get(pk=options["catalog"])
+        except (Project.DoesNotExist, Catalog.DoesNotExist) as exc:
+            raise CommandError(str(exc)) from exc
+
+        try:
+            report = migrate_project_catalog(project, catalog, dry_run=options["dry_run"])
+        except CatalogMigrationError as exc:
+            raise CommandError(str(exc)) from exc
+
+        action = "Would move" if options["dry_run"] else "Moved"
+        self.stdout.write(self.style.SUCCESS(f"{action} project '{project}' to catalog '{catalog}': {report}"))
+        if report.dropped:
+            self.stdout.write("  without a target control:")
+        for control in report.dropped:
+            details = [f"status {control.status}" if control.status else "", control.remarks, control.narrative]
+            self.stdout.write(f"    {control.control_id}: {'; '.join(detail for detail in details if detail)}")
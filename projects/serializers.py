@@ -1,16 +1,18 @@
 from typing import Optional
 
+from django.conf import settings
 from rest_framework import serializers
 
+from catalogs.compact import CompactCatalog
 from catalogs.serializers import ControlSerializer
-from components.models import Component
+from components.models import Component, ImplementedRequirement
 from components.serializers import ComponentListSerializer
 from projects.models import Project, ProjectControl
 from ratoapi.oscal.catalog import CatalogModel
-from ratoapi.oscal.component import ComponentModel
+from ratoapi.serializers import FieldSelectionMixin
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     completed_controls = serializers.IntegerField(required=False)
     total_controls = serializers.IntegerField(required=False)
 
@@ -42,7 +44,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
         )
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     components = ComponentListSerializer(many=True)
     components_count = serializers.SerializerMethodField()
     completed_controls = serializers.IntegerField(required=False)
@@ -77,7 +79,7 @@ class ProjectSerializer(serializers.ModelSerializer):
         depth = 1
 
 
-class BasicViewProjectSerializer(serializers.ModelSerializer):
+class BasicViewProjectSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     """Project serializer for the case where only basic project info is needed."""
 
     private_component = serializers.SerializerMethodField(read_only=True)
@@ -101,7 +103,7 @@ class BasicViewProjectSerializer(serializers.ModelSerializer):
         return obj.components.get(title=f"{obj.title} This System").id
 
 
-class ProjectControlSerializer(serializers.ModelSerializer):
+class ProjectControlSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     control = ControlSerializer(read_only=True)
     project = BasicViewProjectSerializer(read_only=True)
     catalog_data = serializers.SerializerMethodField(read_only=True)
@@ -169,12 +171,39 @@ class ProjectControlSerializer(serializers.ModelSerializer):
 
     def get_catalog_data(self, obj: ProjectControl) -> Optional[dict]:
         """Get the Catalog data for a given Control."""
+        control = obj.control
+        catalog = control.catalog
+
+        if control.ordinal is None or not catalog.title:
+            # Summaries were not stored at ingest; see the rebuild_control_summaries command.
+            return self._parse_catalog_data(obj)
+
+        return {
+            "version": catalog.title,
+            "label": control.control_label,
+            "sort_id": control.sort_id,
+            "title": control.title,
+            "family": control.family,
+            "description": control.description,
+            "implementation": control.implementation,
+            "guidance": control.guidance,
+            "next_id": control.next_id,
+        }
+
+    def _parse_catalog_data(self, obj: ProjectControl) -> dict:
         control_data = {}
 
         file = obj.control.catalog.file_name.path
         control_id = self.context.get("control_id")
 
-        catalog = CatalogModel.from_json(file)
+        if settings.CATALOG_COMPACT:
+            compact = CompactCatalog.from_file(file, catalog_pk=obj.control.catalog_id)
+            control_data.update({"version": compact.title, **compact.control_summary(control_id)})
+            return control_data
+
+        catalog = CatalogModel.from_json(
+            file, catalog_pk=obj.control.catalog_id, trusted_hash=obj.control.catalog.content_hash
+        )
         control_data.update(
             {"version": catalog.metadata.title, **catalog.control_summary(control_id)}
         )
@@ -204,38 +233,45 @@ class ProjectControlSerializer(serializers.ModelSerializer):
         catalog_version = obj.project.catalog.version
         disabled_narratives = obj.disabled_narratives
 
-        for component in obj.project.components.all():
+        requirements = (
+            ImplementedRequirement.objects.filter(
+                component__in=obj.project.components.all(),
+                control_id=control_id,
+                catalog_version=catalog_version,
+            )
+            .select_related("component")
+            .only(
+                "description",
+                "responsibility",
+                "provider",
+                "component",
+                "component__title",
+                "component__status",
+            )
+            .order_by("component_id")
+        )
+
+        for control_data in requirements:
+            component = control_data.component
             enabled = component.id not in disabled_narratives
-            component_def = ComponentModel(
-                **component.component_json
-            ).component_definition.components[0]
-
-            try:
-                control_data = component_def.get_control(
-                    control_id, catalog_version=catalog_version
-                )
-            except KeyError:
-                control_data = None
-
-            if control_data is not None:
-                responsibility = control_data.responsibility
-                responsibilities.append(responsibility)
-
-                if (status := type_map[component.status]) == "private":
-                    result["components"][status] = {
-                        "id": component.id,
-                        "description": control_data.description,
-                        "enabled": enabled,
-                    }
-                else:
-                    # noinspection PyTypeChecker
-                    result["components"][status][component.title] = {
-                        "id": component.id,
-                        "description": control_data.description,
-                        "responsibility": responsibility,
-                        "provider": control_data.provider,
-                        "enabled": enabled,
-                    }
+            responsibility = control_data.responsibility
+            responsibilities.append(responsibility)
+
+            if (status := type_map[component.status]) == "private":
+                result["components"][status] = {
+                    "id": component.id,
+                    "description": control_data.description,
+                    "enabled": enabled,
+                }
+            else:
+                # noinspection PyTypeChecker
+                result["components"][status][component.title] = {
+                    "id": component.id,
+                    "description": control_data.description,
+                    "responsibility": responsibility,
+                    "provider": control_data.provider,
+                    "enabled": enabled,
+                }
 
         if len(responsibilities) > 1:
             result["responsibility"] = "Hybrid"
@@ -245,7 +281,7 @@ class ProjectControlSerializer(serializers.ModelSerializer):
         return result
 
 
-class ProjectControlListSerializer(serializers.ModelSerializer):
+class ProjectControlListSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     control = ControlSerializer()
     project = BasicViewProjectSerializer()
 
@@ -17,7 +17,7 @@ logger = logging.getLogger(__name__)
 
 
 def _add_project_controls(instance: Project):
-    catalog_controls = Controls.objects.filter(catalog_id=instance.catalog)
+    catalog_controls = Controls.objects.filter(catalog_id=instance.catalog, retired=False)
     if catalog_controls.exists():
         instance.controls.set(
             catalog_controls,
@@ -1,13 +1,18 @@
 import json
+import uuid
+from io import StringIO
 
 from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 
-from catalogs.models import Catalog
+from catalogs.models import Catalog, ControlCrosswalk, Controls
 from components.models import Component
+from projects.catalog_migration import CatalogMigrationError, migrate_project_catalog
 from projects.models import Project, ProjectControl
 from testing_utils import AuthenticatedAPITestCase
 from users.models import User
@@ -302,6 +307,28 @@ class ProjectComponentsTest(AuthenticatedAPITestCase):
         # ensure that response includes accurate components_count
         self.assertEqual(received_components_count, expected_num_components)
 
+    def test_component_documents_are_not_read_unless_expanded(self):
+        path = reverse("project-detail", kwargs={"project_id": self.test_project.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+
+        self.assertNotIn("component_json", response.data["components"][0])
+        self.assertFalse(any('"component_json"' in query["sql"] for query in queries.captured_queries))
+
+        response = self.client.get(path, {"expand": "components.component_json"})
+        self.assertEqual(response.data["components"][0]["component_json"], TEST_COMPONENT_JSON_BLOB)
+
+    def test_fields_selects_nested_component_fields(self):
+        response = self.client.get(
+            reverse("project-detail", kwargs={"project_id": self.test_project.pk}),
+            {"fields": "id,components.title"},
+        )
+
+        self.assertEqual(set(response.data), {"id", "components"})
+        self.assertEqual(
+            response.data["components"], [{"title": "Cool Component"}, {"title": "Cool Components"}]
+        )
+
 
 class ProjectAddComponentViewTest(AuthenticatedAPITestCase):
     @classmethod
@@ -470,6 +497,19 @@ class ProjectControlPage(AuthenticatedAPITestCase):
         )
         self.assertEqual(resp.status_code, 200)
 
+    def test_control_list_is_in_natural_order(self):
+        control_ids = []
+        url = reverse("project-get-control", kwargs={"project_id": self.test_project.id})
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            control_ids += [item["control"]["control_id"] for item in resp.data["results"]]
+            url = resp.data["next"]
+
+        self.assertEqual(control_ids[:3], ["ac-1", "ac-2", "at-1"])
+        self.assertLess(control_ids.index("sa-2"), control_ids.index("sa-16"))
+        self.assertLess(control_ids.index("pm-2"), control_ids.index("pm-27"))
+
     def test_get_control_page_data(self):
         resp = self.client.get(
             reverse(
@@ -557,6 +597,17 @@ class ProjectComponentSearchViewTest(AuthenticatedAPITestCase):
         )
         self.assertEqual(json.loads(resp.content).get("total_item_count"), 1)
 
+    def test_search_ranks_title_matches_first(self):
+        resp = self.client.get(
+            "/api/projects/" + str(self.test_project.id) + "/search/?search=new",
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            [item["title"] for item in json.loads(resp.content).get("components")],
+            ["New Cool Component"],
+        )
+
 
 class ProjectComponentNotAddedListViewTest(AuthenticatedAPITestCase):
     @classmethod
@@ -821,3 +872,132 @@ class ProjectSspDownload(AuthenticatedAPITestCase):
             response.get("Content-Disposition"),
             f'attachment; filename="{self.test_project.title}-ssp.json"',
         )
+
+    def test_ssp_lists_component_narratives_once_per_control(self):
+        self.test_project.components.add(self.test_component)
+        token = Token.objects.create(user=self.user)
+        self.client.force_authenticate(user=self.user, token=token)
+
+        response = self.client.get(
+            reverse("download-ssp", kwargs={"project_id": self.test_project.pk})
+        )
+        requirements = json.loads(b"".join(response.streaming_content if response.streaming else [response.content]))[
+            "system-security-plan"
+        ]["control-implementation"]["implemented-requirements"]
+
+        control_ids = [requirement["control-id"] for requirement in requirements]
+        self.assertEqual(len(control_ids), len(set(control_ids)))
+        self.assertIn("ac-2", control_ids)
+        self.assertEqual(len(requirements[control_ids.index("ac-2")]["by-components"]), 1)
+
+
+class ProjectCatalogMigrationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("load_catalog", load_standard_catalogs=True)
+        cls.user = User.objects.create()
+        cls.r5 = Catalog.objects.get(version=Catalog.Version.NIST_SP80053R5, impact_level="moderate")
+
+    def setUp(self):
+        self.project = Project.objects.create(
+            title="Rev 4 Project",
+            acronym="R4P",
+            catalog_version=Catalog.Version.NIST_SP80053R4,
+            impact_level="moderate",
+            location="other",
+            creator=self.user,
+        )
+        self.r4 = self.project.catalog
+
+    def _progress(self, control_id: str, **values):
+        ProjectControl.objects.filter(project=self.project, control__control_id=control_id).update(**values)
+
+    def _control(self, control_id: str) -> ProjectControl:
+        return ProjectControl.objects.get(project=self.project, control__control_id=control_id)
+
+    def _this_system(self) -> Component:
+        return self.project.components.get(title=f"{self.project.title} This System")
+
+    def _narrate(self, narratives: dict):
+        component = self._this_system()
+        implementation = component.component_json["component-definition"]["components"][0]["control-implementations"][0]
+        implementation["implemented-requirements"] = [
+            {"uuid": str(uuid.uuid4()), "control-id": control_id, "description": description}
+            for control_id, description in narratives.items()
+        ]
+        component.save()
+
+    def test_migrate_to_next_version(self):
+        self._progress(
+            "ac-1", status=ProjectControl.Status.COMPLETE, remarks="Policy approved", disabled_narratives=[3]
+        )
+        self._progress("ac-2", status=ProjectControl.Status.NA)
+        self._progress("ac-2.3", status=ProjectControl.Status.INCOMPLETE, remarks="Disable after 90 days")
+        self._progress("ac-2.1", status=ProjectControl.Status.COMPLETE, remarks="Managed in the IdP")
+        self._narrate({"ac-2": "Accounts are reviewed.", "ac-2.3": "Disabled by a job.", "ac-2.1": "Okta."})
+        # ac-2.3 only partly survives into ac-2, and ac-2.1 has no successor.
+        ControlCrosswalk.objects.filter(source_id="ac-2.3").update(
+            relation=ControlCrosswalk.Relation.INCORPORATED_INTO, target_id="ac-2"
+        )
+        ControlCrosswalk.objects.filter(source_id="ac-2.1").delete()
+
+        report = migrate_project_catalog(self.project, self.r5)
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.catalog, self.r5)
+        self.assertEqual(self.project.catalog_version, Catalog.Version.NIST_SP80053R5)
+        self.assertEqual(
+            ProjectControl.objects.filter(project=self.project).count(),
+            Controls.objects.filter(catalog=self.r5).count(),
+        )
+        self.assertFalse(ProjectControl.objects.filter(project=self.project, control__catalog=self.r4).exists())
+
+        ac_1 = self._control("ac-1")
+        self.assertEqual(ac_1.status, ProjectControl.Status.COMPLETE)
+        self.assertEqual(ac_1.remarks, "Policy approved")
+        self.assertEqual(ac_1.disabled_narratives, [3])
+
+        ac_2 = self._control("ac-2")
+        self.assertEqual(ac_2.status, ProjectControl.Status.INCOMPLETE)
+        self.assertEqual(ac_2.remarks, "AC-2.3: Disable after 90 days")
+
+        mapped = ControlCrosswalk.objects.filter(
+            target_id__in=Controls.objects.filter(catalog=self.r5).values("control_id")
+        ).values_list("source_id", flat=True)
+        dropped = {control.control_id: control for control in report.dropped}
+        self.assertFalse(set(dropped) & set(mapped))
+        self.assertEqual(
+            dropped["ac-2.1"], ("ac-2.1", ProjectControl.Status.COMPLETE, "Managed in the IdP", "Okta.")
+        )
+        self.assertEqual(report.carried + report.added, Controls.objects.filter(catalog=self.r5).count())
+
+        component = self._this_system()
+        self.assertEqual(component.supported_catalog_versions, [Catalog.Version.NIST_SP80053R5])
+        implementation = component.component_json["component-definition"]["components"][0]["control-implementations"][0]
+        self.assertEqual(implementation["source"], self.r5.source)
+        requirements = implementation["implemented-requirements"]
+        self.assertEqual(
+            {requirement["control-id"]: requirement["description"] for requirement in requirements},
+            {"ac-2": "AC-2: Accounts are reviewed.\n\nAC-2.3: Disabled by a job."},
+        )
+        self.assertEqual(
+            list(component.implemented_requirements.values_list("control_id", "catalog_version")),
+            [("ac-2", Catalog.Version.NIST_SP80053R5)],
+        )
+
+    def test_dry_run_changes_nothing(self):
+        count = ProjectControl.objects.filter(project=self.project).count()
+        output = StringIO()
+
+        call_command(
+            "migrate_project_catalog", project=self.project.pk, catalog=self.r5.pk, dry_run=True, stdout=output
+        )
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.catalog, self.r4)
+        self.assertEqual(ProjectControl.objects.filter(project=self.project).count(), count)
+        self.assertIn("Would move project 'Rev 4 Project'", output.getvalue())
+
+    def test_migrate_to_same_catalog_is_rejected(self):
+        with self.assertRaises(CatalogMigrationError):
+            migrate_project_catalog(self.project, self.r4)
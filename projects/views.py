@@ -3,7 +3,7 @@ from wsgiref.util import FileWrapper
 
 from django.core.files.base import ContentFile
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
-from django.db.models import Count, Q
+from django.db.models import Count, Prefetch, Q
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters import rest_framework as filters
@@ -13,9 +13,10 @@ from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
+from catalogs.models import Controls
 from components.filters import ComponentFilter
 from components.models import Component
-from components.serializers import ComponentListBasicSerializer
+from components.serializers import DEFERRABLE_COLUMNS, ComponentListBasicSerializer
 from projects.downloads import OscalSSP
 from projects.filters import ProjectControlFilter
 from projects.models import Project, ProjectControl
@@ -27,6 +28,7 @@ from projects.serializers import (
     ProjectSerializer,
 )
 from ratoapi.filters import ObjectPermissionsFilter
+from ratoapi.serializers import omitted_columns
 
 n_completed = Count(
     "to_project", filter=Q(to_project__status=ProjectControl.Status.COMPLETE)
@@ -53,6 +55,18 @@ class ProjectsDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ProjectSerializer
     lookup_url_kwarg = "project_id"
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if (components := self.get_serializer().fields.get("components")) is None:
+            return queryset
+
+        return queryset.prefetch_related(
+            Prefetch(
+                "components",
+                queryset=Component.objects.defer(*omitted_columns(components.child, DEFERRABLE_COLUMNS)),
+            )
+        )
+
 
 class ProjectAddComponentView(generics.GenericAPIView):
     queryset = Project.objects.all()
@@ -188,7 +202,11 @@ class ProjectGetControlList(generics.ListAPIView):
         )
         project = get_object_or_404(queryset, pk=self.kwargs.get("project_id"))
 
-        return ProjectControl.objects.filter(project=project).order_by("control_id")
+        return (
+            ProjectControl.objects.filter(project=project)
+            .select_related("control", "project")
+            .order_by(*(f"control__{field}" for field in Controls.NATURAL_ORDER))
+        )
 
 
 class RetrieveUpdateProjectControlView(generics.RetrieveUpdateAPIView):
@@ -210,7 +228,7 @@ class RetrieveUpdateProjectControlView(generics.RetrieveUpdateAPIView):
         self.check_object_permissions(self.request, project)
 
         return get_object_or_404(
-            ProjectControl,
+            ProjectControl.objects.select_related("control__catalog"),
             control__control_id=self.kwargs.get("control_id"),
             project=project,
         )
@@ -0,0 +1,138 @@
+import logging
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional, Union
+
+from django.conf import settings
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedCache:
+    """A thread-safe, size-bounded LRU cache with hit and miss counters.
+
+    Entries can carry a ``version``; a lookup with a different version is treated as a miss and the stale entry is
+    replaced, so callers never see data for an outdated source. With ``sizeof``, each value is measured when it is
+    stored and ``stats()`` reports the total as ``bytes``.
+    """
+
+    def __init__(self, name: str, maxsize: int = 32, sizeof: Optional[Callable[[Any], int]] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict = OrderedDict()
+        self._sizes: dict = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, version: Optional[Hashable] = None) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, version: Optional[Hashable] = None):
+        with self._lock:
+            self._data[key] = (version, value)
+            self._data.move_to_end(key)
+            if self.sizeof is not None:
+                self._sizes[key] = self.sizeof(value)
+            while len(self._data) > self.maxsize:
+                evicted, _ = self._data.popitem(last=False)
+                self._sizes.pop(evicted, None)
+                self.evictions += 1
+                logger.debug("Evicted %s from the %s cache", evicted, self.name)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], version: Optional[Hashable] = None) -> Any:
+        """Return the cached value for key, calling loader to fill the cache on a miss."""
+        value = self.get(key, version)
+        if value is None:
+            value = loader()
+            self.set(key, value, version)
+
+        return value
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+            self._sizes.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+        if self.sizeof is not None:
+            stats["bytes"] = sum(self._sizes.values())
+        return stats
+
+
+def approximate_size(value: Any) -> int:
+    """Return the approximate memory, in bytes, of a value and everything it refers to.
+
+    Walks containers and pydantic models, counting each object once, so shared objects are not counted twice.
+    """
+    seen = set()
+    total = 0
+    pending = [value]
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+
+        if isinstance(item, BaseModel):
+            pending.append(item.__dict__)
+        elif isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+    return total
+
+
+catalog_cache = BoundedCache("catalogs", maxsize=getattr(settings, "CATALOG_CACHE_SIZE", 32))
+
+
+def load_catalog_file(
+    path: Union[str, Path], loader: Callable[[Path], Any], kind: str, catalog_pk: Optional[int] = None
+) -> Any:
+    """Load a parsed catalog file through the shared catalog cache.
+
+    Entries are keyed by the kind of parsed object, the Catalog pk, and the resolved file path, and are only reused
+    while the file's mtime and size are unchanged.
+    """
+    path = Path(path)
+    stat = path.stat()
+    key = (kind, catalog_pk, str(path.resolve()))
+
+    return catalog_cache.get_or_load(key, lambda: loader(path), version=(stat.st_mtime_ns, stat.st_size))
@@ -1,20 +1,63 @@
 # mypy: ignore-errors
+import functools
+import hashlib
 import json
 import logging
+import re
 from pathlib import Path
-from typing import Literal, Optional, Union
+from types import MappingProxyType
+from typing import Iterable, Literal, Mapping, NamedTuple, Optional, Union
+from uuid import UUID
 
 from pydantic import (  # pylint: disable=no-name-in-module
     UUID4,
     BaseModel,
+    PrivateAttr,
     ValidationError,
     validator,
 )
 
-from ratoapi.oscal.oscal import Link, Metadata, OSCALElement, Parameter, Property
+from catalogs.baselines import BaselineProfile, baseline_digest, read_profile
+from catalogs.snapshot import CatalogSnapshot, source_digest
+from ratoapi.cache import load_catalog_file
+from ratoapi.oscal.oscal import Link, Metadata, OSCALElement, Parameter, Property, trusted_construct
 
 logger = logging.getLogger(__name__)
 
+_PARAM_INSERT = re.compile(r"\{\{ insert: param, ([^{}\s]+) \}\}")
+# Parameter values may insert other parameters (for example, selection choices); bound how deep that can go.
+_MAX_INSERT_DEPTH = 4
+
+
+class ProseTemplate(NamedTuple):
+    """Prose compiled into literal segments with a parameter slot between each pair of segments."""
+
+    segments: tuple[str, ...]
+    slots: tuple[str, ...]
+
+    @classmethod
+    def compile(cls, prose: str) -> "ProseTemplate":
+        pieces = _PARAM_INSERT.split(prose)
+        return cls(segments=tuple(pieces[0::2]), slots=tuple(pieces[1::2]))
+
+    def render(self, values: Mapping[str, str], depth: int = 0) -> str:
+        """Fill each slot from values; slots without a value keep their insert placeholder."""
+        rendered = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values.get(slot)
+            if value is None:
+                value = "{{ insert: param, " + slot + " }}"
+            elif "{{" in value and depth < _MAX_INSERT_DEPTH:
+                value = _compile_prose(value).render(values, depth + 1)
+            rendered.append(value)
+            rendered.append(segment)
+        return "".join(rendered)
+
+
+@functools.lru_cache(maxsize=4096)
+def _compile_prose(prose: str) -> ProseTemplate:
+    return ProseTemplate.compile(prose)
+
 
 class BaseControl(OSCALElement):
     class Meta:
@@ -67,6 +110,9 @@ class Control(BaseControl, FilterMixin):
     parts: Optional[list[Part]] = []
     controls: Optional[list["Control"]] = []
 
+    _parameters: Optional[dict] = PrivateAttr(default=None)
+    _statement_template: Optional[ProseTemplate] = PrivateAttr(default=None)
+
     @property
     def sort_id(self) -> str:
         prop = self._get_prop("sort-id")
@@ -100,14 +146,19 @@ class Control(BaseControl, FilterMixin):
 
     @property
     def parameters(self) -> dict:
-        params = self.params
-        parameters = {}
-        for p in params:
-            parameters[p.id] = p.get_odp_text
-        return parameters
+        """The catalog value of each parameter, by parameter id."""
+        if self._parameters is None:
+            self._parameters = {p.id: p.get_odp_text for p in self.params}
+        return self._parameters
 
     @property
-    def description(self) -> Optional[str]:
+    def statement_template(self) -> ProseTemplate:
+        """The statement prose, including labelled sub-parts, compiled once per control."""
+        if self._statement_template is None:
+            self._statement_template = ProseTemplate.compile(self._statement_prose())
+        return self._statement_template
+
+    def _statement_prose(self) -> str:
         def _get_prose(item, depth=0):
             tabs = "\t" * depth
             depth += 1
@@ -126,13 +177,15 @@ class Control(BaseControl, FilterMixin):
 
         parts: list = []
         _get_prose(self.statement, depth=0)
-        description = "".join(parts)
+        return "".join(parts)
 
-        params = self.parameters
-        for key, value in params.items():
-            placeholder = "{{ insert: param, " + key + " }}"
-            description = description.replace(placeholder, value)
-        return description
+    @property
+    def description(self) -> Optional[str]:
+        return self.render_description()
+
+    def render_description(self, values: Optional[Mapping[str, str]] = None) -> str:
+        """Render the statement with the catalog parameter values, overridden by any values given by id."""
+        return self.statement_template.render({**self.parameters, **values} if values else self.parameters)
 
     def to_orm(self) -> dict:
         return {
@@ -168,66 +221,176 @@ class Group(OSCALElement):
         return value
 
 
+class CatalogIndex(NamedTuple):
+    """Read-only lookup tables over the flattened controls of a catalog, in catalog order."""
+
+    ordered: tuple[Control, ...]
+    controls: Mapping[str, Control]
+    groups: Mapping[str, Group]
+    ordinals: Mapping[str, int]
+    next_ids: tuple[str, ...]
+
+
 class CatalogModel(BaseModel):
     uuid: UUID4
     metadata: Metadata
     groups: list[Group]
 
+    _index: Optional[CatalogIndex] = PrivateAttr(default=None)
+
     @property
-    def controls(self) -> list[Control]:
-        controls = []
+    def index(self) -> CatalogIndex:
+        if self._index is None:
+            self._index = self._build_index()
+        return self._index
+
+    def _build_index(self) -> CatalogIndex:
+        ordered, controls, groups, ordinals = [], {}, {}, {}
         for group in self.groups:
-            for item in getattr(group, "controls"):
-                controls.append(item)
-                if children := getattr(item, "controls", ""):
-                    for ctrl in children:
-                        controls.append(ctrl)
-        return controls
+            for item in group.controls or []:
+                for control in (item, *(item.controls or [])):
+                    ordinals.setdefault(control.id, len(ordered))
+                    controls.setdefault(control.id, control)
+                    groups.setdefault(control.id, group)
+                    ordered.append(control)
+
+        next_ids = tuple(control.id for control in ordered[1:]) + ("",)
+
+        return CatalogIndex(
+            ordered=tuple(ordered),
+            controls=MappingProxyType(controls),
+            groups=MappingProxyType(groups),
+            ordinals=MappingProxyType(ordinals),
+            next_ids=next_ids,
+        )
+
+    @property
+    def controls(self) -> list[Control]:
+        return list(self.index.ordered)
 
     def get_control(self, control_id: str) -> Optional[Control]:
-        return next(
-            filter(lambda control: control.id == control_id, self.controls), None
-        )
+        return self.index.controls.get(control_id)
 
-    def get_group(self, control_id: str) -> list[Group]:
-        for group in self.groups:
-            for control in group.controls:
-                if control.id == control_id:
-                    return group
-                elif children := getattr(control, "controls", ""):
-                    for child in children:
-                        if child.id == control_id:
-                            return group
+    def get_group(self, control_id: str) -> Optional[Group]:
+        return self.index.groups.get(control_id)
 
     def get_next(self, control: Control) -> str:
-        try:
-            next_idx = self.controls.index(control) + 1
-            return self.controls[next_idx].id
-        except (ValueError, IndexError):
+        if control is None or (ordinal := self.index.ordinals.get(control.id)) is None:
             return ""
+        return self.index.next_ids[ordinal]
 
     def control_summary(self, control_id: str) -> dict:
-        control = self.get_control(control_id)
-        group = self.get_group(control_id)
-        next_id = self.get_next(control)
+        return self.control_summaries([control_id])[control_id]
+
+    def control_summaries(self, control_ids: Iterable[str]) -> dict[str, dict]:
+        """Return the summaries of many controls in one pass, keyed by control id. Unknown ids are skipped."""
+        index = self.index
+        summaries = {}
+        for control_id in control_ids:
+            if (ordinal := index.ordinals.get(control_id)) is None:
+                continue
+
+            control = index.controls[control_id]
+            summaries[control_id] = {
+                "label": control.label,
+                "sort_id": control.sort_id,
+                "title": control.title,
+                "family": index.groups[control_id].title,
+                "description": control.description,
+                "implementation": control.implementation,
+                "guidance": control.guidance,
+                "next_id": index.next_ids[ordinal],
+            }
+
+        return summaries
+
+    def select(self, profile: BaselineProfile) -> "CatalogModel":
+        """Return the baseline a profile selects from this catalog.
+
+        Groups and controls are shared with this catalog. Only controls that lose enhancements or get other parameter
+        values are copied, and the copies share their parts with the originals.
+        """
+        selected = frozenset(profile.control_ids)
+
+        def _select(control: Control) -> Control:
+            update = {}
+            if control.controls:
+                kept = [_select(child) for child in control.controls if child.id in selected]
+                if len(kept) != len(control.controls) or any(a is not b for a, b in zip(kept, control.controls)):
+                    update["controls"] = kept
+            if any(param.id in profile.set_parameters for param in control.params or []):
+                update["params"] = [
+                    Parameter.parse_obj({**param.dict(by_alias=True, exclude_none=True), **overrides})
+                    if (overrides := profile.set_parameters.get(param.id))
+                    else param
+                    for param in control.params
+                ]
+            if not update:
+                return control
+            copy = control.copy(update=update)
+            copy._parameters = None  # pylint: disable=protected-access
+            return copy
+
+        groups = []
+        for group in self.groups:
+            if group.controls is not None:
+                controls = [_select(control) for control in group.controls if control.id in selected]
+                group = group.copy(update={"controls": controls or None})
+            groups.append(group)
 
-        return {
-            "label": control.label,
-            "sort_id": control.sort_id,
-            "title": control.title,
-            "family": group.title,
-            "description": control.description,
-            "implementation": control.implementation,
-            "guidance": control.guidance,
-            "next_id": next_id,
-        }
+        baseline = self.copy(
+            update={"uuid": UUID(profile.uuid), "metadata": Metadata.parse_obj(profile.metadata), "groups": groups}
+        )
+        baseline._index = None  # pylint: disable=protected-access
+        return baseline
 
     @classmethod
-    def from_json(cls, json_file: Union[str, Path]):
+    def from_json(cls, json_file: Union[str, Path], catalog_pk: Optional[int] = None, trusted_hash: str = ""):
+        """Return the parsed catalog for a file, reusing the shared catalog cache while the file is unchanged.
+
+        ``trusted_hash`` is the SHA-256 of the file recorded when it was validated at ingest (``Catalog.content_hash``).
+        While the file still has that hash, the model is built without validating it again. Models are cached per
+        trusted hash, so a caller that trusts nothing never gets a model that was built without validation.
+        """
+        loader = functools.partial(cls._parse_json, trusted_hash=trusted_hash)
+        kind = f"catalog-model-trusted-{trusted_hash}" if trusted_hash else "catalog-model"
+        return load_catalog_file(json_file, loader, kind=kind, catalog_pk=catalog_pk)
+
+    @classmethod
+    def _parse_json(cls, json_file: Union[str, Path], trusted_hash: str = ""):
+        if profile := read_profile(json_file):
+            # The full catalog is parsed and cached once for all of its baselines. It was validated in full when the
+            # baseline was ingested, so it is trusted while the baseline still has its recorded hash.
+            catalog_hash = source_digest(profile.catalog_path)
+            trusted = trusted_hash and baseline_digest(profile, catalog_hash).hex() == trusted_hash
+            catalog = cls.from_json(profile.catalog_path, trusted_hash=catalog_hash.hex() if trusted else "")
+            return catalog.select(profile)
+
+        if snapshot := CatalogSnapshot.open_fresh(json_file):
+            try:
+                data = snapshot.to_catalog()
+                if trusted_hash and snapshot.digest.hex() == trusted_hash:
+                    return cls._construct_trusted(data, json_file)
+                return cls(**data)
+            finally:
+                snapshot.close()
+
         with open(json_file, "rb") as file:
-            data = json.load(file)
+            raw = file.read()
+        data = json.loads(raw)
+
+        if trusted_hash and hashlib.sha256(raw).hexdigest() == trusted_hash:
+            return cls._construct_trusted(data.get("catalog", data), json_file)
 
         try:
             return cls(**data)
         except ValidationError:  # Try nested "catalog" field
             return cls(**data["catalog"])
+
+    @classmethod
+    def _construct_trusted(cls, data: dict, json_file: Union[str, Path]):
+        try:
+            return trusted_construct(cls, data)
+        except ValidationError:
+            logger.warning("Catalog %s does not match the catalog model; validating it", json_file)
+            return cls(**data)
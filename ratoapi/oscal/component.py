@@ -2,12 +2,13 @@
 # https://pages.nist.gov/OSCAL/reference/1.0.0/component-definition/json-outline/
 # mypy: ignore-errors
 import json
+import logging
 from enum import Enum
 from pathlib import Path
 from typing import List, Optional, Union
 from uuid import UUID, uuid4
 
-from pydantic import Field
+from pydantic import Field, ValidationError
 
 from catalogs.models import Catalog
 from ratoapi.oscal.oscal import (
@@ -21,8 +22,12 @@ from ratoapi.oscal.oscal import (
     Parameter,
     Property,
     ResponsibleRole,
+    document_hash,
+    trusted_construct,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class ComponentTypeEnum(str, Enum):
     software = "software"
@@ -310,6 +315,21 @@ class ComponentModel(OSCALElement):
         with open(json_file) as data:
             return cls(**json.load(data))
 
+    @classmethod
+    def from_document(cls, document: dict, trusted_hash: str = ""):
+        """Return the model of a stored component document.
+
+        ``trusted_hash`` is the hash recorded when the document was validated (``Component.content_hash``). While the
+        document still has that hash, the model is built without validating it again.
+        """
+        if trusted_hash and document_hash(document) == trusted_hash:
+            try:
+                return trusted_construct(cls, document)
+            except ValidationError:
+                logger.warning("Component document does not match the component model; validating it")
+
+        return cls(**document)
+
     @classmethod
     def list_components(cls):
         return cls.component_definition.components
@@ -3,13 +3,19 @@
 # serializing as JSON
 #
 # elements common to component and SSP models
+import functools
+import hashlib
+import json
 import re
 from datetime import datetime, timezone
 from enum import Enum
-from typing import List, Optional
+from typing import List, Optional, Tuple, Type, TypeVar
 from uuid import UUID, uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import MissingError
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON, ModelField
 
 OSCAL_VERSION = "1.0.0"
 
@@ -18,6 +24,7 @@ class ControlRegExps:
     nist_800_171 = re.compile(r"^\d+\.\d+(\.\d+)*$")
     nist_800_53_simple = re.compile(r"^([a-z]{2})-(\d+)$")
     nist_800_53_extended = re.compile(r"^([a-z]{2})-(\d+)\s*\((\d+)\)$")
+    nist_800_53_enhancement = re.compile(r"^([a-z]{2})-(\d+)\.(\d+)$")
     nist_800_53_part = re.compile(r"^([a-z]{2})-(\d+)\.([a-z]+)$")
     nist_800_53_extended_part = re.compile(r"^([a-z]{2})-(\d+)\s*\((\d+)\)\.([a-z]+)$")
 
@@ -67,6 +74,30 @@ def oscalize_control_id(control_id):
     return control_id
 
 
+def control_sort_key(control_id: str) -> Tuple[Optional[str], Optional[int], Optional[int]]:
+    """
+    Return the family, number and enhancement of a NIST 800-53 control id, for sorting in natural order.
+
+    ac-2 gives ("ac", 2, 0) and ac-2.10 or AC-2(10) gives ("ac", 2, 10); ids in other formats give (None, None, None).
+    """
+
+    control_id = control_id.strip().lower()
+
+    # AC-1
+    match = re.match(ControlRegExps.nist_800_53_simple, control_id)
+    if match:
+        return match.group(1), int(match.group(2)), 0
+
+    # ac-2.1, AC-2(1)
+    match = re.match(ControlRegExps.nist_800_53_enhancement, control_id) or re.match(
+        ControlRegExps.nist_800_53_extended, control_id
+    )
+    if match:
+        return match.group(1), int(match.group(2)), int(match.group(3))
+
+    return None, None, None
+
+
 def control_to_statement_id(control_id):
     """
     Construct an OSCAL style statement ID from a control identifier.
@@ -115,6 +146,121 @@ def control_to_statement_id(control_id):
     return f"{control_id}_smt"
 
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+_MISSING = object()
+
+
+def document_hash(document: dict) -> str:
+    """Return the SHA-256 of a JSON document, independent of key order and formatting."""
+    content = json.dumps(document, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def trusted_construct(model: Type[ModelT], data: dict) -> ModelT:
+    """
+    Build a model from a document that already passed validation, without validating it again.
+
+    Nested models are instantiated like BaseModel.construct() and string fields keep their input values. Other scalar
+    fields (UUIDs, enums, dates, literals) are still converted by their field validators, and validators declared on
+    the models still run, so the result matches the validated model. Only use this for documents whose content hash
+    matches the hash recorded when they were validated; raises ValidationError if the document does not fit the model.
+    """
+    plan = _construction_plan(model)
+    if plan is None:
+        return model(**data)
+
+    values, fields_set, errors = {}, set(), []
+    for name, field, alias, kind in plan:
+        value = data.get(alias, _MISSING)
+        if value is _MISSING and name != alias and model.__config__.allow_population_by_field_name:
+            value = data.get(name, _MISSING)
+
+        if value is _MISSING:
+            if field.required:
+                errors.append(ErrorWrapper(MissingError(), loc=alias))
+            else:
+                values[name] = field.get_default()
+            continue
+
+        if value is None and field.allow_none and not field.post_validators:
+            values[name] = None
+            fields_set.add(name)
+            continue
+
+        if kind == _MODEL and type(value) is dict:
+            value, error = _construct_nested(field, [value], model, alias)
+            value = value and value[0]
+        elif kind == _MODEL_LIST and type(value) is list:
+            value, error = _construct_nested(field, value, model, alias)
+        elif kind == _STR and isinstance(value, str) or kind == _STR_LIST and _all_str(value):
+            value, error = (list(value) if kind == _STR_LIST else value), None
+        else:
+            value, error = field.validate(value, values, loc=alias, cls=model)
+            kind = None
+
+        if error is None and kind is not None and field.post_validators:
+            try:
+                for validator in field.post_validators:
+                    value = validator(model, value, values, field, model.__config__)
+            except (ValueError, TypeError, AssertionError) as exc:
+                error = ErrorWrapper(exc, loc=alias)
+
+        if error is None:
+            values[name] = value
+            fields_set.add(name)
+        else:
+            errors.append(error)
+
+    if errors:
+        raise ValidationError(errors, model)
+
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__fields_set__", fields_set)
+    instance._init_private_attributes()  # pylint: disable=protected-access
+    return instance
+
+
+_MODEL, _MODEL_LIST, _STR, _STR_LIST = range(4)
+
+
+@functools.lru_cache(maxsize=None)
+def _construction_plan(model: Type[BaseModel]) -> Optional[tuple]:
+    """Return (name, field, alias, kind) for each field of a model, or None if the model must be validated."""
+    if model.__pre_root_validators__ or model.__post_root_validators__:
+        return None
+
+    plan = []
+    for name, field in model.__fields__.items():
+        kind = None
+        type_ = field.type_
+        if field.pre_validators or any(validator.each_item for validator in field.class_validators.values()):
+            kind = None
+        elif isinstance(type_, type) and issubclass(type_, BaseModel):
+            kind = {SHAPE_SINGLETON: _MODEL, SHAPE_LIST: _MODEL_LIST}.get(field.shape)
+        elif (
+            isinstance(type_, type)
+            and issubclass(type_, str)
+            and not issubclass(type_, Enum)
+            and not hasattr(type_, "__get_validators__")
+        ):
+            kind = {SHAPE_SINGLETON: _STR, SHAPE_LIST: _STR_LIST}.get(field.shape)
+        plan.append((name, field, field.alias, kind))
+
+    return tuple(plan)
+
+
+def _construct_nested(field: ModelField, items: list, model: Type[BaseModel], alias: str):
+    try:
+        return [trusted_construct(field.type_, item) for item in items], None
+    except ValidationError as exc:
+        return None, ErrorWrapper(exc, loc=alias)
+
+
+def _all_str(value) -> bool:
+    return type(value) is list and all(isinstance(item, str) for item in value)
+
+
 class NCName(str):
     pass
 
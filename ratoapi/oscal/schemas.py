@@ -0,0 +1,56 @@
+"""Pre-compiled OSCAL JSON Schema validators.
+
+Each schema is loaded, checked and compiled into a validator once per process, on first use or at app startup
+when ``OSCAL_SCHEMA_PRECOMPILE`` is enabled, and shared by every upload that needs it.
+"""
+import functools
+import json
+import logging
+from typing import Dict, List
+
+from django.conf import settings
+from jsonschema import Draft7Validator
+from jsonschema.exceptions import ValidationError, best_match
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
+
+logger = logging.getLogger(__name__)
+
+SCHEMAS: Dict[str, str] = {
+    "catalog": "catalogs/schemas/oscal_catalog_schema.json",
+    "profile": "catalogs/schemas/oscal_profile_schema.json",
+    "component": "components/schema/oscal_component_schema.json",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_validator(name: str) -> Validator:
+    """Return the compiled validator for a named OSCAL schema.
+
+    Raises KeyError for an unknown schema name and SchemaError if the schema itself is invalid.
+    """
+    with open(settings.BASE_DIR / SCHEMAS[name], "r") as file:
+        schema = json.load(file)
+
+    cls = validator_for(schema, default=Draft7Validator)
+    cls.check_schema(schema)
+    logger.info("Compiled OSCAL %s schema validator (%s)", name, cls.__name__)
+    return cls(schema, format_checker=cls.FORMAT_CHECKER)
+
+
+def validation_errors(instance: dict, name: str, collect_all: bool = False) -> List[ValidationError]:
+    """Validate an instance against a named OSCAL schema and return the errors found.
+
+    By default validation stops at the first error. With ``collect_all`` every error is returned, most relevant
+    first.
+    """
+    errors = get_validator(name).iter_errors(instance)
+    if not collect_all:
+        error = next(errors, None)
+        return [] if error is None else [error]
+
+    errors = list(errors)
+    if not errors:
+        return []
+    first = best_match(errors)
+    return [first, *(error for error in errors if error is not first)]
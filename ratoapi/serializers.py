@@ -0,0 +1,58 @@
+"""Sparse fieldsets and opt-in expansion for API serializers.
+
+On GET requests, ``?fields=id,title`` limits a response to the named fields, and ``?expand=component_json`` adds fields
+a serializer leaves out by default, listed in its ``Meta.expandable_fields``. Dotted names reach nested serializers,
+for example ``?fields=id,components.title`` or ``?expand=components.component_json``. Naming a field in ``fields``
+also includes it when it is expandable.
+"""
+from typing import Iterable, List, Optional, Set
+
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _requested(request, param: str, path: List[str]) -> Optional[Set[str]]:
+    """Return the field names a query parameter asks for at path, or None if it names none there."""
+    names = set()
+    for value in request.query_params.get(param, "").split(","):
+        parts = value.strip().split(".")
+        if len(parts) > len(path) and parts[: len(path)] == path and parts[len(path)]:
+            names.add(parts[len(path)])
+    return names or None
+
+
+class FieldSelectionMixin:
+    """Apply ``?fields=`` and ``?expand=`` to a serializer and the serializers nested in it."""
+
+    def get_fields(self):
+        fields = super().get_fields()  # type: ignore[misc]
+        request = self.context.get("request")  # type: ignore[attr-defined]
+        if request is None or request.method not in SAFE_METHODS:
+            return fields
+
+        path = self._field_path()
+        selected = _requested(request, "fields", path)
+        expanded = _requested(request, "expand", path) or set()
+        expandable = set(getattr(self.Meta, "expandable_fields", ()))  # type: ignore[attr-defined]
+
+        for name in list(fields):
+            if selected is not None and name not in selected:
+                del fields[name]
+            elif selected is None and name in expandable and name not in expanded:
+                del fields[name]
+        return fields
+
+    def _field_path(self) -> List[str]:
+        path: List[str] = []
+        node = self
+        while getattr(node, "parent", None) is not None:
+            if node.field_name:  # type: ignore[attr-defined]
+                path.insert(0, node.field_name)  # type: ignore[attr-defined]
+            node = node.parent  # type: ignore[attr-defined]
+        return path
+
+
+def omitted_columns(serializer: serializers.Serializer, columns: Iterable[str]) -> List[str]:
+    """Return the columns, of those given, that a serializer does not output, for ``QuerySet.defer``."""
+    sources = {field.source for field in serializer.fields.values()}
+    return [column for column in columns if column not in sources]
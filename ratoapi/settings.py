@@ -67,10 +67,12 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_filters",
     "corsheaders",
     "rest_framework",
     "rest_framework.authtoken",
+    "blobs.apps.BlobsConfig",
     "catalogs.apps.CatalogConfig",
     "guardian",
     "components.apps.ComponentsConfig",
@@ -176,6 +178,11 @@ STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = "media/"
 
+# Uploaded and ingested files are stored in the database by content (blobs.storage); each node reads them through a
+# cache on its own disk.
+DEFAULT_FILE_STORAGE = "blobs.storage.BlobStorage"
+BLOB_CACHE_DIR = os.environ.get("BLOB_CACHE_DIR", os.path.join(MEDIA_ROOT, "blobs"))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -210,3 +217,18 @@ SWAGGER_SETTINGS = {
     "LOGIN_URL": "/api-auth/login/",
     "LOGOUT_URL": "/api-auth/logout/",
 }
+
+# Maximum number of parsed catalog objects each worker keeps in memory.
+CATALOG_CACHE_SIZE = 32
+
+# Maximum number of compressed catalog response bodies each worker keeps in memory.
+CATALOG_RESPONSE_CACHE_SIZE = 16
+
+# Maximum number of parsed component documents each worker keeps in memory.
+COMPONENT_CACHE_SIZE = 256
+
+# Compile the OSCAL JSON schema validators at startup instead of on the first upload.
+OSCAL_SCHEMA_PRECOMPILE = os.environ.get("OSCAL_SCHEMA_PRECOMPILE", "False").capitalize() == "True"
+
+# Keep cached catalogs as compact interned records (catalogs.compact) instead of dicts and pydantic models.
+CATALOG_COMPACT = os.environ.get("CATALOG_COMPACT", "False").capitalize() == "True"
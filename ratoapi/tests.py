@@ -1,14 +1,20 @@
+import hashlib
 import json
 import os
 import tempfile
 import time
 
 from django.test import SimpleTestCase
+from pydantic import ValidationError
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
+from ratoapi.cache import BoundedCache
+from ratoapi.oscal import schemas
+from ratoapi.oscal.catalog import CatalogModel, ProseTemplate
 from ratoapi.oscal.component import ComponentModel
+from ratoapi.oscal.oscal import control_sort_key, document_hash, trusted_construct
 from users.models import User
 
 
@@ -178,3 +184,168 @@ class ComponentModelTestCase(SimpleTestCase):
             sorted(component.component_definition.components[0].control_ids),
             ["ac-11", "ac-3", "ac-7"],
         )
+
+
+class BoundedCacheTestCase(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = BoundedCache("test", maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_version_mismatch_is_a_miss(self):
+        cache = BoundedCache("test")
+        cache.set("a", 1, version=1)
+
+        self.assertEqual(cache.get_or_load("a", lambda: 2, version=2), 2)
+        self.assertEqual(cache.get("a", version=2), 2)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_sizeof_reports_memory_of_cached_values(self):
+        cache = BoundedCache("test", maxsize=1, sizeof=len)
+        cache.set("a", "abc")
+        cache.set("b", "de")
+
+        self.assertEqual(cache.stats()["bytes"], 2)
+        self.assertNotIn("bytes", BoundedCache("test").stats())
+
+
+class CatalogModelTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.catalog = CatalogModel.from_json("ratoapi/testdata/NIST_SP-800-53_rev5_test.json")
+
+    def test_index_is_built_once(self):
+        self.assertIs(self.catalog.index, self.catalog.index)
+        self.assertEqual(len(self.catalog.index.ordered), len(self.catalog.controls))
+
+    def test_control_summaries(self):
+        summaries = self.catalog.control_summaries(["ac-2", "not-a-control", "ac-1"])
+
+        self.assertEqual(list(summaries), ["ac-2", "ac-1"])
+        self.assertEqual(summaries["ac-2"]["family"], "Access Control")
+        self.assertEqual(summaries["ac-1"]["next_id"], "ac-2")
+        self.assertEqual(summaries["ac-2"], self.catalog.control_summary("ac-2"))
+
+    def test_get_next_last_control(self):
+        self.assertEqual(self.catalog.get_next(self.catalog.controls[-1]), "")
+
+    def test_statement_template_is_compiled_once(self):
+        control = self.catalog.get_control("ac-1")
+        self.assertIs(control.statement_template, control.statement_template)
+        self.assertNotIn("{{ insert: param", control.description)
+
+    def test_render_description_with_values(self):
+        control = self.catalog.get_control("ac-1")
+        param_id = control.params[0].id
+
+        rendered = control.render_description({param_id: "the CISO"})
+        self.assertIn("the CISO", rendered)
+        self.assertNotIn("the CISO", control.description)
+
+
+class TrustedConstructTestCase(SimpleTestCase):
+    catalog_file = "ratoapi/testdata/NIST_SP-800-53_rev5_test.json"
+
+    def test_trusted_catalog_matches_validated_catalog(self):
+        with open(self.catalog_file, "rb") as file:
+            trusted_hash = hashlib.sha256(file.read()).hexdigest()
+
+        validated = CatalogModel._parse_json(self.catalog_file)
+        trusted = CatalogModel._parse_json(self.catalog_file, trusted_hash=trusted_hash)
+
+        self.assertEqual(trusted.uuid, validated.uuid)
+        self.assertEqual(trusted.metadata.title, validated.metadata.title)
+        control_ids = [control.id for control in validated.controls]
+        self.assertEqual(trusted.control_summaries(control_ids), validated.control_summaries(control_ids))
+        self.assertEqual(trusted.get_control("ac-1").params, validated.get_control("ac-1").params)
+
+    def test_cached_trusted_catalog_is_not_reused_untrusted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.json")
+            with open(self.catalog_file, "rb") as source, open(path, "wb") as file:
+                data = source.read()
+                file.write(data)
+            trusted_hash = hashlib.sha256(data).hexdigest()
+
+            trusted = CatalogModel.from_json(path, trusted_hash=trusted_hash)
+            self.assertIs(CatalogModel.from_json(path, trusted_hash=trusted_hash), trusted)
+            self.assertIsNot(CatalogModel.from_json(path), trusted)
+
+    def test_trusted_component_matches_validated_component(self):
+        trusted = ComponentModel.from_document(COMPONENT_DATA, trusted_hash=document_hash(COMPONENT_DATA))
+
+        self.assertEqual(trusted, ComponentModel(**COMPONENT_DATA))
+
+    def test_hash_mismatch_validates(self):
+        document = {"component-definition": {"uuid": "not-a-uuid"}}
+
+        with self.assertRaises(ValidationError):
+            ComponentModel.from_document(document, trusted_hash=document_hash(COMPONENT_DATA))
+
+    def test_document_that_does_not_fit_the_model_raises(self):
+        with self.assertRaises(ValidationError):
+            trusted_construct(ComponentModel, {"component-definition": {"components": []}})
+
+    def test_document_hash_ignores_key_order(self):
+        self.assertEqual(document_hash({"a": 1, "b": [1, 2]}), document_hash({"b": [1, 2], "a": 1}))
+
+
+class ControlSortKeyTestCase(SimpleTestCase):
+    def test_control_sort_key(self):
+        test_cases = {
+            "ac-2": ("ac", 2, 0),
+            "ac-2.10": ("ac", 2, 10),
+            "AC-2(10)": ("ac", 2, 10),
+            "3.1.1": (None, None, None),
+        }
+
+        for control_id, expected in test_cases.items():
+            with self.subTest(control_id=control_id):
+                self.assertEqual(control_sort_key(control_id), expected)
+
+    def test_enhancements_sort_numerically(self):
+        control_ids = ["ac-2.10", "ac-10", "ac-2", "ac-2.2"]
+
+        self.assertEqual(sorted(control_ids, key=control_sort_key), ["ac-2", "ac-2.2", "ac-2.10", "ac-10"])
+
+
+class ProseTemplateTestCase(SimpleTestCase):
+    def test_render(self):
+        template = ProseTemplate.compile("Review {{ insert: param, p1 }} every {{ insert: param, p2 }}.")
+
+        self.assertEqual(template.slots, ("p1", "p2"))
+        self.assertEqual(template.render({"p1": "logs", "p2": "week"}), "Review logs every week.")
+        self.assertEqual(template.render({"p1": "logs"}), "Review logs every {{ insert: param, p2 }}.")
+
+    def test_render_nested_inserts(self):
+        template = ProseTemplate.compile("Do {{ insert: param, p1 }}.")
+        values = {"p1": "one of: a, {{ insert: param, p2 }}", "p2": "b"}
+
+        self.assertEqual(template.render(values), "Do one of: a, b.")
+
+
+class SchemaValidatorTestCase(SimpleTestCase):
+    def test_validator_is_compiled_once(self):
+        self.assertIs(schemas.get_validator("catalog"), schemas.get_validator("catalog"))
+
+    def test_valid_catalog(self):
+        with open("ratoapi/testdata/NIST_SP-800-53_rev5_test.json", "r") as file:
+            catalog = json.load(file)
+        self.assertEqual(schemas.validation_errors(catalog, "catalog"), [])
+
+    def test_fail_fast_and_collect_all(self):
+        with open("components/data/drupal.json", "r") as file:
+            component = json.load(file)
+        component["component-definition"]["uuid"] = "not-a-uuid"
+        del component["component-definition"]["metadata"]
+
+        self.assertEqual(len(schemas.validation_errors(component, "component")), 1)
+        self.assertEqual(len(schemas.validation_errors(component, "component", collect_all=True)), 2)